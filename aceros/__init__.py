@@ -0,0 +1,5 @@
+"""Motor de datos de la Calculadora de Aceros FIS"""
+
+from .catalog import PROPERTIES, Range, SteelCatalog
+
+__all__ = ["PROPERTIES", "Range", "SteelCatalog"]
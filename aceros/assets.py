@@ -0,0 +1,133 @@
+# Recursos estáticos de la interfaz (CSS y logo)
+# Viven en un módulo importado una sola vez: app.py se re-ejecuta completo en
+# cada rerun de Streamlit y no conviene reconstruirlos ahí
+
+from functools import lru_cache
+
+PAGE_CSS = """
+<style>
+    /* Paleta de colores */
+    :root {
+        --primary: #1E3A8A;
+        --secondary: #F59E0B;
+        --success: #10B981;
+        --warning: #EF4444;
+        --bg: #F9FAFB;
+    }
+    
+    /* Ocultar menú de Streamlit */
+    #MainMenu {visibility: hidden;}
+    footer {visibility: hidden;}
+    
+    /* Header personalizado */
+    .main-header {
+        background: linear-gradient(135deg, #1E3A8A 0%, #3B82F6 100%);
+        padding: 2rem;
+        border-radius: 10px;
+        margin-bottom: 2rem;
+        text-align: center;
+        color: white;
+    }
+    
+    /* Cards de modo */
+    .mode-card {
+        background: white;
+        border: 2px solid #E5E7EB;
+        border-radius: 12px;
+        padding: 1.5rem;
+        text-align: center;
+        transition: all 0.3s ease;
+        cursor: pointer;
+        height: 100%;
+    }
+    
+    .mode-card:hover {
+        border-color: #F59E0B;
+        box-shadow: 0 8px 16px rgba(0,0,0,0.1);
+        transform: translateY(-4px);
+    }
+    
+    /* Resultados */
+    .result-card {
+        background: white;
+        border-left: 4px solid #F59E0B;
+        padding: 1.5rem;
+        border-radius: 8px;
+        margin: 1rem 0;
+        box-shadow: 0 2px 8px rgba(0,0,0,0.05);
+    }
+    
+    .medal {
+        font-size: 2rem;
+        margin-right: 0.5rem;
+    }
+    
+    /* Barras de progreso */
+    .progress-bar {
+        background: #E5E7EB;
+        height: 20px;
+        border-radius: 10px;
+        overflow: hidden;
+        margin: 0.5rem 0;
+    }
+    
+    .progress-fill {
+        height: 100%;
+        background: linear-gradient(90deg, #3B82F6, #1E3A8A);
+        transition: width 0.5s ease;
+    }
+    
+    /* Botones */
+    .stButton>button {
+        background: linear-gradient(135deg, #F59E0B 0%, #D97706 100%);
+        color: white;
+        border: none;
+        border-radius: 8px;
+        padding: 0.75rem 2rem;
+        font-weight: 600;
+        transition: all 0.3s ease;
+    }
+    
+    .stButton>button:hover {
+        box-shadow: 0 4px 12px rgba(245, 158, 11, 0.4);
+        transform: translateY(-2px);
+    }
+    
+    /* Logo ASCII */
+    .logo-ascii {
+        font-family: 'Courier New', monospace;
+        font-size: 0.8rem;
+        line-height: 1;
+        color: white;
+        text-align: center;
+        margin-bottom: 1rem;
+    }
+</style>
+"""
+
+LOGO_ASCII = """
+    ╔═══════════════════════════════════════╗
+    ║                                       ║
+    ║     █████╗  ██████╗███████╗██████╗   ║
+    ║    ██╔══██╗██╔════╝██╔════╝██╔══██╗  ║
+    ║    ███████║██║     █████╗  ██████╔╝  ║
+    ║    ██╔══██║██║     ██╔══╝  ██╔══██╗  ║
+    ║    ██║  ██║╚██████╗███████╗██║  ██║  ║
+    ║    ╚═╝  ╚═╝ ╚═════╝╚══════╝╚═╝  ╚═╝  ║
+    ║                                       ║
+    ║    ███████╗██╗███████╗                ║
+    ║    ██╔════╝██║██╔════╝                ║
+    ║    █████╗  ██║███████╗                ║
+    ║    ██╔══╝  ██║╚════██║                ║
+    ║    ██║     ██║███████║                ║
+    ║    ╚═╝     ╚═╝╚══════╝                ║
+    ║                                       ║
+    ║   INGENIERÍA EN MATERIALES            ║
+    ║   UNAM - Facultad de Ingeniería       ║
+    ╚═══════════════════════════════════════╝
+    """
+
+
+@lru_cache(maxsize=None)
+def logo_html():
+    return f'<div class="logo-ascii">{LOGO_ASCII}</div>'
@@ -0,0 +1,375 @@
+# Catálogo columnar de aceros
+# Se construye una sola vez por versión del dataset y se comparte entre reruns
+
+from typing import NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+# ==================== PROPIEDADES INDEXADAS ====================
+# Clave corta -> columna del dataset
+PROPERTIES = {
+    'uts': 'UTS (MPa)',
+    'ys': 'YS (MPa)',
+    'hb': 'Hardness (HB)',
+    'elong': 'Elongation (%)',
+    'c_avg': 'C_avg',
+    'aust_t': 'Austenitize (°C)',
+    'temper_t': 'Temper (°C)',
+}
+
+
+class Range(NamedTuple):
+    """Rango de consulta; None significa sin límite"""
+    lo: Optional[float] = None
+    hi: Optional[float] = None
+    lo_strict: bool = False
+    hi_strict: bool = False
+
+    def is_open(self):
+        return self.lo is None and self.hi is None
+
+    def mask(self, values):
+        """Evalúa el rango sobre un arreglo (usado para refinar candidatos)"""
+        mask = np.ones(len(values), dtype=bool)
+        if self.lo is not None:
+            mask &= (values > self.lo) if self.lo_strict else (values >= self.lo)
+        if self.hi is not None:
+            mask &= (values < self.hi) if self.hi_strict else (values <= self.hi)
+        return mask
+
+
+def position_dtype(size):
+    """Entero más angosto para posiciones de fila (int32 salvo catálogos enormes)"""
+    return np.int32 if size < np.iinfo(np.int32).max else np.intp
+
+
+def column_values(series):
+    """Columna como float64; si ya lo es, es una vista (sin copiar la columna)"""
+    if not pd.api.types.is_numeric_dtype(series):
+        series = pd.to_numeric(series, errors='coerce')
+    return series.to_numpy(dtype=np.float64)
+
+
+def as_range(bounds):
+    """Acepta Range o tupla (lo, hi)"""
+    if isinstance(bounds, Range):
+        return bounds
+    return Range(*bounds)
+
+
+# ==================== ÍNDICE ORDENADO ====================
+class SortedIndex:
+    """Permutación ordenada de una columna numérica para búsquedas binarias"""
+
+    def __init__(self, values):
+        order = np.argsort(values, kind='stable')
+        valid = int(np.count_nonzero(~np.isnan(values)))
+        # Los NaN quedan al final del argsort y nunca entran en un rango
+        self.order = order[:valid].astype(position_dtype(len(values)))
+        self.sorted = values[self.order]
+
+    @classmethod
+    def from_arrays(cls, order, sorted_values):
+        """Índice ya calculado (p. ej. arreglos mapeados en memoria)"""
+        index = cls.__new__(cls)
+        index.order = order
+        index.sorted = sorted_values
+        return index
+
+    def merged(self, values, offset):
+        """Índice con valores nuevos (filas offset, offset+1, ...) insertados
+
+        Equivale a reordenar todo con argsort estable, pero sólo ordena los
+        valores nuevos y los intercala en O(N).
+        """
+        dtype = position_dtype(offset + len(values))
+        order = np.argsort(values, kind='stable')
+        order = order[:int(np.count_nonzero(~np.isnan(values)))]
+        new_sorted = values[order]
+        # side='right': en empates las filas nuevas quedan después (orden estable)
+        at = np.searchsorted(self.sorted, new_sorted, side='right')
+        return SortedIndex.from_arrays(np.insert(self.order.astype(dtype, copy=False), at,
+                                                 (order + offset).astype(dtype)),
+                                       np.insert(self.sorted, at, new_sorted))
+
+    def span(self, rng):
+        """Tramo [left, right) de la permutación ordenada que cae en el rango"""
+        left = 0
+        right = len(self.sorted)
+        if rng.lo is not None:
+            left = int(np.searchsorted(self.sorted, rng.lo, side='right' if rng.lo_strict else 'left'))
+        if rng.hi is not None:
+            right = int(np.searchsorted(self.sorted, rng.hi, side='left' if rng.hi_strict else 'right'))
+        return left, max(left, right)
+
+    def count(self, rng):
+        left, right = self.span(rng)
+        return right - left
+
+    def positions(self, rng):
+        """Posiciones de fila dentro del rango (sin orden de fila)"""
+        left, right = self.span(rng)
+        return self.order[left:right]
+
+    def min(self):
+        return self.sorted[0] if len(self.sorted) else np.nan
+
+    def max(self):
+        return self.sorted[-1] if len(self.sorted) else np.nan
+
+
+def _append_frame(df, rows):
+    """DataFrame con rows al final; las categóricas conservan sus códigos"""
+    columns = {}
+    for name in df.columns:
+        old = df[name]
+        new = rows[name] if name in rows.columns else pd.Series(np.nan, index=rows.index)
+        if isinstance(old.dtype, pd.CategoricalDtype):
+            categories = old.cat.categories
+            extra = pd.Index(new.dropna().astype(object).unique()).difference(categories, sort=False)
+            categories = categories.append(extra)
+            codes = np.concatenate([old.cat.codes.to_numpy(),
+                                    categories.get_indexer(new.astype(object))])
+            columns[name] = pd.Categorical.from_codes(codes, categories)
+        else:
+            columns[name] = pd.concat([old, new.astype(old.dtype)], ignore_index=True)
+    return pd.DataFrame(columns, copy=False)
+
+
+# ==================== CATÁLOGO ====================
+class SteelCatalog:
+    """Arreglos tipados, códigos categóricos e índices sobre el dataset de aceros"""
+
+    def __init__(self, df, version=None):
+        self.df = df.reset_index(drop=True)
+        self.version = version
+        self.size = len(self.df)
+
+        self.parent = None
+
+        # Propiedades numéricas como float64 contiguos (las mismas columnas del DataFrame)
+        self.values = {}
+        self.indexes = {}
+        for key, column in PROPERTIES.items():
+            if column not in self.df.columns:
+                continue
+            values = column_values(self.df[column])
+            self.values[key] = values
+            self.indexes[key] = SortedIndex(values)
+        self._summarize()
+
+        # Tratamiento simplificado como código entero (orden de aparición)
+        if 'Condition_simple' in self.df.columns:
+            codes, uniques = pd.factorize(self.df['Condition_simple'])
+            self.condition_codes = codes.astype(np.int16)
+            self.conditions = list(uniques)
+        else:
+            self.condition_codes = np.full(self.size, -1, dtype=np.int16)
+            self.conditions = []
+
+        # Grado SAE -> posiciones de fila: filas agrupadas por grado y el
+        # inicio de cada grupo (el tramo se corta al consultar)
+        if 'SAE Grade' in self.df.columns:
+            codes, uniques = pd.factorize(self.df['SAE Grade'].astype(str))
+            self.grade_order = np.argsort(codes, kind='stable').astype(position_dtype(self.size))
+            self.grade_starts = np.searchsorted(codes[self.grade_order], np.arange(len(uniques) + 1))
+            self.grades = list(uniques)
+        else:
+            self.grade_order = np.empty(0, dtype=position_dtype(0))
+            self.grade_starts = np.zeros(1, dtype=np.intp)
+            self.grades = []
+        self.grade_codes = {grade: code for code, grade in enumerate(self.grades)}
+
+    def _summarize(self):
+        """Escalas y límites de sliders a partir de valores e índices"""
+        self.spread = {}
+        self.slider_bounds = {}
+        for key, values in self.values.items():
+            # Escala para normalizar desviaciones (scoring)
+            spread = np.nanstd(values) if np.isfinite(values).any() else 0.0
+            self.spread[key] = float(spread) if spread > 0 else 1.0
+            # Límites enteros de los sliders, precalculados con el catálogo
+            low, high = self.indexes[key].min(), self.indexes[key].max()
+            if np.isfinite(low):
+                self.slider_bounds[key] = (int(np.floor(low)), int(np.ceil(high)))
+
+    # ==================== FILAS AGREGADAS ====================
+    def extend(self, rows, version):
+        """Catálogo nuevo con rows agregadas al final (ya con columnas derivadas)
+
+        Los índices se fusionan en vez de reordenarse y los códigos existentes
+        no cambian. Este catálogo no se modifica: las sesiones que lo usan
+        siguen viendo la versión anterior hasta que pidan la nueva.
+        """
+        rows = rows.reset_index(drop=True)
+        start = self.size
+        catalog = SteelCatalog.__new__(SteelCatalog)
+        catalog.df = _append_frame(self.df, rows)
+        catalog.version = version
+        catalog.size = len(catalog.df)
+        catalog.parent = (self.version, start)
+
+        catalog.values = {}
+        catalog.indexes = {}
+        for key, column in PROPERTIES.items():
+            if column not in catalog.df.columns:
+                continue
+            values = column_values(catalog.df[column])
+            catalog.values[key] = values
+            if key not in self.values:
+                catalog.indexes[key] = SortedIndex(values)
+                continue
+            catalog.indexes[key] = self.indexes[key].merged(values[start:], start)
+        catalog._summarize()
+
+        # Tratamientos nuevos reciben los códigos siguientes
+        catalog.conditions = list(self.conditions)
+        lookup = {name: code for code, name in enumerate(catalog.conditions)}
+        new_codes = np.full(len(rows), -1, dtype=np.int16)
+        if 'Condition_simple' in rows.columns:
+            for i, name in enumerate(rows['Condition_simple'].astype(object)):
+                if isinstance(name, str):
+                    if name not in lookup:
+                        lookup[name] = len(catalog.conditions)
+                        catalog.conditions.append(name)
+                    new_codes[i] = lookup[name]
+        catalog.condition_codes = np.concatenate([self.condition_codes, new_codes])
+
+        # Grupos por grado: las filas nuevas se intercalan en su grupo
+        catalog.grades = list(self.grades)
+        catalog.grade_codes = dict(self.grade_codes)
+        grades = rows['SAE Grade'].astype(str) if 'SAE Grade' in rows.columns else pd.Series(dtype=str)
+        new_codes = np.empty(len(grades), dtype=np.intp)
+        for i, grade in enumerate(grades):
+            if grade not in catalog.grade_codes:
+                catalog.grade_codes[grade] = len(catalog.grades)
+                catalog.grades.append(grade)
+            new_codes[i] = catalog.grade_codes[grade]
+        old_sorted = np.repeat(np.arange(len(self.grades)), np.diff(self.grade_starts))
+        order = np.argsort(new_codes, kind='stable')
+        at = np.searchsorted(old_sorted, new_codes[order], side='right')
+        catalog.grade_order = np.insert(self.grade_order, at, order + start)
+        merged = np.insert(old_sorted, at, new_codes[order])
+        catalog.grade_starts = np.searchsorted(merged, np.arange(len(catalog.grades) + 1))
+        return catalog
+
+    # ==================== ARREGLOS COMPARTIBLES ====================
+    def parts(self):
+        """(arreglos, metadatos JSON) suficientes para reconstruir el catálogo con attach()"""
+        arrays = {
+            'condition_codes': self.condition_codes,
+            'grade_order': self.grade_order,
+            'grade_starts': self.grade_starts,
+        }
+        for key, index in self.indexes.items():
+            arrays[f'order/{key}'] = index.order
+            arrays[f'sorted/{key}'] = index.sorted
+        meta = {
+            'keys': list(self.values),
+            'spread': self.spread,
+            'slider_bounds': self.slider_bounds,
+            'conditions': self.conditions,
+            'grades': self.grades,
+            'parent': self.parent,
+        }
+        return arrays, meta
+
+    @classmethod
+    def attach(cls, df, version, arrays, meta):
+        """Catálogo sobre arreglos existentes, sin copiarlos ni recalcular índices
+
+        arrays debe incluir 'values/<clave>' además de lo que devuelve parts().
+        """
+        catalog = cls.__new__(cls)
+        catalog.df = df
+        catalog.version = version
+        catalog.size = len(df)
+        catalog.parent = tuple(meta['parent']) if meta.get('parent') else None
+        catalog.values = {key: arrays[f'values/{key}'] for key in meta['keys']}
+        catalog.indexes = {
+            key: SortedIndex.from_arrays(arrays[f'order/{key}'], arrays[f'sorted/{key}'])
+            for key in meta['keys']
+        }
+        catalog.spread = dict(meta['spread'])
+        catalog.slider_bounds = {key: tuple(bounds) for key, bounds in meta['slider_bounds'].items()}
+        catalog.condition_codes = arrays['condition_codes']
+        catalog.conditions = list(meta['conditions'])
+        catalog.grades = list(meta['grades'])
+        catalog.grade_order = arrays['grade_order']
+        catalog.grade_starts = arrays['grade_starts']
+        catalog.grade_codes = {grade: code for code, grade in enumerate(catalog.grades)}
+        return catalog
+
+    def __len__(self):
+        return self.size
+
+    def bounds(self, key):
+        """Mínimo y máximo de una propiedad (para los sliders)"""
+        index = self.indexes[key]
+        return index.min(), index.max()
+
+    def condition_lookup(self, conditions):
+        """Tabla booleana código -> permitido; la última celda cubre el código -1"""
+        allowed = np.zeros(len(self.conditions) + 1, dtype=bool)
+        wanted = set(conditions)
+        for code, name in enumerate(self.conditions):
+            allowed[code] = name in wanted
+        return allowed
+
+    def query(self, ranges=None, conditions=None):
+        """Posiciones (ascendentes) de las filas que cumplen todos los criterios
+
+        ranges: dict clave -> Range o (lo, hi). conditions: tratamientos
+        permitidos, o None para no filtrar por tratamiento.
+        """
+        criteria = []
+        for key, bounds in (ranges or {}).items():
+            rng = as_range(bounds)
+            if not rng.is_open():
+                criteria.append((key, rng))
+
+        if criteria:
+            # El criterio más selectivo se resuelve por búsqueda binaria;
+            # los demás sólo se evalúan sobre sus candidatos
+            criteria.sort(key=lambda item: self.indexes[item[0]].count(item[1]))
+            key, rng = criteria[0]
+            positions = np.sort(self.indexes[key].positions(rng))
+            for key, rng in criteria[1:]:
+                if len(positions) == 0:
+                    break
+                positions = positions[rng.mask(self.values[key][positions])]
+        else:
+            positions = np.arange(self.size)
+
+        if conditions is not None:
+            allowed = self.condition_lookup(conditions)
+            positions = positions[allowed[self.condition_codes[positions]]]
+
+        return positions
+
+    def rows(self, positions, columns=None):
+        """Filas del DataFrame original para las posiciones dadas
+
+        Con columns sólo se copian esas columnas de esas filas.
+        """
+        if columns is None:
+            return self.df.iloc[positions]
+        return self.df.iloc[positions, self.df.columns.get_indexer(columns)]
+
+    def nbytes(self):
+        """Bytes del catálogo: columnas, índices y códigos (sin contar dos veces
+        las propiedades, que son vistas de las columnas)"""
+        total = int(self.df.memory_usage(index=False, deep=True).sum())
+        arrays, _ = self.parts()
+        total += sum(int(array.nbytes) for array in arrays.values())
+        for key, values in self.values.items():
+            if not np.may_share_memory(values, self.df[PROPERTIES[key]].to_numpy()):
+                total += int(values.nbytes)
+        return total
+
+    def grade_positions(self, grade):
+        code = self.grade_codes.get(str(grade))
+        if code is None:
+            return np.empty(0, dtype=np.intp)
+        return self.grade_order[self.grade_starts[code]:self.grade_starts[code + 1]]
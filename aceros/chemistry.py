@@ -0,0 +1,131 @@
+# Filtros de composición química
+# Cada elemento es un intervalo [mín, máx] por fila. Un índice ordenado por
+# cada extremo responde traslape y contención con búsquedas binarias.
+#
+# Celdas en blanco:
+#   sólo máx (p. ej. "P ≤ 0.04", o C sin mínimo)  -> [0, máx]
+#   sólo mín                                      -> [mín, +inf)
+#   ambas                                         -> elemento no especificado
+
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from .catalog import Range, SortedIndex
+from .ingest import float_values
+
+# Símbolo -> (columna mínima, columna máxima) tal como vienen en el CSV
+ELEMENTS = {
+    'C': ('C (Min)', 'C (Max)'),
+    'Mn': ('Mn (Min)', 'Mn (Max)'),
+    'P': ('P (Min)', 'P (Max)'),
+    'S': ('S (Min)', 'S(Max)'),
+    'Si': ('Si (Min)', 'Si (Max)'),
+    'Ni': ('Ni (Min)', 'Ni (Max)'),
+    'Cr': ('Cr (Min)', 'Cr (Max)'),
+    'Mo': ('Mo (Min)', 'Mo (Max)'),
+    'Ti': ('Ti (Min)', 'Ti (Max)'),
+}
+
+# Modos de filtro
+OVERLAPS = 'overlaps'
+WITHIN = 'within'
+PRESENT = 'present'
+ABSENT = 'absent'
+MODES = (OVERLAPS, WITHIN, PRESENT, ABSENT)
+
+
+class ChemFilter(NamedTuple):
+    """Criterio sobre un elemento; lo/hi None = sin límite
+
+    overlaps: el intervalo de la fila toca [lo, hi]  ("Cr se traslapa con 0.8–1.1")
+    within:   el intervalo de la fila cabe en [lo, hi] ("S máx ≤ 0.035" = within(None, 0.035))
+    present / absent: el elemento está (o no) especificado
+    """
+    element: str
+    mode: str = OVERLAPS
+    lo: Optional[float] = None
+    hi: Optional[float] = None
+
+
+class ChemistryIndex:
+    """Índices por extremo de cada elemento presente en el dataset"""
+
+    def __init__(self, df):
+        self.size = len(df)
+        self.low = {}
+        self.high = {}
+        self.low_index = {}
+        self.high_index = {}
+        self.present = {}
+        for element, (low_column, high_column) in ELEMENTS.items():
+            if low_column not in df.columns or high_column not in df.columns:
+                continue
+            low = float_values(df[low_column])
+            high = float_values(df[high_column])
+            present = ~(np.isnan(low) & np.isnan(high))
+            if not present.any():
+                continue
+            # Extremos abiertos; los no especificados quedan NaN y no entran en ningún índice
+            low = np.where(present & np.isnan(low), 0.0, low)
+            high = np.where(present & np.isnan(high), np.inf, high)
+            self.low[element] = low
+            self.high[element] = high
+            self.low_index[element] = SortedIndex(low)
+            self.high_index[element] = SortedIndex(high)
+            self.present[element] = present
+        self.elements = list(self.low)
+
+    def bounds(self, element):
+        """Mínimo y máximo finitos del elemento (para los controles)"""
+        values = np.concatenate([self.low_index[element].sorted, self.high_index[element].sorted])
+        values = values[np.isfinite(values)]
+        return (float(values.min()), float(values.max())) if len(values) else (0.0, 0.0)
+
+    def _sides(self, rule):
+        """Criterios (índice, arreglo, rango) cuya conjunción define el filtro"""
+        element = rule.element
+        sides = []
+        if rule.mode == OVERLAPS:
+            # [low, high] toca [lo, hi]  <=>  low <= hi  y  high >= lo
+            sides.append((self.low_index[element], self.low[element], Range(hi=rule.hi)))
+            sides.append((self.high_index[element], self.high[element], Range(lo=rule.lo)))
+        elif rule.mode == WITHIN:
+            sides.append((self.low_index[element], self.low[element], Range(lo=rule.lo)))
+            sides.append((self.high_index[element], self.high[element], Range(hi=rule.hi)))
+        else:
+            raise ValueError(f"Modo de filtro químico desconocido: {rule.mode}")
+        return sides
+
+    def positions(self, rule):
+        """Posiciones (ascendentes) que cumplen un criterio"""
+        if rule.element not in self.low:
+            # Elemento sin datos: nadie lo especifica
+            everything = np.arange(self.size)
+            return everything if rule.mode == ABSENT else np.empty(0, dtype=np.intp)
+        if rule.mode == PRESENT:
+            return np.flatnonzero(self.present[rule.element])
+        if rule.mode == ABSENT:
+            return np.flatnonzero(~self.present[rule.element])
+        # El extremo más selectivo se resuelve por búsqueda binaria y el otro
+        # sólo se evalúa sobre sus candidatos
+        sides = sorted(self._sides(rule), key=lambda side: side[0].count(side[2]))
+        index, _, rng = sides[0]
+        positions = np.sort(index.positions(rng))
+        for _, values, rng in sides[1:]:
+            positions = positions[rng.mask(values[positions])]
+        return positions
+
+    def query(self, rules, positions=None):
+        """Posiciones que cumplen todos los criterios (dentro de positions si se da)"""
+        for rule in rules:
+            hits = self.positions(rule)
+            if positions is None:
+                positions = hits
+            else:
+                positions = positions[np.isin(positions, hits, assume_unique=True)]
+            if len(positions) == 0:
+                break
+        if positions is None:
+            positions = np.arange(self.size)
+        return positions
@@ -0,0 +1,108 @@
+# CLI por lotes: evalúa un archivo de consultas sobre el catálogo
+#
+# Uso:
+#   python -m aceros consultas.jsonl -o resultados.jsonl
+#   python -m aceros consultas.csv --data steel_data.csv -o resultados.csv
+#
+# Una consulta inválida se reporta (con su línea) y se omite; el resto se
+# evalúa igual y la salida termina con código 1.
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+from .query import RESULT_COLUMNS, evaluate_batch, open_catalog, parse_query, result_records
+
+
+def read_records(path):
+    """(línea, registro) de cada consulta en JSONL o CSV (según la extensión)
+
+    Una línea JSON inválida se devuelve como la excepción en lugar del registro.
+    """
+    records = []
+    with open(path, encoding='utf-8', newline='') as handle:
+        if path.lower().endswith('.csv'):
+            reader = csv.DictReader(handle)
+            line = reader.line_num + 1
+            for record in reader:
+                # Primera línea del registro (una celda puede ocupar varias)
+                records.append((max(line, 2), record))
+                line = reader.line_num + 1
+            return records
+        for line, text in enumerate(handle, start=1):
+            if not text.strip():
+                continue
+            try:
+                records.append((line, json.loads(text)))
+            except ValueError as error:
+                records.append((line, error))
+    return records
+
+
+def write_results(records, handle, fmt):
+    if fmt == 'csv':
+        writer = csv.DictWriter(handle, fieldnames=['query_id', 'rank', 'score'] + RESULT_COLUMNS,
+                                extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(records)
+    else:
+        for record in records:
+            handle.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m aceros',
+        description="Evalúa por lotes consultas de selección de aceros (modo simple o rangos técnicos)."
+    )
+    parser.add_argument('queries', help="Archivo de consultas (.jsonl o .csv)")
+    parser.add_argument('--data', default='steel_data.csv', help="CSV del catálogo (default: %(default)s)")
+    parser.add_argument('-o', '--output', help="Archivo de salida (default: salida estándar)")
+    parser.add_argument('--format', choices=['jsonl', 'csv'],
+                        help="Formato de salida (default: según la extensión de --output, o jsonl)")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    for path in (args.data, args.queries):
+        if not os.path.isfile(path):
+            parser.error(f"no existe el archivo: {path}")
+    fmt = args.format or ('csv' if (args.output or '').lower().endswith('.csv') else 'jsonl')
+
+    start = time.perf_counter()
+    # Lectura de una sola vez: sin publicar segmentos compartidos junto a los datos
+    catalog = open_catalog(args.data, shared=False)
+    query_ids, queries, failed = [], [], 0
+    for number, (line, record) in enumerate(read_records(args.queries), start=1):
+        try:
+            if isinstance(record, Exception):
+                raise record
+            if not isinstance(record, dict):
+                raise TypeError("se esperaba un objeto JSON")
+            queries.append(parse_query(catalog, record))
+        except (KeyError, TypeError, ValueError) as error:
+            print(f"{args.queries}:{line}: consulta inválida, se omite: {error}", file=sys.stderr)
+            failed += 1
+            continue
+        query_ids.append(record.get('id') or number)
+    answers = evaluate_batch(catalog, queries)
+
+    results = []
+    for query_id, (positions, scores) in zip(query_ids, answers):
+        results.extend(result_records(catalog, query_id, positions, scores))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8', newline='') as handle:
+            write_results(results, handle, fmt)
+    else:
+        write_results(results, sys.stdout, fmt)
+
+    elapsed = time.perf_counter() - start
+    print(f"{len(queries)} consultas sobre {len(catalog)} aceros en {elapsed:.2f} s"
+          + (f" ({failed} inválidas omitidas)" if failed else ""), file=sys.stderr)
+    return 1 if failed else 0
@@ -0,0 +1,135 @@
+# Comparación de muchos aceros a la vez
+# Índice (grado, condición) -> posición de fila y matrices de propiedades y
+# distancias calculadas en una sola pasada vectorizada
+
+import numpy as np
+import pandas as pd
+
+COMPARE_KEYS = ('uts', 'ys', 'hb', 'elong', 'c_avg')
+# Máximo de aceros en una comparación (la matriz de distancias es M×M)
+MAX_COMPARE = 60
+
+
+class VariantIndex:
+    """(grado, condición) -> posiciones de fila
+
+    Los textos se resuelven con diccionarios a códigos enteros y el par se
+    combina en una sola llave int64 ordenada: buscar muchos pares es un
+    searchsorted, sin recorrer el DataFrame por cada acero. No guarda el
+    catálogo: tras una recarga la versión anterior se puede soltar.
+    """
+
+    def __init__(self, catalog, column='Condition'):
+        self.version = catalog.version
+        self.grade_codes = dict(catalog.grade_codes)
+        size = catalog.size
+        # Código de grado por fila a partir de los grupos del catálogo
+        grade_codes = np.empty(size, dtype=np.int64)
+        counts = np.diff(catalog.grade_starts)
+        grade_codes[catalog.grade_order] = np.repeat(np.arange(len(counts)), counts)
+        if column in catalog.df.columns:
+            condition_codes, conditions = pd.factorize(catalog.df[column])
+        else:
+            condition_codes, conditions = np.full(size, -1), []
+        self.conditions = [str(value) for value in conditions]
+        self.condition_codes = {name: code for code, name in enumerate(self.conditions)}
+        self.width = len(self.conditions) + 1
+
+        # Sin condición (-1) se guarda como código 0; las demás se desplazan en 1
+        keys = grade_codes * self.width + (np.asarray(condition_codes, dtype=np.int64) + 1)
+        self.order = np.argsort(keys, kind='stable')
+        self.keys = keys[self.order]
+        self.row_conditions = np.asarray(condition_codes)
+
+    def _key(self, grade, condition):
+        grade_code = self.grade_codes.get(str(grade))
+        if grade_code is None:
+            return None
+        if condition is None:
+            return grade_code * self.width
+        condition_code = self.condition_codes.get(condition)
+        if condition_code is None:
+            return None
+        return grade_code * self.width + condition_code + 1
+
+    def positions(self, grade, condition):
+        """Todas las filas de un par (normalmente una)"""
+        key = self._key(grade, condition)
+        if key is None:
+            return np.empty(0, dtype=np.intp)
+        left, right = np.searchsorted(self.keys, [key, key + 1])
+        return np.sort(self.order[left:right])
+
+    def lookup(self, pairs):
+        """Primera fila de cada par (grado, condición); -1 si no existe"""
+        keys = [self._key(grade, condition) for grade, condition in pairs]
+        keys = np.array([-1 if key is None else key for key in keys], dtype=np.int64)
+        result = np.full(len(keys), -1, dtype=np.intp)
+        if len(self.keys) == 0:
+            return result
+        found = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        hit = self.keys[found] == keys
+        result[hit] = self.order[found[hit]]
+        return result
+
+    def variants(self, grade):
+        """Condiciones disponibles de un grado: lista de (condición, posición)"""
+        grade_code = self.grade_codes.get(str(grade))
+        if grade_code is None:
+            return []
+        # Las llaves de un grado forman un tramo contiguo; en orden de fila
+        left, right = np.searchsorted(self.keys, [grade_code * self.width, (grade_code + 1) * self.width])
+        rows = np.sort(self.order[left:right])
+        codes = self.row_conditions[rows]
+        return [(self.conditions[code] if code >= 0 else None, int(row)) for code, row in zip(codes, rows)]
+
+
+def variant_labels(catalog, positions):
+    """Etiquetas cortas 'grado · tratamiento', numeradas si se repiten"""
+    df = catalog.df
+    # Sólo se materializan las filas pedidas, no la columna completa
+    grades = df['SAE Grade'].iloc[positions].to_numpy() if 'SAE Grade' in df.columns else positions
+    treatments = df['Condition_simple'].iloc[positions].to_numpy() if 'Condition_simple' in df.columns else [''] * len(positions)
+    labels, seen = [], {}
+    for grade, treatment in zip(grades, treatments):
+        label = f"{grade} · {treatment}"
+        seen[label] = seen.get(label, 0) + 1
+        labels.append(label if seen[label] == 1 else f"{label} ({seen[label]})")
+    return labels
+
+
+# ==================== MATRICES ====================
+def property_matrix(catalog, positions, keys=COMPARE_KEYS):
+    """(claves presentes, matriz M×K de valores)"""
+    keys = [key for key in keys if key in catalog.values]
+    positions = np.asarray(positions, dtype=np.intp)
+    matrix = np.column_stack([catalog.values[key][positions] for key in keys]) if keys \
+        else np.empty((len(positions), 0))
+    return keys, matrix
+
+
+def distance_matrix(catalog, keys, matrix, weights=None):
+    """Distancias M×M normalizadas por la dispersión de cada propiedad
+
+    Con datos faltantes se promedia sobre las propiedades que ambos tienen y
+    se reescala al total de propiedades (comparable entre pares).
+    """
+    spread = np.array([catalog.spread[key] for key in keys])
+    w = np.array([1.0 if weights is None else float(weights.get(key, 1.0)) for key in keys])
+    scaled = matrix / spread
+    diff = scaled[:, None, :] - scaled[None, :, :]
+    squared = w * diff * diff
+    valid = ~np.isnan(squared)
+    total = np.where(valid, squared, 0.0).sum(axis=2)
+    weight = (w * valid).sum(axis=2)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        distances = np.sqrt(total / weight * w.sum())
+    return np.where(weight > 0, distances, np.nan)
+
+
+def normalized_profile(catalog, keys, matrix):
+    """Valores escalados a 0–1 con el mínimo y máximo del catálogo (para el radar)"""
+    low = np.array([catalog.indexes[key].min() for key in keys])
+    high = np.array([catalog.indexes[key].max() for key in keys])
+    span = np.where(high > low, high - low, 1.0)
+    return np.clip((matrix - low) / span, 0.0, 1.0)
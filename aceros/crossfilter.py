@@ -0,0 +1,74 @@
+# Histogramas enlazados (estilo crossfilter)
+# Cada propiedad se discretiza una sola vez en códigos de bin por fila. Un
+# filtro (brush) sobre una propiedad es una tabla bin -> permitido; recontar
+# todas las demás es un bincount sobre las filas que pasan los otros filtros.
+# Al navegador sólo viajan los conteos por bin.
+
+import numpy as np
+
+CROSSFILTER_KEYS = ('uts', 'ys', 'hb', 'elong', 'c_avg')
+BINS = 40
+
+
+class BinnedCube:
+    """Códigos de bin por fila y propiedad; el bin extra (== bins) es "sin dato" """
+
+    def __init__(self, catalog, keys=CROSSFILTER_KEYS, bins=BINS):
+        self.version = catalog.version
+        self.size = catalog.size
+        self.bins = bins
+        self.keys = []
+        self.edges = {}
+        self.codes = {}
+        self.totals = {}
+        dtype = np.uint8 if bins < 255 else np.uint16
+        for key in keys:
+            if key not in catalog.values:
+                continue
+            low, high = catalog.indexes[key].min(), catalog.indexes[key].max()
+            if not np.isfinite(low):
+                continue
+            if high <= low:
+                high = low + 1.0
+            edges = np.linspace(low, high, bins + 1)
+            values = catalog.values[key]
+            codes = np.clip(np.searchsorted(edges, values, side='right') - 1, 0, bins - 1)
+            codes[np.isnan(values)] = bins
+            self.keys.append(key)
+            self.edges[key] = edges
+            self.codes[key] = codes.astype(dtype)
+            self.totals[key] = np.bincount(self.codes[key], minlength=bins + 1)[:bins]
+
+    def _allowed(self, first, last):
+        """Tabla bin -> permitido para los bins first..last (inclusive)"""
+        allowed = np.zeros(self.bins + 1, dtype=bool)
+        allowed[first:last + 1] = True
+        return allowed
+
+    def counts(self, brushes):
+        """Conteos por bin de cada propiedad bajo los filtros de las demás
+
+        brushes: dict clave -> (primer bin, último bin). El filtro de una
+        propiedad no recorta su propio histograma (como en crossfilter).
+        Devuelve (dict clave -> conteos, filas que pasan todos los filtros).
+        """
+        active = {key: bounds for key, bounds in brushes.items()
+                  if key in self.codes and tuple(bounds) != (0, self.bins - 1)}
+        # Por fila, cuántos filtros no pasa; con un solo fallo se sabe cuál
+        failed = np.zeros(self.size, dtype=np.uint8)
+        outside = {}
+        for key, (first, last) in active.items():
+            outside[key] = ~self._allowed(first, last)[self.codes[key]]
+            failed += outside[key]
+        passing = failed == 0
+
+        counts = {}
+        for key in self.keys:
+            rows = passing | (outside[key] & (failed == 1)) if key in outside else passing
+            counts[key] = np.bincount(self.codes[key][rows], minlength=self.bins + 1)[:self.bins]
+        return counts, int(np.count_nonzero(passing))
+
+    def centers(self, key):
+        """Centro de cada bin"""
+        edges = self.edges[key]
+        return (edges[:-1] + edges[1:]) / 2
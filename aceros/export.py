@@ -0,0 +1,71 @@
+# Exportación de resultados
+# Serializa por bloques de filas directamente desde el catálogo (sin copiar
+# el DataFrame filtrado completo) en CSV, CSV comprimido o Parquet
+
+import gzip
+import io
+
+EXPORT_CHUNK_ROWS = 20_000
+
+# Formato -> (etiqueta, MIME, extensión)
+EXPORT_FORMATS = {
+    'csv': ("CSV", "text/csv", ".csv"),
+    'csv.gz': ("CSV comprimido (gzip)", "application/gzip", ".csv.gz"),
+    'parquet': ("Parquet", "application/vnd.apache.parquet", ".parquet"),
+}
+
+
+def iter_row_chunks(catalog, positions, columns, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Bloques de filas (sólo las columnas pedidas) en el orden de positions"""
+    frame = catalog.df[list(columns)]
+    for start in range(0, len(positions), chunk_rows):
+        yield frame.iloc[positions[start:start + chunk_rows]]
+
+
+def _write_csv(chunks, handle):
+    header = True
+    for chunk in chunks:
+        handle.write(chunk.to_csv(index=False, header=header).encode('utf-8'))
+        header = False
+
+
+def _write_parquet(chunks, handle, empty):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    for chunk in chunks:
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(handle, table.schema, compression='zstd')
+        writer.write_table(table)
+    if writer is None:
+        # Sin filas: archivo válido con el esquema de las columnas
+        table = pa.Table.from_pandas(empty, preserve_index=False)
+        writer = pq.ParquetWriter(handle, table.schema)
+    writer.close()
+
+
+def write_export(catalog, positions, columns, fmt, handle):
+    """Escribe la exportación en handle (binario) bloque por bloque"""
+    chunks = iter_row_chunks(catalog, positions, columns)
+    if fmt == 'csv':
+        _write_csv(chunks, handle)
+    elif fmt == 'csv.gz':
+        with gzip.GzipFile(fileobj=handle, mode='wb', compresslevel=6) as zipped:
+            _write_csv(chunks, zipped)
+    elif fmt == 'parquet':
+        _write_parquet(chunks, handle, catalog.df[list(columns)].iloc[:0])
+    else:
+        raise ValueError(f"Formato de exportación desconocido: {fmt}")
+
+
+def export_bytes(catalog, positions, columns, fmt='csv'):
+    """Contenido del archivo exportado"""
+    buffer = io.BytesIO()
+    write_export(catalog, positions, columns, fmt, buffer)
+    return buffer.getvalue()
+
+
+def export_file_name(stem, fmt):
+    return stem + EXPORT_FORMATS[fmt][2]
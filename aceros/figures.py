@@ -0,0 +1,274 @@
+# Figuras del modo Explorar
+# Agregación del lado del servidor para que el payload enviado al navegador
+# quede acotado sin importar el tamaño del catálogo
+
+import numpy as np
+import plotly.graph_objects as go
+from plotly.colors import qualitative
+
+# Puntos crudos máximos por traza; arriba de esto se submuestrea con LTTB
+MAX_POINTS = 2_000
+# A partir de cuántos puntos se usa WebGL (Scattergl)
+WEBGL_THRESHOLD = 1_000
+CARBON_BINS = 40
+
+# Clave, etiqueta, factor de escala y color de cada propiedad graficada vs %C
+CARBON_SERIES = [
+    ('uts', 'UTS', 1, '#3B82F6'),
+    ('ys', 'YS', 1, '#10B981'),
+    ('hb', 'Dureza (×4)', 4, '#EF4444'),
+    ('elong', 'Elongación (×20)', 20, '#F59E0B'),
+]
+
+
+# ==================== SUBMUESTREO ====================
+def lttb(x, y, threshold):
+    """Índices elegidos por Largest-Triangle-Three-Buckets (x debe venir ordenado)"""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    every = (n - 2) / (threshold - 2)
+    edges = np.floor(np.arange(threshold - 1) * every).astype(np.intp) + 1
+    edges[-1] = n - 1
+    selected = np.empty(threshold, dtype=np.intp)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        # Promedio del siguiente bucket (o el último punto)
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        # Triángulo de mayor área con el punto anterior y el promedio siguiente
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+# ==================== AGREGACIÓN POR CARBONO ====================
+def binned_profile(x, y, bins=CARBON_BINS, quantiles=(0.25, 0.5, 0.75)):
+    """Conteo, media y cuantiles de y por intervalo de x (ignora NaN)"""
+    valid = ~(np.isnan(x) | np.isnan(y))
+    x = x[valid]
+    y = y[valid]
+    if len(x) == 0:
+        return {'x': np.empty(0), 'count': np.empty(0, dtype=np.intp), 'mean': np.empty(0)}
+    bins = max(1, min(bins, len(np.unique(x))))
+    low, high = x.min(), x.max()
+    width = (high - low) / bins or 1.0
+    codes = np.minimum(((x - low) / width).astype(np.intp), bins - 1)
+
+    count = np.bincount(codes, minlength=bins)
+    total = np.bincount(codes, weights=y, minlength=bins)
+    center = np.bincount(codes, weights=x, minlength=bins)
+    present = count > 0
+    profile = {
+        'x': center[present] / count[present],
+        'count': count[present],
+        'mean': total[present] / count[present],
+    }
+
+    # Cuantiles: orden por (bin, valor) y lectura directa de cada posición
+    order = np.lexsort((y, codes))
+    starts = np.concatenate(([0], np.cumsum(count)[:-1]))[present]
+    sizes = count[present]
+    for q in quantiles:
+        picks = starts + np.floor(q * (sizes - 1)).astype(np.intp)
+        profile[f'q{int(q * 100)}'] = y[order[picks]]
+    return profile
+
+
+def carbon_figure(catalog, max_points=MAX_POINTS, bins=CARBON_BINS):
+    """Propiedades vs %C: media por intervalo de carbono + puntos crudos acotados"""
+    fig = go.Figure()
+    if 'c_avg' not in catalog.values:
+        return fig
+
+    x_all = catalog.values['c_avg']
+    order = np.argsort(x_all, kind='stable')
+    order = order[~np.isnan(x_all[order])]
+    scatter = go.Scattergl if len(order) > WEBGL_THRESHOLD else go.Scatter
+
+    for key, name, factor, color in CARBON_SERIES:
+        if key not in catalog.values:
+            continue
+        x = x_all[order]
+        y = catalog.values[key][order] * factor
+        keep = ~np.isnan(y)
+        x, y = x[keep], y[keep]
+
+        picks = lttb(x, y, max_points)
+        fig.add_trace(scatter(
+            x=x[picks], y=y[picks],
+            mode='markers',
+            name=name,
+            legendgroup=name,
+            showlegend=False,
+            marker=dict(color=color, size=5, opacity=0.35),
+            hoverinfo='skip'
+        ))
+
+        profile = binned_profile(x, y, bins)
+        fig.add_trace(go.Scatter(
+            x=profile['x'], y=profile['mean'],
+            mode='markers+lines',
+            name=name,
+            legendgroup=name,
+            line=dict(color=color),
+            customdata=np.column_stack([profile['q25'], profile['q75'], profile['count']])
+            if len(profile['x']) else None,
+            hovertemplate=(
+                "%{y:.0f} (P25 %{customdata[0]:.0f} – P75 %{customdata[1]:.0f}, "
+                "n=%{customdata[2]})"
+            )
+        ))
+
+    fig.update_layout(
+        xaxis_title="Contenido de Carbono (%)",
+        yaxis_title="Valor",
+        hovermode='x unified',
+        height=500
+    )
+    return fig
+
+
+# ==================== TRATAMIENTOS ====================
+def treatment_box_figure(stats, key, property_choice):
+    """Cajas por tratamiento dibujadas desde el cubo de estadísticas (sin filas crudas)"""
+    fig = go.Figure()
+    colors = qualitative.Plotly
+    for i, name in enumerate(stats.treatments):
+        cell = stats.cell(name, key)
+        if cell is None:
+            continue
+        color = colors[i % len(colors)]
+        fig.add_trace(go.Box(
+            x=[name],
+            q1=[cell['q1']],
+            median=[cell['median']],
+            q3=[cell['q3']],
+            lowerfence=[cell['lowerfence']],
+            upperfence=[cell['upperfence']],
+            mean=[cell['mean']],
+            sd=[cell['std']],
+            name=name,
+            marker_color=color,
+            boxpoints=False
+        ))
+        if len(cell['outliers']):
+            fig.add_trace(go.Scatter(
+                x=[name] * len(cell['outliers']),
+                y=cell['outliers'],
+                mode='markers',
+                name=name,
+                marker=dict(color=color, size=5),
+                showlegend=False
+            ))
+    fig.update_layout(
+        title=f"Distribución de {property_choice} por Tratamiento",
+        xaxis_title="Tratamiento",
+        yaxis_title=property_choice,
+        height=500,
+        showlegend=False
+    )
+    return fig
+
+
+# ==================== FRONTERA DE PARETO ====================
+def pareto_figure(catalog, x_key, y_key, front, max_points=MAX_POINTS):
+    """Nube y vs x (submuestreada) con la frontera de Pareto resaltada"""
+    fig = go.Figure()
+    if x_key not in catalog.values or y_key not in catalog.values:
+        return fig
+    x_all = catalog.values[x_key]
+    y_all = catalog.values[y_key]
+    rest = np.flatnonzero(~(np.isnan(x_all) | np.isnan(y_all)))
+    rest = np.setdiff1d(rest, front, assume_unique=True)
+    if len(rest) > max_points:
+        # Muestra fija (misma figura en cada rerun)
+        rest = np.sort(np.random.default_rng(0).choice(rest, max_points, replace=False))
+    scatter = go.Scattergl if len(rest) > WEBGL_THRESHOLD else go.Scatter
+    fig.add_trace(scatter(
+        x=x_all[rest], y=y_all[rest],
+        mode='markers',
+        name="Dominados",
+        marker=dict(color='#9CA3AF', size=5, opacity=0.4),
+        hoverinfo='skip'
+    ))
+
+    front = front[np.argsort(x_all[front], kind='stable')]
+    labels = catalog.df['SAE Grade'].iloc[front].to_numpy() if 'SAE Grade' in catalog.df.columns else None
+    fig.add_trace(go.Scatter(
+        x=x_all[front], y=y_all[front],
+        mode='markers+lines',
+        name="Frontera de Pareto",
+        line=dict(color='#EF4444', shape='vh'),
+        marker=dict(color='#EF4444', size=8),
+        text=labels,
+        hovertemplate="SAE %{text}<br>%{x} / %{y}<extra></extra>"
+    ))
+    fig.update_layout(height=500, hovermode='closest')
+    return fig
+
+
+# ==================== COMPARACIÓN ====================
+def distance_heatmap(labels, distances):
+    """Mapa de calor de distancias normalizadas entre pares de aceros"""
+    fig = go.Figure(go.Heatmap(
+        z=np.round(distances, 3), x=labels, y=labels,
+        colorscale='Viridis', reversescale=True,
+        colorbar=dict(title="Distancia"),
+        hovertemplate="%{y}<br>%{x}<br>Distancia %{z}<extra></extra>"
+    ))
+    size = max(400, min(1200, 22 * len(labels) + 200))
+    fig.update_layout(height=size, yaxis=dict(autorange='reversed'))
+    return fig
+
+
+def radar_figure(labels, axis_labels, profile):
+    """Perfil normalizado (0–1 del catálogo) de cada acero en un radar"""
+    fig = go.Figure()
+    colors = qualitative.Plotly
+    theta = list(axis_labels) + [axis_labels[0]] if len(axis_labels) else []
+    for i, (label, row) in enumerate(zip(labels, profile)):
+        fig.add_trace(go.Scatterpolar(
+            r=list(row) + [row[0]] if len(row) else [],
+            theta=theta,
+            name=label,
+            line=dict(color=colors[i % len(colors)]),
+            opacity=0.8 if len(labels) <= 10 else 0.4
+        ))
+    fig.update_layout(height=550, polar=dict(radialaxis=dict(range=[0, 1])))
+    return fig
+
+
+# ==================== HISTOGRAMAS ENLAZADOS ====================
+def linked_histogram(edges, total, selected, title, first=0, last=None):
+    """Conteos por bin: total del catálogo (gris) y los que pasan los filtros"""
+    centers = (edges[:-1] + edges[1:]) / 2
+    width = edges[1] - edges[0]
+    last = len(centers) - 1 if last is None else last
+    inside = (np.arange(len(centers)) >= first) & (np.arange(len(centers)) <= last)
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=centers, y=total, width=width,
+        name="Catálogo",
+        marker=dict(color='#E5E7EB'),
+        hoverinfo='skip'
+    ))
+    fig.add_trace(go.Bar(
+        x=centers, y=selected, width=width,
+        name="Seleccionados",
+        marker=dict(color=np.where(inside, '#3B82F6', '#93C5FD').tolist()),
+        hovertemplate="%{x:.3g}: %{y}<extra></extra>"
+    ))
+    fig.update_layout(
+        title=title, barmode='overlay', bargap=0.05, showlegend=False,
+        height=260, margin=dict(l=10, r=10, t=40, b=10)
+    )
+    return fig
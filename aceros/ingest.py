@@ -0,0 +1,401 @@
+# Ingesta del CSV de aceros
+# Lectura por bloques con tipos explícitos, normalización de textos y
+# snapshot columnar (Arrow IPC sin compresión, mapeable en memoria)
+
+import hashlib
+import io
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+# ==================== ESQUEMA ====================
+TEXT_COLUMNS = ['SAE Grade', 'Conditions']
+MECHANICAL_COLUMNS = ['UTS (MPa)', 'YS (MPa)', 'Elongation (%)', 'Hardness (HB)']
+COMPOSITION_COLUMNS = [
+    'C (Min)', 'C (Max)', 'Mn (Min)', 'Mn (Max)', 'P (Min)', 'P (Max)',
+    'S (Min)', 'S(Max)', 'Si (Min)', 'Si (Max)', 'Ni (Min)', 'Ni (Max)',
+    'Cr (Min)', 'Cr (Max)', 'Mo (Min)', 'Mo (Max)', 'Ti (Min)', 'Ti (Max)',
+]
+NUMERIC_COLUMNS = MECHANICAL_COLUMNS + COMPOSITION_COLUMNS
+# Nombres que usa la aplicación
+RENAME = {'Conditions': 'Condition'}
+
+CHUNK_SIZE = 50_000
+CACHE_DIR = '.aceros_cache'
+# Incrementar cuando cambien columnas o normalización para invalidar snapshots
+SNAPSHOT_SCHEMA = 3
+# Versión de los datos de ejemplo (sin archivo)
+SAMPLE_VERSION = 'ejemplo'
+# La composición (%) se guarda en float32; al leerla en float64 se redondea a
+# estos decimales para recuperar el valor exacto del CSV (trae a lo sumo 3)
+COMPOSITION_DECIMALS = 4
+
+_NUMBER = re.compile(r'^\s*(-?\d+(?:[.,]\d+)?)')
+
+# ==================== NORMALIZACIÓN ====================
+# Errores de captura/OCR frecuentes en las hojas de proveedores
+_TYPOS = {
+    'cold orawn': 'cold drawn',
+    'hot rotted': 'hot rolled',
+    'oi i quenched': 'oil quenched',
+}
+
+_CONDITION_RULES = [
+    # Saltos de línea (celdas multilínea entre comillas) y espacios dobles
+    (re.compile(r'\s+'), ' '),
+    # Mojibake del símbolo de grado
+    (re.compile('\ufffd|\u00c2\u00b0|\u00ba'), '°'),
+    # Fahrenheit mal capturado: (1525 T), (1675 'T), (1600 ), (1560°F)
+    (re.compile(r"(\d)\s*(?:°\s*F|'\s*T|°\s*T|T)?\s*\)"), r'\1 °F)'),
+    # 860°C -> 860 °C
+    (re.compile(r'(\d)\s*°\s*C'), r'\1 °C'),
+]
+
+
+def normalize_condition(text):
+    """Limpia una descripción de tratamiento"""
+    if not isinstance(text, str):
+        return text
+    text = text.strip()
+    for pattern, repl in _CONDITION_RULES:
+        text = pattern.sub(repl, text)
+    text = text.lower()
+    for wrong, right in _TYPOS.items():
+        text = text.replace(wrong, right)
+    text = text.replace('°c', '°C').replace('°f', '°F')
+    return text[:1].upper() + text[1:]
+
+
+def _normalize_conditions(series, memo):
+    """Normaliza sólo los valores distintos del bloque (memo compartido entre bloques)"""
+    for value in series.dropna().unique():
+        if value not in memo:
+            memo[value] = normalize_condition(value)
+    return series.map(memo)
+
+
+def _to_number(series):
+    """Convierte texto a número; rescata valores como '269 HRB' o '40,2'"""
+    numbers = pd.to_numeric(series, errors='coerce')
+    dirty = numbers.isna() & series.notna()
+    if dirty.any():
+        extracted = series[dirty].str.extract(_NUMBER, expand=False).str.replace(',', '.')
+        numbers[dirty] = pd.to_numeric(extracted, errors='coerce')
+    return numbers.astype(np.float64)
+
+
+# ==================== LECTURA POR BLOQUES ====================
+def iter_chunks(path, chunksize=CHUNK_SIZE):
+    """Genera bloques ya tipados y normalizados del CSV"""
+    wanted = set(TEXT_COLUMNS + NUMERIC_COLUMNS)
+    reader = pd.read_csv(
+        path,
+        usecols=lambda column: column.strip() in wanted,
+        dtype=str,
+        chunksize=chunksize,
+        encoding='utf-8',
+        encoding_errors='replace',
+        skipinitialspace=True,
+        na_values=[''],
+    )
+    memo = {}
+    for chunk in reader:
+        chunk.columns = [column.strip() for column in chunk.columns]
+        for column in NUMERIC_COLUMNS:
+            if column in chunk.columns:
+                chunk[column] = _to_number(chunk[column])
+        if 'SAE Grade' in chunk.columns:
+            chunk['SAE Grade'] = chunk['SAE Grade'].str.strip()
+        if 'Conditions' in chunk.columns:
+            chunk['Conditions'] = _normalize_conditions(chunk['Conditions'], memo)
+        yield chunk.rename(columns=RENAME)
+
+
+def read_catalog_csv(path, chunksize=CHUNK_SIZE):
+    """Lee el CSV completo por bloques"""
+    chunks = list(iter_chunks(path, chunksize))
+    if not chunks:
+        return pd.DataFrame(columns=[RENAME.get(c, c) for c in TEXT_COLUMNS + NUMERIC_COLUMNS])
+    return pd.concat(chunks, ignore_index=True)
+
+
+# ==================== COLUMNAS DERIVADAS ====================
+# Descripciones ya normalizadas: "Oil quenched from 830 °C (1525 °F) and
+# tempered at 540 °C (1000 °F)", "Normalized at 870 °C (1600 °F)", "Cold drawn"
+_QUENCH = re.compile(r'^(?P<medium>\w+) quenched from (?P<austenitize>\d+(?:\.\d+)?) °C', re.IGNORECASE)
+_TEMPER = re.compile(r'tempered at (?P<temper>\d+(?:\.\d+)?) °C', re.IGNORECASE)
+_HEATED_AT = re.compile(r'^(?P<process>.+?) at (?P<austenitize>\d+(?:\.\d+)?) °C', re.IGNORECASE)
+
+# Columnas del tratamiento térmico estructurado
+TREATMENT_COLUMNS = ['Process', 'Quench medium', 'Austenitize (°C)', 'Temper (°C)', 'Condition_simple']
+
+
+def parse_conditions(conditions):
+    """Tabla de parámetros de tratamiento, una fila por descripción distinta
+
+    Se analiza una sola vez cada texto distinto (con expresiones vectorizadas
+    de pandas) y el resultado se expande por código categórico.
+    """
+    conditions = pd.Series(conditions, dtype=object)
+    quench = conditions.str.extract(_QUENCH)
+    temper = conditions.str.extract(_TEMPER)['temper']
+    heated = conditions.str.extract(_HEATED_AT)
+
+    medium = quench['medium'].str.capitalize()
+    quenched = medium.notna()
+    tempered = temper.notna()
+    process = conditions.where(heated['process'].isna(), heated['process']).str.strip()
+    process = process.mask(quenched & tempered, 'Quenched and tempered')
+    process = process.mask(quenched & ~tempered, 'Quenched')
+    simple = process.mask(quenched, medium + ' ' + process.str.lower())
+
+    return pd.DataFrame({
+        'Process': process,
+        'Quench medium': medium,
+        'Austenitize (°C)': pd.to_numeric(quench['austenitize'].fillna(heated['austenitize'])),
+        'Temper (°C)': pd.to_numeric(temper),
+        'Condition_simple': simple,
+    })
+
+
+def add_derived_columns(df):
+    """Agrega C_avg y los parámetros del tratamiento y compacta los tipos de columna"""
+    # Calcular C_avg
+    if 'C (Min)' in df.columns and 'C (Max)' in df.columns:
+        df['C_avg'] = (df['C (Min)'] + df['C (Max)']) / 2
+
+    # Tratamientos como categóricas: se analiza cada descripción distinta una vez
+    if 'Condition' in df.columns:
+        condition = df['Condition'].astype('category')
+        df['Condition'] = condition
+        parsed = parse_conditions(condition.cat.categories)
+        codes = condition.cat.codes.to_numpy()
+        for column in TREATMENT_COLUMNS:
+            values = parsed[column]
+            if pd.api.types.is_numeric_dtype(values):
+                taken = values.to_numpy(dtype=np.float64)[codes]
+                df[column] = np.where(codes >= 0, taken, np.nan)
+            else:
+                labels = values.astype('category')
+                df[column] = pd.Categorical.from_codes(
+                    np.where(codes >= 0, labels.cat.codes.to_numpy()[codes], -1),
+                    labels.cat.categories)
+
+    return compact_columns(df)
+
+
+# ==================== REPRESENTACIÓN COMPACTA ====================
+def compact_columns(df):
+    """Tipos compactos: grado como categórica y composición en float32
+
+    Las propiedades mecánicas (y las demás indexadas) se quedan en float64:
+    el catálogo usa esas mismas columnas como arreglos de valores sin
+    copiarlas, y los índices, filtros y puntajes trabajan en float64. En
+    float32 habría que guardar además una copia float64 (12 bytes por valor
+    en vez de 8), e int16 no admite valores faltantes.
+    """
+    if 'SAE Grade' in df.columns and not isinstance(df['SAE Grade'].dtype, pd.CategoricalDtype):
+        df['SAE Grade'] = df['SAE Grade'].astype('category')
+    for column in COMPOSITION_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype(np.float32)
+    return df
+
+
+def float_values(series):
+    """Columna numérica como float64 (la composición compacta vuelve a su valor exacto)"""
+    values = series.to_numpy(dtype=np.float64)
+    if series.dtype == np.float32:
+        values = np.round(values, COMPOSITION_DECIMALS)
+    return values
+
+
+def dataset_version(path):
+    """Identificador de versión del dataset (cambia al modificar el archivo)"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return SAMPLE_VERSION
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+# ==================== SNAPSHOT ====================
+def file_digest(path, block_size=1 << 20):
+    """SHA-256 del archivo leído por bloques"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def snapshot_paths(path, cache_dir=None):
+    cache_dir = cache_dir or os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f'{stem}.arrow'), os.path.join(cache_dir, f'{stem}.json')
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, encoding='utf-8') as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_atomic(path, writer):
+    tmp = f'{path}.tmp{os.getpid()}'
+    writer(tmp)
+    os.replace(tmp, path)
+
+
+def load_table(path, cache_dir=None):
+    """Carga el dataset desde el snapshot si sigue vigente; si no, re-parsea el CSV
+
+    El snapshot es válido si coinciden mtime y tamaño del CSV o, cuando sólo
+    cambió el mtime, si coincide su hash.
+    """
+    snapshot, meta_path = snapshot_paths(path, cache_dir)
+    stat = os.stat(path)
+    meta = _read_meta(meta_path)
+    fresh = None
+    if meta and meta.get('schema') == SNAPSHOT_SCHEMA and os.path.exists(snapshot):
+        if meta.get('mtime_ns') == stat.st_mtime_ns and meta.get('size') == stat.st_size:
+            fresh = meta
+        elif meta.get('size') == stat.st_size and meta.get('sha256') == file_digest(path):
+            fresh = dict(meta, mtime_ns=stat.st_mtime_ns)
+            try:
+                _write_meta(meta_path, fresh)
+            except OSError:
+                pass
+    if fresh is not None:
+        try:
+            return read_snapshot(snapshot)
+        except ImportError:
+            pass
+        except (OSError, ValueError):
+            # Snapshot truncado o corrupto (ArrowInvalid es ValueError): se rehace
+            discard_snapshot(snapshot)
+
+    df = read_catalog_csv(path)
+    write_snapshot(df, path, stat, cache_dir)
+    return df
+
+
+def discard_snapshot(snapshot):
+    """Borra un snapshot inservible; se vuelve a escribir tras leer el CSV"""
+    try:
+        os.remove(snapshot)
+    except OSError:
+        pass
+
+
+def read_snapshot(snapshot):
+    """Lee el snapshot mapeando el archivo en memoria
+
+    El mapeo evita el búfer intermedio de lectura, pero to_pandas copia cada
+    columna una vez a memoria propia del DataFrame: el mapa se libera al
+    volver y el catálogo no depende del archivo (que puede reescribirse).
+    """
+    from pyarrow import feather
+    return feather.read_table(snapshot, memory_map=True).to_pandas()
+
+
+def _write_meta(meta_path, meta):
+    def writer(tmp):
+        with open(tmp, 'w', encoding='utf-8') as handle:
+            json.dump(meta, handle)
+    _write_atomic(meta_path, writer)
+
+
+def write_snapshot(df, path, stat=None, cache_dir=None, sha256=None, size=None):
+    """Escribe el snapshot Arrow y sus metadatos; un fallo aquí no impide cargar
+
+    size (con sha256): bytes del prefijo del CSV que cubre el snapshot, si no
+    es el archivo completo.
+    """
+    snapshot, meta_path = snapshot_paths(path, cache_dir)
+    stat = stat or os.stat(path)
+    try:
+        os.makedirs(os.path.dirname(snapshot), exist_ok=True)
+        _write_atomic(snapshot, lambda tmp: df.reset_index(drop=True).to_feather(tmp, compression='uncompressed'))
+        _write_meta(meta_path, {
+            'schema': SNAPSHOT_SCHEMA,
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size if size is None else size,
+            'sha256': sha256 or file_digest(path),
+            'rows': len(df),
+        })
+    except (OSError, ImportError):
+        # Directorio de sólo lectura o sin pyarrow: se sigue con el CSV
+        return None
+    return snapshot
+
+
+# ==================== AGREGADOS INCREMENTALES ====================
+def complete_records(data):
+    """Bytes de data hasta el último registro CSV completo
+
+    Corta en el último salto de línea fuera de comillas (las celdas pueden
+    tener saltos de línea); lo que sigue es un registro a medio escribir.
+    """
+    raw = np.frombuffer(data, dtype=np.uint8)
+    newlines = np.flatnonzero(raw == ord('\n'))
+    quotes = np.cumsum(raw == ord('"'))
+    closed = newlines[quotes[newlines] % 2 == 0]
+    return data[:closed[-1] + 1] if len(closed) else b''
+
+
+def read_appended(path, rows, cache_dir=None, block_size=1 << 20):
+    """Filas agregadas al final del CSV desde el último snapshot
+
+    rows es el número de filas que se tenían. Devuelve un DataFrame sólo con
+    las filas nuevas (y actualiza el snapshot), o None si el archivo cambió
+    de otra forma (filas editadas o borradas): entonces hay que leerlo completo.
+
+    Sólo se toman registros completos hasta el tamaño revisado: un registro a
+    medio escribir (o una última línea sin salto) queda para la siguiente
+    lectura, porque el snapshot registra cuántos bytes cubre.
+    """
+    snapshot, meta_path = snapshot_paths(path, cache_dir)
+    meta = _read_meta(meta_path)
+    stat = os.stat(path)
+    if (not meta or meta.get('schema') != SNAPSHOT_SCHEMA or meta.get('rows') != rows
+            or not os.path.exists(snapshot) or stat.st_size <= meta.get('size', 0)):
+        return None
+
+    # El prefijo debe ser idéntico al archivo del snapshot y terminar en salto de línea
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        header = handle.readline()
+        handle.seek(0)
+        remaining, last = meta['size'], b''
+        while remaining:
+            block = handle.read(min(block_size, remaining))
+            if not block:
+                return None
+            digest.update(block)
+            remaining -= len(block)
+            last = block[-1:]
+        if digest.hexdigest() != meta['sha256'] or last != b'\n':
+            return None
+        tail = complete_records(handle.read(stat.st_size - meta['size']))
+    digest.update(tail)
+
+    delta = read_catalog_csv(io.BytesIO(header + tail))
+    if not tail:
+        return delta
+    try:
+        previous = read_snapshot(snapshot)
+    except ImportError:
+        return delta
+    except (OSError, ValueError):
+        # La próxima carga completa reescribe el snapshot
+        discard_snapshot(snapshot)
+        return delta
+    write_snapshot(pd.concat([previous, delta], ignore_index=True), path, stat, cache_dir,
+                   sha256=digest.hexdigest(), size=meta['size'] + len(tail))
+    return delta
@@ -0,0 +1,132 @@
+# Memoria por sesión
+# Cuenta los bytes propios de lo que cada sesión guarda en su estado (valores
+# de widgets, selecciones, etc.). Los arreglos que son vistas de datos
+# compartidos (catálogo, caché de consultas) no cuentan: ya los paga el
+# proceso una sola vez. Con un presupuesto por sesión se estima cuántas
+# sesiones caben en un nodo: (memoria - compartido) / presupuesto.
+#
+# El presupuesto crece con el catálogo: una sesión puede tener legítimamente
+# un resultado del tamaño del catálogo (posición + puntaje + marca por fila).
+
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+from . import metrics
+
+# Presupuesto mínimo por sesión (MB), configurable con ACEROS_SESSION_MB
+DEFAULT_BUDGET_MB = 8
+# Bytes por fila del catálogo que se suman al presupuesto
+BYTES_PER_ROW = 16
+# Sesiones sin rerun en este tiempo dejan de contarse
+SESSION_TTL_S = 3600.0
+
+
+def owned_bytes(value, skip=(), _seen=None):
+    """Bytes que value mantiene vivos por sí mismo (recorre contenedores y atributos)
+
+    skip: tipos compartidos que no se cuentan (p. ej. el catálogo).
+    """
+    seen = set() if _seen is None else _seen
+    if id(value) in seen or isinstance(value, skip):
+        return 0
+    seen.add(id(value))
+    if isinstance(value, np.ndarray):
+        # Vistas y arreglos de sólo lectura (compartidos por la caché) no son de la sesión
+        return int(value.nbytes) if value.flags.owndata and value.flags.writeable else 0
+    if hasattr(value, 'memory_usage') and hasattr(value, 'iloc'):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(owned_bytes(k, skip, seen) + owned_bytes(v, skip, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(owned_bytes(item, skip, seen) for item in value)
+    elif hasattr(value, '__dict__') and not isinstance(value, type):
+        size += owned_bytes(vars(value), skip, seen)
+    return size
+
+
+class SessionMemory:
+    """Último tamaño medido por sesión y cuántas veces se pasó del presupuesto
+
+    over_budget cuenta cruces: una sesión suma uno al pasar del presupuesto y
+    no vuelve a sumar mientras siga por encima, por muchos reruns que haga.
+    """
+
+    def __init__(self, base_budget, per_row=BYTES_PER_ROW, ttl=SESSION_TTL_S):
+        self.base_budget = base_budget
+        self.per_row = per_row
+        self.budget = base_budget
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.sessions = {}
+        self._over = set()
+        self.over_budget = 0
+
+    def budget_for(self, rows):
+        """Presupuesto de una sesión sobre un catálogo de rows filas"""
+        return max(self.base_budget, self.per_row * rows)
+
+    def measure(self, state, skip=()):
+        """Bytes de cada entrada del estado de una sesión"""
+        seen = set()
+        return {key: owned_bytes(value, skip, seen) for key, value in state.items()}
+
+    def observe(self, session, state, rows=0, skip=()):
+        """Mide la sesión y la registra; devuelve (bytes, presupuesto)"""
+        total = sum(self.measure(state, skip).values())
+        budget = self.budget_for(rows)
+        now = time.monotonic()
+        with self._lock:
+            self.budget = budget
+            if total <= budget:
+                self._over.discard(session)
+            elif session not in self._over:
+                self._over.add(session)
+                self.over_budget += 1
+            self.sessions[session] = (total, now)
+            for old in [s for s, (_, seen) in self.sessions.items() if now - seen > self.ttl]:
+                del self.sessions[old]
+                self._over.discard(old)
+        return total, budget
+
+    def stats(self):
+        with self._lock:
+            sizes = [size for size, _ in self.sessions.values()]
+            return {
+                'sessions': len(sizes),
+                'bytes': sum(sizes),
+                'max_bytes': max(sizes, default=0),
+                'budget_bytes': self.budget,
+                'over_budget': self.over_budget,
+            }
+
+    def render(self):
+        """Líneas de Prometheus con la memoria de las sesiones activas"""
+        stats = self.stats()
+        lines = ['# HELP aceros_session_bytes Memoria propia de las sesiones activas.',
+                 '# TYPE aceros_session_bytes gauge',
+                 f'aceros_session_bytes{{stat="sum"}} {stats["bytes"]}',
+                 f'aceros_session_bytes{{stat="max"}} {stats["max_bytes"]}',
+                 f'aceros_session_bytes{{stat="budget"}} {stats["budget_bytes"]}',
+                 '# TYPE aceros_sessions gauge',
+                 f'aceros_sessions {stats["sessions"]}']
+        lines += ['# TYPE aceros_session_over_budget_total counter',
+                  f'aceros_session_over_budget_total {stats["over_budget"]}']
+        return lines
+
+
+def budget_bytes():
+    try:
+        megabytes = float(os.environ.get('ACEROS_SESSION_MB', DEFAULT_BUDGET_MB))
+    except ValueError:
+        megabytes = DEFAULT_BUDGET_MB
+    return int(megabytes * 2**20)
+
+
+# Memoria de todas las sesiones del proceso
+SESSIONS = SessionMemory(budget_bytes())
+metrics.REGISTRY.register(SESSIONS.render)
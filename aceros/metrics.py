@@ -0,0 +1,213 @@
+# Instrumentación opcional por rerun
+# Tiempos por etapa, tamaño de los payloads enviados al navegador y aciertos de
+# caché. Cada rerun llena un RerunRecorder; el registro del proceso acumula
+# todos los reruns y se exporta en formato de texto de Prometheus.
+#
+# Se activa con ACEROS_METRICS=1 (o ?debug=1 en la URL de la app). Apagado,
+# cada llamada es un no-op.
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Límites (segundos) de los buckets del histograma de etapas
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_local = threading.local()
+
+
+def enabled():
+    """Instrumentación activada por variable de entorno"""
+    return os.environ.get('ACEROS_METRICS', '').lower() in ('1', 'true', 'yes')
+
+
+def payload_size(obj):
+    """Bytes aproximados que se serializan hacia el navegador"""
+    if hasattr(obj, 'to_json') and hasattr(obj, 'data'):
+        # Figura de plotly: el JSON es exactamente lo que se envía
+        return len(obj.to_json())
+    if hasattr(obj, 'memory_usage'):
+        # DataFrame: st.dataframe lo envía como Arrow
+        try:
+            import pyarrow as pa
+            return pa.Table.from_pandas(obj, preserve_index=True).nbytes
+        except ImportError:
+            return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, (bytes, bytearray, str)):
+        return len(obj)
+    return 0
+
+
+class RerunRecorder:
+    """Mediciones de un rerun (o de una petición)"""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.stages = []
+        self.payloads = {}
+        self.cache = {}
+        self.overhead = 0.0
+        self._stack = []
+        self._missed = set()
+
+    @contextmanager
+    def stage(self, name):
+        """Mide el bloque; las etapas anidadas se nombran 'padre/hijo'"""
+        if not self.enabled:
+            yield
+            return
+        self._stack.append(name)
+        path = '/'.join(self._stack)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append((path, time.perf_counter() - started))
+            self._stack.pop()
+
+    def payload(self, name, obj):
+        """Registra el tamaño de un payload (su medición cuenta como overhead)"""
+        if not self.enabled:
+            return
+        started = time.perf_counter()
+        self.payloads[name] = self.payloads.get(name, 0) + payload_size(obj)
+        self.overhead += time.perf_counter() - started
+
+    @contextmanager
+    def cached_call(self, name):
+        """Envuelve la llamada a una función cacheada; acierto si no llamó a miss()"""
+        if not self.enabled:
+            yield
+            return
+        self._missed.discard(name)
+        try:
+            yield
+        finally:
+            hits, misses = self.cache.get(name, (0, 0))
+            if name in self._missed:
+                self.cache[name] = (hits, misses + 1)
+            else:
+                self.cache[name] = (hits + 1, misses)
+            self._missed.discard(name)
+
+    def miss(self, name):
+        """Llamar dentro del cuerpo de la función cacheada (sólo corre en un fallo)"""
+        if self.enabled:
+            self._missed.add(name)
+
+    def total(self):
+        return sum(seconds for path, seconds in self.stages if '/' not in path)
+
+
+DISABLED = RerunRecorder(enabled=False)
+
+
+def current():
+    """Recorder activo en este hilo (uno deshabilitado si no hay)"""
+    return getattr(_local, 'recorder', DISABLED)
+
+
+@contextmanager
+def activate(recorder):
+    previous = getattr(_local, 'recorder', None)
+    _local.recorder = recorder
+    try:
+        yield recorder
+    finally:
+        _local.recorder = previous
+
+
+class MetricsRegistry:
+    """Acumulado del proceso (todas las sesiones), seguro entre hilos"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self.stages = {}
+        self.payloads = {}
+        self.cache = {}
+        self.reruns = 0
+        self.overhead = 0.0
+        self.collectors = []
+
+    def register(self, collector):
+        """Agrega un colector: función sin argumentos que devuelve líneas de Prometheus"""
+        self.collectors.append(collector)
+
+    def record(self, recorder):
+        with self._lock:
+            self.reruns += 1
+            self.overhead += recorder.overhead
+            for path, seconds in recorder.stages:
+                # [conteo acumulado por bucket, suma, conteo]
+                entry = self.stages.setdefault(path, [[0] * len(self.buckets), 0.0, 0])
+                for i, limit in enumerate(self.buckets):
+                    if seconds <= limit:
+                        entry[0][i] += 1
+                entry[1] += seconds
+                entry[2] += 1
+            for name, size in recorder.payloads.items():
+                count, total, _ = self.payloads.get(name, (0, 0, 0))
+                self.payloads[name] = (count + 1, total + size, size)
+            for name, (hits, misses) in recorder.cache.items():
+                old_hits, old_misses = self.cache.get(name, (0, 0))
+                self.cache[name] = (old_hits + hits, old_misses + misses)
+
+    def hit_rate(self, name):
+        hits, misses = self.cache.get(name, (0, 0))
+        return hits / (hits + misses) if hits + misses else None
+
+    def render(self):
+        """Texto en formato de exposición de Prometheus"""
+        with self._lock:
+            lines = [
+                '# HELP aceros_reruns_total Reruns instrumentados.',
+                '# TYPE aceros_reruns_total counter',
+                f'aceros_reruns_total {self.reruns}',
+                '# HELP aceros_metrics_overhead_seconds_total Tiempo gastado midiendo payloads.',
+                '# TYPE aceros_metrics_overhead_seconds_total counter',
+                f'aceros_metrics_overhead_seconds_total {self.overhead:.6f}',
+                '# HELP aceros_stage_seconds Duración de cada etapa del rerun.',
+                '# TYPE aceros_stage_seconds histogram',
+            ]
+            for path, (counts, total, count) in sorted(self.stages.items()):
+                label = f'stage="{_escape(path)}"'
+                for limit, bucket in zip(self.buckets, counts):
+                    lines.append(f'aceros_stage_seconds_bucket{{{label},le="{limit}"}} {bucket}')
+                lines.append(f'aceros_stage_seconds_bucket{{{label},le="+Inf"}} {count}')
+                lines.append(f'aceros_stage_seconds_sum{{{label}}} {total:.6f}')
+                lines.append(f'aceros_stage_seconds_count{{{label}}} {count}')
+
+            lines += ['# HELP aceros_payload_bytes_total Bytes enviados al navegador por elemento.',
+                      '# TYPE aceros_payload_bytes_total counter']
+            for name, (_, total, _) in sorted(self.payloads.items()):
+                lines.append(f'aceros_payload_bytes_total{{element="{_escape(name)}"}} {total}')
+            lines += ['# HELP aceros_payload_last_bytes Tamaño del último payload por elemento.',
+                      '# TYPE aceros_payload_last_bytes gauge']
+            for name, (_, _, last) in sorted(self.payloads.items()):
+                lines.append(f'aceros_payload_last_bytes{{element="{_escape(name)}"}} {last}')
+
+            lines += ['# HELP aceros_cache_requests_total Llamadas a funciones cacheadas.',
+                      '# TYPE aceros_cache_requests_total counter']
+            for name, (hits, misses) in sorted(self.cache.items()):
+                lines.append(f'aceros_cache_requests_total{{cache="{_escape(name)}",result="hit"}} {hits}')
+                lines.append(f'aceros_cache_requests_total{{cache="{_escape(name)}",result="miss"}} {misses}')
+        for collector in self.collectors:
+            lines += collector()
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        """Escribe el archivo de métricas de forma atómica (para node_exporter/textfile)"""
+        tmp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as handle:
+            handle.write(self.render())
+        os.replace(tmp, path)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# Registro compartido por todas las sesiones del proceso
+REGISTRY = MetricsRegistry()
@@ -0,0 +1,60 @@
+# Paginación y orden de resultados del lado del servidor
+# Sólo la página visible se convierte en DataFrame y se envía al navegador.
+# El orden por columna reutiliza la permutación ordenada del índice del
+# catálogo (ya calculada) y la intersecta con el conjunto de resultados.
+
+import math
+
+import numpy as np
+
+PAGE_SIZES = (10, 25, 50, 100)
+DEFAULT_PAGE_SIZE = 25
+
+
+def _reverse_groups(order, sorted_values):
+    """order de mayor a menor valor conservando el orden dentro de cada empate"""
+    if len(order) == 0:
+        return order
+    starts = np.flatnonzero(np.r_[True, sorted_values[1:] != sorted_values[:-1]])
+    sizes = np.diff(np.r_[starts, len(order)])
+    group = np.repeat(np.arange(len(starts)), sizes)
+    # Inicio de cada grupo una vez invertido el orden de los grupos
+    reversed_starts = np.r_[0, np.cumsum(sizes[::-1])[:-1]][::-1]
+    result = np.empty_like(order)
+    result[reversed_starts[group] + np.arange(len(order)) - starts[group]] = order
+    return result
+
+
+def sort_results(catalog, positions, key, descending=False):
+    """Índices sobre positions en el orden de la propiedad key
+
+    Las filas sin dato van al final; los empates (y las filas sin dato) van
+    por posición de fila, también en orden descendente: el mismo orden por
+    cualquiera de los dos caminos.
+    """
+    positions = np.asarray(positions)
+    values = catalog.values[key][positions]
+    if len(positions) * max(1.0, math.log2(max(len(positions), 1))) < catalog.size:
+        # Pocos resultados: ordenar sólo esos
+        order = np.lexsort((positions, values))
+        valid = int(np.count_nonzero(~np.isnan(values)))
+    else:
+        # Muchos: recorrer la permutación precalculada y quedarse con los resultados
+        slot = np.full(catalog.size, -1, dtype=np.intp)
+        slot[positions] = np.arange(len(positions))
+        order = slot[catalog.indexes[key].order]
+        order = order[order >= 0]
+        valid = len(order)
+        missing = np.flatnonzero(np.isnan(values))
+        order = np.concatenate([order, missing[np.argsort(positions[missing], kind='stable')]])
+    if descending:
+        order[:valid] = _reverse_groups(order[:valid], values[order[:valid]])
+    return order
+
+
+def page_bounds(total, page, size):
+    """(inicio, fin, número de páginas) de la página pedida (1 = primera)"""
+    pages = max(1, math.ceil(total / size))
+    page = min(max(1, int(page)), pages)
+    start = (page - 1) * size
+    return start, min(start + size, total), pages
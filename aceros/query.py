@@ -0,0 +1,348 @@
+# API de consultas sin Streamlit
+# Misma lógica de selección que la app (modo simple y técnico), utilizable desde
+# scripts, la CLI por lotes o un servicio
+
+import itertools
+import json
+
+import numpy as np
+
+from .catalog import PROPERTIES, Range, SteelCatalog, as_range
+from .ingest import add_derived_columns, dataset_version, load_table
+from .reload import build_catalog
+from .scoring import DEFAULT_WEIGHTS, MAX_SCORE, rank, top_k
+from .shared import open_shared_catalog
+
+USE_CASES = ["Construcción/cercas", "Herramientas", "Muebles/estructura",
+             "Piezas mecánicas", "Cuchillos/corte"]
+WELDING_OPTIONS = ["Sí, mucho", "Tal vez", "No"]
+HARDNESS_LEVELS = [1, 2, 3, 4, 5]
+
+# Dureza objetivo (HB) para cada nivel del modo simple
+HARDNESS_TARGETS = {1: 120, 2: 150, 3: 190, 4: 240, 5: 300}
+# Nivel de dureza cuando el registro no lo indica
+DEFAULT_HARDNESS = 3
+
+# Reglas por aplicación, con el mismo formato que las especificaciones de
+# puntuación. Son criterios suaves: ordenan las opciones, no las descartan.
+USE_CASE_RULES = {
+    "Construcción/cercas": {
+        'min': {'elong': 20},
+        'max': {'c_avg': 0.25},
+        'weights': {'c_avg': 1.0},
+    },
+    "Herramientas": {
+        'min': {'hb': 200, 'uts': 700},
+    },
+    "Muebles/estructura": {
+        'min': {'elong': 15, 'ys': 250},
+        'weights': {'ys': 1.0},
+    },
+    "Piezas mecánicas": {
+        'min': {'uts': 600, 'ys': 350},
+        'weights': {'ys': 1.0},
+    },
+    "Cuchillos/corte": {
+        'min': {'hb': 250, 'c_avg': 0.45},
+        'weights': {'c_avg': 1.0},
+    },
+}
+
+SIMPLE_K = 3
+BATCH_K = 10
+# Celdas (consultas × filas) evaluadas a la vez en el modo por lotes
+BATCH_CELLS = 4_000_000
+
+RESULT_COLUMNS = ['SAE Grade', 'Condition_simple', 'UTS (MPa)', 'YS (MPa)',
+                  'Hardness (HB)', 'Elongation (%)', 'C_avg']
+
+
+def open_catalog(path, shared=True):
+    """Catálogo listo para consultar a partir del CSV (usa el snapshot si existe)
+
+    Con shared=True se adjunta al segmento compartido de esa versión (o se publica).
+    """
+    version = dataset_version(path)
+    if not shared:
+        return SteelCatalog(add_derived_columns(load_table(path)), version=version)
+    # Si sólo se agregaron filas desde la última versión publicada, se extiende esa
+    return open_shared_catalog(path, version, lambda: build_catalog(path, version))
+
+
+# ==================== ESPECIFICACIONES ====================
+def simple_score_spec(welding, hardness_level, use_case=None):
+    """Especificación de puntuación para las respuestas del modo simple"""
+    spec = {
+        'target': {'hb': HARDNESS_TARGETS[hardness_level]},
+        'min': {},
+        'max': {},
+        'weights': {'hb': 2.0, 'c_avg': 1.0},
+    }
+    # Por debajo del tope duro de carbono, se prefiere el más soldable
+    if welding == "Sí, mucho":
+        spec['max']['c_avg'] = 0.20
+    elif welding == "Tal vez":
+        spec['max']['c_avg'] = 0.35
+
+    # La regla de la aplicación se suma; si repite un límite gana el más exigente
+    rule = USE_CASE_RULES.get(use_case, {})
+    for key, limit in rule.get('min', {}).items():
+        spec['min'][key] = max(limit, spec['min'].get(key, limit))
+    for key, limit in rule.get('max', {}).items():
+        spec['max'][key] = min(limit, spec['max'].get(key, limit))
+    for key, weight in rule.get('weights', {}).items():
+        spec['weights'].setdefault(key, weight)
+    return spec
+
+
+def simple_ranges(welding, hardness_level):
+    """Filtros duros del modo simple"""
+    ranges = {}
+    if welding == "Sí, mucho":
+        ranges['c_avg'] = Range(hi=0.30, hi_strict=True)
+    elif welding == "Tal vez":
+        ranges['c_avg'] = Range(hi=0.45, hi_strict=True)
+
+    if hardness_level <= 2:
+        ranges['hb'] = Range(hi=180, hi_strict=True)
+    elif hardness_level >= 4:
+        ranges['hb'] = Range(lo=220, lo_strict=True)
+    return ranges
+
+
+def technical_score_spec(catalog, ranges):
+    """Especificación de puntuación: cercanía al centro de los rangos acotados"""
+    target = {}
+    for key, bounds in ranges.items():
+        rng = as_range(bounds)
+        if rng.lo is None or rng.hi is None or key not in catalog.slider_bounds:
+            continue
+        full_low, full_high = catalog.slider_bounds[key]
+        if rng.lo > full_low or rng.hi < full_high:
+            target[key] = (rng.lo + rng.hi) / 2
+    return {'target': target, 'weights': {key: 1.0 for key in target}}
+
+
+def simple_query(use_case, welding, hardness_level, k=SIMPLE_K):
+    """Consulta normalizada del modo simple (use_case=None: sin regla de aplicación)"""
+    if use_case is not None and use_case not in USE_CASE_RULES:
+        raise ValueError(f"Aplicación inválida: {use_case!r}")
+    if welding not in WELDING_OPTIONS:
+        raise ValueError(f"Respuesta de soldadura inválida: {welding!r}")
+    if hardness_level not in HARDNESS_TARGETS:
+        raise ValueError(f"Nivel de dureza inválido: {hardness_level!r}")
+    return {
+        'ranges': simple_ranges(welding, hardness_level),
+        'treatments': None,
+        'score': simple_score_spec(welding, hardness_level, use_case),
+        'k': k,
+    }
+
+
+def technical_query(catalog, ranges, treatments=None, k=None):
+    """Consulta normalizada del modo técnico"""
+    ranges = {key: as_range(bounds) for key, bounds in ranges.items()}
+    return {
+        'ranges': ranges,
+        'treatments': None if treatments is None else list(treatments),
+        'score': technical_score_spec(catalog, ranges),
+        'k': k,
+    }
+
+
+def parse_query(catalog, record):
+    """Consulta normalizada a partir de un registro (JSON/CSV)
+
+    Modo simple: 'use_case', 'welding', 'hardness'. Modo técnico: rangos por
+    propiedad como [min, max] ('uts', 'ys', 'hb', 'elong', 'c_avg') o columnas
+    '<clave>_min'/'<clave>_max', más 'treatments' opcional. 'k' limita el
+    número de resultados (k=0 es válido: ningún resultado). Las celdas vacías
+    cuentan como no indicadas.
+    """
+    k = _integer(record.get('k'))
+    if k is not None and k < 0:
+        raise ValueError(f"k no puede ser negativo: {k}")
+    if record.get('welding') not in (None, ''):
+        hardness = _integer(record.get('hardness'))
+        return simple_query(record.get('use_case') or None, record['welding'],
+                            DEFAULT_HARDNESS if hardness is None else hardness,
+                            SIMPLE_K if k is None else k)
+
+    ranges = {}
+    for key in PROPERTIES:
+        low, high = None, None
+        if isinstance(record.get(key), (list, tuple)):
+            low, high = record[key]
+        low = _number(record.get(f'{key}_min', low))
+        high = _number(record.get(f'{key}_max', high))
+        if low is not None or high is not None:
+            ranges[key] = Range(low, high)
+    treatments = record.get('treatments')
+    if isinstance(treatments, str):
+        treatments = [t.strip() for t in treatments.split('|') if t.strip()] or None
+    return technical_query(catalog, ranges, treatments, BATCH_K if k is None else k)
+
+
+def _number(value):
+    if value is None or value == '':
+        return None
+    return float(value)
+
+
+def _integer(value):
+    if value is None or value == '':
+        return None
+    return int(value)
+
+
+def query_key(query):
+    """Representación canónica (hashable) de una consulta normalizada"""
+    ranges = tuple(sorted((key, tuple(rng)) for key, rng in query['ranges'].items()))
+    treatments = None if query['treatments'] is None else tuple(sorted(query['treatments']))
+    return json.dumps([ranges, treatments, query['score'], query['k']], sort_keys=True, default=str)
+
+
+# ==================== EJECUCIÓN ====================
+def run_query(catalog, query):
+    """Posiciones ordenadas por puntuación y sus puntajes (vía índices ordenados)"""
+    positions = catalog.query(query['ranges'], conditions=query['treatments'])
+    return rank(catalog, query['score'], positions, k=query['k'])
+
+
+def _bound_matrix(queries, keys):
+    """Límites (Q, K) con los estrictos convertidos a inclusivos"""
+    low = np.full((len(queries), len(keys)), -np.inf)
+    high = np.full((len(queries), len(keys)), np.inf)
+    constrained = np.zeros((len(queries), len(keys)), dtype=bool)
+    for q, query in enumerate(queries):
+        for j, key in enumerate(keys):
+            rng = query['ranges'].get(key)
+            if rng is None or rng.is_open():
+                continue
+            constrained[q, j] = True
+            if rng.lo is not None:
+                low[q, j] = np.nextafter(rng.lo, np.inf) if rng.lo_strict else rng.lo
+            if rng.hi is not None:
+                high[q, j] = np.nextafter(rng.hi, -np.inf) if rng.hi_strict else rng.hi
+    return low, high, constrained
+
+
+def _score_matrix(queries, keys):
+    """Parámetros de puntuación (Q, K) por tipo de límite; NaN = sin criterio"""
+    params = {bound: np.full((len(queries), len(keys)), np.nan) for bound in ('min', 'max', 'target')}
+    weights = np.ones((len(queries), len(keys)))
+    for q, query in enumerate(queries):
+        spec = query['score']
+        merged = dict(DEFAULT_WEIGHTS, **spec.get('weights', {}))
+        for j, key in enumerate(keys):
+            weights[q, j] = merged.get(key, 1.0)
+            for bound in params:
+                value = spec.get(bound, {}).get(key)
+                if value is not None:
+                    params[bound][q, j] = value
+    return params, weights
+
+
+def evaluate_batch(catalog, queries, max_cells=BATCH_CELLS):
+    """Evalúa muchas consultas en pasadas vectorizadas (consultas × filas)
+
+    Las consultas idénticas se evalúan una sola vez. Devuelve una lista
+    alineada con queries de tuplas (posiciones, puntajes).
+    """
+    unique = {}
+    for query in queries:
+        unique.setdefault(query_key(query), query)
+    distinct = list(unique.values())
+    keys = list(catalog.values)
+    low, high, constrained = _bound_matrix(distinct, keys)
+    params, weights = _score_matrix(distinct, keys)
+    codes = catalog.condition_codes
+
+    block = max(1, max_cells // max(catalog.size, 1))
+    answers = {}
+    for start in range(0, len(distinct), block):
+        chunk = distinct[start:start + block]
+        rows = slice(start, start + len(chunk))
+
+        # Filtro: conjunción de rangos y tratamientos, (B, N)
+        mask = np.ones((len(chunk), catalog.size), dtype=bool)
+        for j, key in enumerate(keys):
+            if not constrained[rows, j].any():
+                continue
+            values = catalog.values[key][None, :]
+            inside = (values >= low[rows, j, None]) & (values <= high[rows, j, None])
+            mask &= inside | ~constrained[rows, j, None]
+        allowed = np.ones((len(chunk), len(catalog.conditions) + 1), dtype=bool)
+        for b, query in enumerate(chunk):
+            if query['treatments'] is not None:
+                allowed[b] = catalog.condition_lookup(query['treatments'])
+        mask &= allowed[:, codes]
+
+        # Puntuación con la misma fórmula que scoring.score_positions
+        penalty = np.zeros((len(chunk), catalog.size))
+        for j, key in enumerate(keys):
+            values = catalog.values[key][None, :]
+            factor = weights[rows, j, None] / catalog.spread[key]
+            for bound, column in params.items():
+                limit = column[rows, j, None]
+                if np.isnan(limit).all():
+                    continue
+                if bound == 'min':
+                    deviation = limit - values
+                elif bound == 'max':
+                    deviation = values - limit
+                else:
+                    deviation = np.abs(values - limit)
+                deviation = np.fmax(deviation * factor, 0.0)
+                # fmax descarta NaN (sin dato o sin criterio en esta consulta)
+                penalty += np.minimum(deviation, weights[rows, j, None])
+        scores = np.clip(MAX_SCORE - penalty, 0.0, MAX_SCORE)
+
+        for b, query in enumerate(chunk):
+            hits = np.flatnonzero(mask[b])
+            row_scores = scores[b, hits]
+            best = top_k(row_scores, len(hits) if query['k'] is None else query['k'])
+            answers[query_key(query)] = (hits[best], row_scores[best])
+
+    return [answers[query_key(query)] for query in queries]
+
+
+class SimpleAnswers:
+    """Respuestas del modo simple precalculadas para todas las combinaciones
+
+    Son 5 aplicaciones × 3 respuestas de soldadura × 5 niveles de dureza: se
+    evalúan de una vez (evaluate_batch) al cargar el catálogo y cada búsqueda
+    es una consulta a un diccionario.
+    """
+
+    def __init__(self, catalog, k=SIMPLE_K):
+        self.version = catalog.version
+        self.k = k
+        combos = list(itertools.product(USE_CASES, WELDING_OPTIONS, HARDNESS_LEVELS))
+        answers = evaluate_batch(catalog, [simple_query(*combo, k=k) for combo in combos])
+        self.answers = dict(zip(combos, answers))
+
+    def __len__(self):
+        return len(self.answers)
+
+    def get(self, use_case, welding, hardness_level):
+        """(posiciones, puntajes) de una combinación"""
+        try:
+            return self.answers[(use_case, welding, hardness_level)]
+        except KeyError:
+            # Mismo mensaje de validación que una consulta normal
+            simple_query(use_case, welding, hardness_level, self.k)
+            raise
+
+
+def result_records(catalog, query_id, positions, scores, columns=RESULT_COLUMNS):
+    """Registros planos (uno por acero recomendado) para JSONL/CSV"""
+    columns = [column for column in columns if column in catalog.df.columns]
+    frame = catalog.rows(positions, columns)
+    records = []
+    for position, (row, score) in enumerate(zip(frame.itertuples(index=False), scores), start=1):
+        record = {'query_id': query_id, 'rank': position, 'score': round(float(score), 4)}
+        for column, value in zip(columns, row):
+            record[column] = None if isinstance(value, float) and np.isnan(value) else value
+        records.append(record)
+    return records
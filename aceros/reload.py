@@ -0,0 +1,78 @@
+# Recarga en caliente del dataset
+# Cuando el proveedor agrega filas al CSV sólo se leen las nuevas: el catálogo
+# vigente se extiende (índices fusionados, no reordenados) y se publica como
+# una versión nueva. Las sesiones abiertas la toman en su siguiente rerun;
+# un hilo vigilante la prepara antes para que nadie pague la construcción.
+
+import threading
+
+from .catalog import SteelCatalog
+from .ingest import add_derived_columns, dataset_version, load_table, read_appended
+from .shared import current_catalog
+
+# Segundos entre revisiones del archivo
+WATCH_INTERVAL_S = 5.0
+
+
+def build_catalog(path, version, previous=None):
+    """Catálogo de la versión actual del CSV
+
+    Si previous (por omisión, el último segmento publicado) corresponde al
+    archivo antes de agregarle filas, sólo se leen y agregan las nuevas; si
+    no (filas editadas o borradas), se lee el archivo completo.
+    """
+    if previous is None:
+        previous = current_catalog(path)
+    if previous is not None and previous.version != version:
+        rows = read_appended(path, previous.size)
+        if rows is not None:
+            return previous.extend(add_derived_columns(rows), version)
+    return SteelCatalog(add_derived_columns(load_table(path)), version=version)
+
+
+class DatasetWatcher:
+    """Hilo que revisa la versión del CSV y llama on_change(versión) al cambiar
+
+    Un cambio se notifica cuando la versión nueva se repite en dos revisiones
+    seguidas, para no leer un archivo a medio escribir.
+    """
+
+    def __init__(self, path, on_change, interval=WATCH_INTERVAL_S):
+        self.path = path
+        self.on_change = on_change
+        self.interval = interval
+        self.version = dataset_version(path)
+        self.pending = None
+        self.errors = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='aceros-watcher', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def check(self):
+        """Revisa el archivo una vez; devuelve True si notificó una versión nueva"""
+        version = dataset_version(self.path)
+        if version == self.version:
+            self.pending = None
+            return False
+        if version != self.pending:
+            self.pending = version
+            return False
+        self.on_change(version)
+        self.version = version
+        self.pending = None
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception:
+                # Un error (p. ej. CSV a medio escribir) no detiene la vigilancia;
+                # la sesión que pida esa versión verá el error al construirla
+                self.errors += 1
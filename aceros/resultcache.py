@@ -0,0 +1,143 @@
+# Caché de resultados de consultas compartida por todas las sesiones
+# Guarda posiciones de fila y puntajes (no copias del DataFrame) por
+# (versión del dataset, consulta normalizada). LRU con presupuesto en bytes;
+# al aparecer una versión nueva del dataset se descartan las anteriores.
+
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from . import metrics
+
+# Presupuesto por proceso (MB), configurable con ACEROS_QUERY_CACHE_MB
+DEFAULT_BUDGET_MB = 64
+# Costo aproximado de la entrada además de sus arreglos (llave, tupla, nodo)
+ENTRY_OVERHEAD = 256
+
+
+def entry_size(key, value):
+    """Bytes que ocupa una entrada (arreglos numpy + llave + sobrecosto fijo)"""
+    arrays = value if isinstance(value, tuple) else (value,)
+    return ENTRY_OVERHEAD + len(repr(key)) + sum(
+        item.nbytes for item in arrays if isinstance(item, np.ndarray))
+
+
+class QueryCache:
+    """LRU acotado en bytes, seguro entre hilos, con contadores de aciertos
+
+    get() calcula fuera del candado: dos sesiones con la misma consulta nueva
+    pueden calcularla a la vez, pero ninguna bloquea a las demás. Los valores
+    no pueden ser None (se usa como "no está").
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.version = None
+        self.retired = set()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _use_version(self, version):
+        """True si las entradas de esta versión se pueden guardar"""
+        if version == self.version:
+            return True
+        if version in self.retired:
+            # Sesión que sigue en una versión anterior: se calcula sin guardar
+            return False
+        if self.version is not None:
+            self.retired.add(self.version)
+        self.version = version
+        stale = [key for key in self.entries if key[0] != version]
+        for key in stale:
+            self.bytes -= self.entries.pop(key)[1]
+        self.invalidations += len(stale)
+        return True
+
+    def lookup(self, version, key):
+        """Valor guardado de (version, key) o None (cuenta acierto o fallo)"""
+        full_key = (version, key)
+        with self._lock:
+            entry = self.entries.get(full_key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(full_key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, version, key, value):
+        """Guarda un valor recién calculado, desalojando lo menos usado si hace falta"""
+        for item in value if isinstance(value, tuple) else (value,):
+            if isinstance(item, np.ndarray):
+                # Compartido entre sesiones: nadie debe modificarlo en sitio
+                item.setflags(write=False)
+        full_key = (version, key)
+        size = entry_size(full_key, value)
+        with self._lock:
+            if size > self.max_bytes or not self._use_version(version) or full_key in self.entries:
+                return
+            self.entries[full_key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, freed) = self.entries.popitem(last=False)
+                self.bytes -= freed
+                self.evictions += 1
+
+    def get(self, version, key, compute):
+        """Valor de (version, key); compute() se llama sólo si no está guardado"""
+        value = self.lookup(version, key)
+        if value is None:
+            value = compute()
+            self.put(version, key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self.entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+    def render(self):
+        """Líneas de Prometheus con los contadores de la caché"""
+        stats = self.stats()
+        lines = ['# HELP aceros_query_cache_requests_total Consultas a la caché de resultados.',
+                 '# TYPE aceros_query_cache_requests_total counter',
+                 f'aceros_query_cache_requests_total{{result="hit"}} {stats["hits"]}',
+                 f'aceros_query_cache_requests_total{{result="miss"}} {stats["misses"]}']
+        for name, kind in (('evictions', 'counter'), ('invalidations', 'counter'),
+                           ('entries', 'gauge'), ('bytes', 'gauge')):
+            suffix = '_total' if kind == 'counter' else ''
+            lines += [f'# TYPE aceros_query_cache_{name}{suffix} {kind}',
+                      f'aceros_query_cache_{name}{suffix} {stats[name]}']
+        return lines
+
+
+def budget_bytes():
+    try:
+        megabytes = float(os.environ.get('ACEROS_QUERY_CACHE_MB', DEFAULT_BUDGET_MB))
+    except ValueError:
+        megabytes = DEFAULT_BUDGET_MB
+    return int(megabytes * 2**20)
+
+
+# Caché compartida por todas las sesiones del proceso
+QUERY_CACHE = QueryCache(budget_bytes())
+metrics.REGISTRY.register(QUERY_CACHE.render)
@@ -0,0 +1,219 @@
+# Servicio HTTP/JSON ligero (asyncio, sin dependencias extra)
+# Atiende las mismas consultas que los modos simple y técnico sobre un
+# catálogo compartido de sólo lectura. Un hilo vigila el CSV y cambia el
+# catálogo por la versión nueva cuando el archivo se modifica.
+#
+# Uso:
+#   python -m aceros.server --port 8600 --data steel_data.csv
+#
+#   POST /simple     {"use_case": "...", "welding": "No", "hardness": 4, "k": 3}
+#   POST /technical  {"uts": [500, 800], "elong_min": 15, "treatments": [...], "k": 10}
+#   GET  /health
+
+import argparse
+import asyncio
+import json
+from http import HTTPStatus
+
+from .query import open_catalog, parse_query, query_key, result_records, run_query
+from .reload import DatasetWatcher
+from .resultcache import QUERY_CACHE
+
+MAX_BODY = 1 << 20
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class CoalescingCache:
+    """Consultas en curso compartidas sobre la caché de resultados (QueryCache)
+
+    Si llegan varias consultas idénticas mientras la primera se calcula,
+    todas esperan el mismo futuro en vez de recalcular.
+    """
+
+    def __init__(self, store=None):
+        self.store = store or QUERY_CACHE
+        self.pending = {}
+        self.coalesced = 0
+
+    async def get(self, version, key, compute):
+        value = self.store.lookup(version, key)
+        if value is not None:
+            return value
+        full_key = (version, key)
+        if full_key in self.pending:
+            self.coalesced += 1
+            return await asyncio.shield(self.pending[full_key])
+
+        loop = asyncio.get_running_loop()
+        # numpy libera el GIL: el cálculo corre en un hilo sin bloquear el loop
+        future = loop.run_in_executor(None, compute)
+        self.pending[full_key] = future
+        try:
+            value = await future
+        finally:
+            del self.pending[full_key]
+        self.store.put(version, key, value)
+        return value
+
+    def stats(self):
+        return dict(self.store.stats(), coalesced=self.coalesced)
+
+
+class SteelService:
+    """Rutas del servicio sobre un catálogo de sólo lectura
+
+    Con data_path se recarga el catálogo al cambiar la versión del CSV.
+    """
+
+    def __init__(self, catalog, cache=None, data_path=None):
+        self.catalog = catalog
+        self.cache = cache or CoalescingCache()
+        self.data_path = data_path
+
+    def reload(self, version):
+        """Cambia al catálogo de la versión nueva (lo llama el hilo vigilante)"""
+        catalog = open_catalog(self.data_path)
+        # Asignación atómica: cada petición usa el catálogo que tomó al empezar
+        self.catalog = catalog
+
+    def _answer(self, catalog, positions, scores):
+        return {
+            'version': catalog.version,
+            'count': len(positions),
+            'results': result_records(catalog, None, positions, scores),
+        }
+
+    async def handle(self, method, path, body):
+        catalog = self.catalog
+        if path == '/health':
+            return {
+                'status': 'ok',
+                'version': catalog.version,
+                'rows': len(catalog),
+                'cache': self.cache.stats(),
+            }
+        if path not in ('/simple', '/technical'):
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"Ruta desconocida: {path}")
+        if method != 'POST':
+            raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, "Usa POST")
+        try:
+            record = json.loads(body or b'{}')
+            if not isinstance(record, dict):
+                raise ValueError("Se esperaba un objeto JSON")
+            if path == '/simple' and not record.get('welding'):
+                raise ValueError("Falta 'welding'")
+            if path == '/technical':
+                record.pop('welding', None)
+            query = parse_query(catalog, record)
+        except (KeyError, TypeError, ValueError) as error:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, str(error))
+        # Se guardan posiciones y puntajes; los registros se arman por petición
+        positions, scores = await self.cache.get(catalog.version, query_key(query),
+                                                 lambda: run_query(catalog, query))
+        return self._answer(catalog, positions, scores)
+
+
+# ==================== HTTP ====================
+async def _read_request(reader):
+    """(método, ruta, headers, cuerpo) o None si el cliente cerró la conexión"""
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, _ = line.decode('latin-1').split(' ', 2)
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Línea de petición inválida")
+    headers = {}
+    while True:
+        header = await reader.readline()
+        if header in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = header.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get('content-length') or 0)
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Content-Length inválido")
+    if length < 0:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Content-Length inválido")
+    if length > MAX_BODY:
+        raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Cuerpo demasiado grande")
+    body = await reader.readexactly(length) if length else b''
+    return method.upper(), target.split('?', 1)[0], headers, body
+
+
+def _response(status, payload, keep_alive):
+    body = json.dumps(payload, ensure_ascii=False, default=str).encode('utf-8')
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode('latin-1') + body
+
+
+def make_handler(service):
+    async def handle_connection(reader, writer):
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    request = await _read_request(reader)
+                    if request is None:
+                        break
+                    method, path, headers, body = request
+                    keep_alive = headers.get('connection', '').lower() != 'close'
+                    payload = await service.handle(method, path, body)
+                    status = HTTPStatus.OK
+                except HTTPError as error:
+                    status, payload = error.status, {'error': str(error)}
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except Exception as error:
+                    # Error inesperado: se responde 500 sin tirar la conexión
+                    status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(error)}
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+    return handle_connection
+
+
+async def serve(catalog, host='127.0.0.1', port=8600, data_path=None):
+    service = SteelService(catalog, data_path=data_path)
+    watcher = DatasetWatcher(data_path, service.reload).start() if data_path else None
+    server = await asyncio.start_server(make_handler(service), host, port)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if watcher is not None:
+            watcher.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m aceros.server',
+                                     description="Servicio HTTP/JSON de selección de aceros")
+    parser.add_argument('--data', default='steel_data.csv')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8600)
+    args = parser.parse_args(argv)
+
+    catalog = open_catalog(args.data)
+    print(f"Sirviendo {len(catalog)} aceros en http://{args.host}:{args.port}")
+    try:
+        asyncio.run(serve(catalog, args.host, args.port, data_path=args.data))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,265 @@
+# Catálogo compartido entre procesos
+# El primer proceso que necesita una versión del dataset la publica como un
+# segmento columnar de sólo lectura (un .npy por arreglo). Los demás procesos
+# y sesiones lo mapean en memoria sin copiar: el sistema operativo mantiene
+# una sola copia de las páginas para todos los workers del nodo.
+#
+# Cada versión vive en su propio directorio y CURRENT apunta a la vigente;
+# publicar una versión nueva no afecta a quien sigue usando la anterior.
+
+import json
+import os
+import shutil
+import socket
+import time
+
+import numpy as np
+import pandas as pd
+
+from .catalog import PROPERTIES, SteelCatalog
+from .ingest import CACHE_DIR, SNAPSHOT_SCHEMA
+
+SEGMENT_SCHEMA = 3
+SEGMENTS_DIR = 'segments'
+CURRENT = 'CURRENT'
+# Versiones que se conservan en disco (la vigente y la anterior)
+KEEP_VERSIONS = 2
+# Espera máxima a que otro proceso termine de publicar la misma versión
+LOCK_WAIT_S = 30.0
+LOCK_POLL_S = 0.1
+# Un candado más viejo que esto se considera abandonado aunque no se pueda
+# comprobar su dueño (otro host, PID ilegible)
+LOCK_STALE_S = 300.0
+
+
+def segment_root(path, cache_dir=None):
+    """Directorio con los segmentos de un CSV"""
+    cache_dir = cache_dir or os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, SEGMENTS_DIR, stem)
+
+
+def _segment_dir(root, version):
+    # El esquema de ingesta entra en el nombre: cambiar la normalización invalida
+    name = f'{version}-s{SNAPSHOT_SCHEMA}.{SEGMENT_SCHEMA}'
+    return os.path.join(root, name.replace(os.sep, '_'))
+
+
+def _codes_dtype(size):
+    """El mismo ancho de código que elige pandas (si no, copia al construir)"""
+    for dtype in (np.int8, np.int16, np.int32):
+        if size < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+# ==================== PUBLICACIÓN ====================
+def _write_segment(catalog, target):
+    os.makedirs(os.path.join(target, 'columns'))
+    os.makedirs(os.path.join(target, 'arrays'))
+    columns = []
+    for i, name in enumerate(catalog.df.columns):
+        series = catalog.df[name]
+        entry = {'name': name, 'file': f'columns/{i}.npy'}
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            # float32 (composición) se conserva; el resto como float64
+            data = series.to_numpy(dtype=np.float32 if series.dtype == np.float32 else np.float64)
+            entry['kind'] = 'float'
+        else:
+            # Texto como categórica: códigos enteros + categorías en el manifiesto
+            codes, categories = pd.factorize(series, sort=False)
+            data = codes.astype(_codes_dtype(len(categories)))
+            entry['kind'] = 'category'
+            entry['categories'] = [str(value) for value in categories]
+        np.save(os.path.join(target, entry['file']), np.ascontiguousarray(data))
+        columns.append(entry)
+
+    arrays, meta = catalog.parts()
+    files = {}
+    for name, data in arrays.items():
+        files[name] = 'arrays/' + name.replace('/', '__') + '.npy'
+        np.save(os.path.join(target, files[name]), np.ascontiguousarray(data))
+
+    with open(os.path.join(target, 'manifest.json'), 'w', encoding='utf-8') as handle:
+        json.dump({
+            'schema': SEGMENT_SCHEMA,
+            'version': catalog.version,
+            'rows': catalog.size,
+            'columns': columns,
+            'arrays': files,
+            'meta': meta,
+        }, handle)
+
+
+def publish(catalog, root):
+    """Publica el catálogo como segmento de su versión y lo marca como vigente"""
+    os.makedirs(root, exist_ok=True)
+    target = _segment_dir(root, catalog.version)
+    if not os.path.exists(os.path.join(target, 'manifest.json')):
+        tmp = f'{target}.tmp{os.getpid()}'
+        shutil.rmtree(tmp, ignore_errors=True)
+        try:
+            _write_segment(catalog, tmp)
+            # El renombrado del directorio completo es atómico: nadie ve un segmento a medias
+            os.rename(tmp, target)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            if not os.path.exists(os.path.join(target, 'manifest.json')):
+                raise
+    pointer = os.path.join(root, CURRENT)
+    with open(f'{pointer}.tmp{os.getpid()}', 'w', encoding='utf-8') as handle:
+        handle.write(os.path.basename(target))
+    os.replace(f'{pointer}.tmp{os.getpid()}', pointer)
+    prune(root)
+    return target
+
+
+def current_segment(root):
+    """Nombre del segmento vigente (o None)"""
+    try:
+        with open(os.path.join(root, CURRENT), encoding='utf-8') as handle:
+            return handle.read().strip() or None
+    except OSError:
+        return None
+
+
+def prune(root, keep=KEEP_VERSIONS):
+    """Borra segmentos viejos; los procesos que aún los mapean no se ven afectados"""
+    current = current_segment(root)
+    older = []
+    for name in os.listdir(root):
+        full = os.path.join(root, name)
+        if name != current and os.path.isdir(full) and '.tmp' not in name:
+            older.append((os.path.getmtime(full), full))
+    older.sort(reverse=True)
+    for _, full in older[keep - 1:]:
+        shutil.rmtree(full, ignore_errors=True)
+
+
+# ==================== LECTURA ====================
+def attach(segment):
+    """Catálogo sobre los arreglos del segmento mapeados en memoria (sólo lectura)"""
+    with open(os.path.join(segment, 'manifest.json'), encoding='utf-8') as handle:
+        manifest = json.load(handle)
+    if manifest.get('schema') != SEGMENT_SCHEMA:
+        raise ValueError("Segmento con esquema distinto")
+
+    data = {}
+    for entry in manifest['columns']:
+        values = np.load(os.path.join(segment, entry['file']), mmap_mode='r')
+        if entry['kind'] == 'category':
+            values = pd.Categorical.from_codes(values, pd.Index(entry['categories']),
+                                               validate=False)
+        data[entry['name']] = values
+    df = pd.DataFrame(data, copy=False)
+
+    arrays = {name: np.load(os.path.join(segment, file), mmap_mode='r')
+              for name, file in manifest['arrays'].items()}
+    meta = manifest['meta']
+    # Las propiedades del catálogo son las mismas columnas del DataFrame
+    for key in meta['keys']:
+        arrays[f'values/{key}'] = data[PROPERTIES[key]]
+    return SteelCatalog.attach(df, manifest['version'], arrays, meta)
+
+
+def current_catalog(path, cache_dir=None):
+    """Catálogo del segmento vigente (la última versión publicada) o None"""
+    root = segment_root(path, cache_dir)
+    name = current_segment(root)
+    if name is None:
+        return None
+    try:
+        return attach(os.path.join(root, name))
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _acquire(lock):
+    """Crea el candado con el dueño (PID y host); None si ya lo tiene otro proceso"""
+    try:
+        handle = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        return None
+    os.write(handle, f'{os.getpid()} {socket.gethostname()}'.encode('utf-8'))
+    return handle
+
+
+def _lock_is_stale(lock):
+    """True si el dueño del candado ya no existe (p. ej. el proceso murió)"""
+    try:
+        with open(lock, encoding='utf-8') as handle:
+            pid, _, host = handle.read().strip().partition(' ')
+        age = time.time() - os.path.getmtime(lock)
+    except OSError:
+        return False
+    if age > LOCK_STALE_S:
+        return True
+    if pid.isdigit() and host == socket.gethostname() and os.name == 'posix':
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return True
+        except OSError:
+            pass
+    return False
+
+
+def _wait_for(segment, lock):
+    """Si otro proceso está publicando esta versión, espera su segmento
+
+    Un candado abandonado se borra y se deja de esperar.
+    """
+    deadline = time.monotonic() + LOCK_WAIT_S
+    while os.path.exists(lock) and time.monotonic() < deadline:
+        if os.path.exists(os.path.join(segment, 'manifest.json')):
+            return True
+        if _lock_is_stale(lock):
+            try:
+                os.remove(lock)
+            except OSError:
+                pass
+            break
+        time.sleep(LOCK_POLL_S)
+    return os.path.exists(os.path.join(segment, 'manifest.json'))
+
+
+def open_shared_catalog(path, version, build, cache_dir=None):
+    """Catálogo de la versión dada: adjunta el segmento o lo construye y publica
+
+    build() sólo se llama si ningún proceso publicó aún esta versión. Si no se
+    puede escribir el segmento se devuelve el catálogo construido (privado).
+    """
+    root = segment_root(path, cache_dir)
+    segment = _segment_dir(root, version)
+    try:
+        return attach(segment)
+    except (OSError, ValueError, KeyError):
+        pass
+
+    lock = f'{segment}.lock'
+    try:
+        os.makedirs(root, exist_ok=True)
+        handle = _acquire(lock)
+        if handle is None:
+            if _wait_for(segment, lock):
+                return attach(segment)
+            # Dueño muerto (o espera agotada): se intenta tomar el candado otra vez
+            handle = _acquire(lock)
+    except OSError:
+        return build()
+
+    try:
+        catalog = build()
+        try:
+            publish(catalog, root)
+            # Se descarta la copia privada y se usa la mapeada, igual que los demás procesos
+            return attach(segment)
+        except OSError:
+            return catalog
+    finally:
+        if handle is not None:
+            os.close(handle)
+            try:
+                os.remove(lock)
+            except OSError:
+                pass
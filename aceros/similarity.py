@@ -0,0 +1,243 @@
+# Búsqueda de sustitutos: "aceros parecidos a X"
+# Vectores normalizados de propiedades y química (puntos medios de los rangos)
+# sobre un KD-tree construido una vez por versión del dataset
+
+import heapq
+
+import numpy as np
+
+from .catalog import as_range
+from .ingest import float_values
+
+# Clave -> (etiqueta, columnas). Una columna es propiedad; dos son (mín, máx)
+FEATURES = {
+    'uts': ("UTS", ['UTS (MPa)']),
+    'ys': ("YS", ['YS (MPa)']),
+    'hb': ("Dureza", ['Hardness (HB)']),
+    'elong': ("Elongación", ['Elongation (%)']),
+    'c': ("C", ['C (Min)', 'C (Max)']),
+    'mn': ("Mn", ['Mn (Min)', 'Mn (Max)']),
+    'cr': ("Cr", ['Cr (Min)', 'Cr (Max)']),
+    'mo': ("Mo", ['Mo (Min)', 'Mo (Max)']),
+    'ni': ("Ni", ['Ni (Min)', 'Ni (Max)']),
+}
+# Elementos de aleación que, en blanco, significan "no especificado" (≈ 0)
+ZERO_WHEN_BLANK = {'cr', 'mo', 'ni'}
+
+LEAF_SIZE = 32
+# Con menos candidatos permitidos que esto se compara contra todos directamente
+BRUTE_FORCE_LIMIT = 2_048
+
+
+def _midpoint(df, columns):
+    low, high = (float_values(df[column]) for column in columns)
+    # Con un solo extremo se usa ese extremo (p. ej. C sin mínimo)
+    return np.where(np.isnan(low), high, np.where(np.isnan(high), low, (low + high) / 2))
+
+
+def feature_matrix(df):
+    """(claves, matriz N×D sin normalizar) con las columnas disponibles"""
+    keys, columns = [], []
+    for key, (_, sources) in FEATURES.items():
+        if not all(source in df.columns for source in sources):
+            continue
+        if len(sources) == 1:
+            values = float_values(df[sources[0]])
+        else:
+            values = _midpoint(df, sources)
+        if key in ZERO_WHEN_BLANK:
+            values = np.nan_to_num(values, nan=0.0)
+        keys.append(key)
+        columns.append(values)
+    matrix = np.column_stack(columns) if columns else np.empty((len(df), 0))
+    return keys, matrix
+
+
+def weighted_distance(diff, weights):
+    """Distancia² ponderada por fila
+
+    Suma por fila en vez de producto matricial: el resultado de una fila no
+    depende de cuántas filas se calculan juntas, así que los empates son
+    exactos tanto en el árbol como en la comparación directa.
+    """
+    return (diff * diff * weights).sum(axis=1)
+
+
+# ==================== KD-TREE ====================
+class KDTree:
+    """KD-tree en arreglos (sin scipy) con cajas envolventes por nodo
+
+    Las cajas permiten acotar la distancia ponderada a cualquier nodo, así que
+    los pesos se eligen por consulta sin reconstruir el árbol.
+    """
+
+    def __init__(self, points, leaf_size=LEAF_SIZE):
+        self.points = np.ascontiguousarray(points, dtype=np.float64)
+        n, dims = self.points.shape
+        self.order = np.arange(n)
+        # Nodo: [inicio, fin) en order, hijos (-1 en hojas) y caja
+        self.start, self.end, self.left, self.right = [], [], [], []
+        lows, highs = [], []
+
+        stack = [(0, n, None, None)]
+        while stack:
+            start, end, parent, side = stack.pop()
+            node = len(self.start)
+            if parent is not None:
+                (self.left if side == 0 else self.right)[parent] = node
+            block = self.points[self.order[start:end]]
+            low = block.min(axis=0) if end > start else np.zeros(dims)
+            high = block.max(axis=0) if end > start else np.zeros(dims)
+            self.start.append(start)
+            self.end.append(end)
+            self.left.append(-1)
+            self.right.append(-1)
+            lows.append(low)
+            highs.append(high)
+            if end - start <= leaf_size or dims == 0:
+                continue
+            # Corte por la mediana de la dimensión más extendida
+            dim = int(np.argmax(high - low))
+            if high[dim] == low[dim]:
+                continue
+            middle = (start + end) // 2
+            part = np.argpartition(block[:, dim], middle - start)
+            self.order[start:end] = self.order[start:end][part]
+            stack.append((middle, end, node, 1))
+            stack.append((start, middle, node, 0))
+
+        self.start = np.asarray(self.start)
+        self.end = np.asarray(self.end)
+        self.left = np.asarray(self.left)
+        self.right = np.asarray(self.right)
+        self.low = np.asarray(lows)
+        self.high = np.asarray(highs)
+        self.leaf_points = self.points[self.order]
+
+    def _box_distance(self, node, target, weights):
+        gap = np.maximum(self.low[node] - target, 0) + np.maximum(target - self.high[node], 0)
+        # Misma fórmula que weighted_distance: la cota nunca supera a la distancia
+        return float((gap * gap * weights).sum())
+
+    def query(self, target, k, weights, allowed=None):
+        """(posiciones, distancias²) de los k más cercanos; allowed filtra filas
+
+        Empates: gana la posición menor.
+        """
+        best_rows = np.empty(0, dtype=np.intp)
+        best_dist = np.empty(0)
+        if k <= 0:
+            return best_rows, best_dist
+        worst = np.inf
+        heap = [(self._box_distance(0, target, weights), 0)]
+        while heap:
+            bound, node = heapq.heappop(heap)
+            if len(best_dist) == k and bound > worst:
+                break
+            if self.left[node] >= 0:
+                for child in (self.left[node], self.right[node]):
+                    child_bound = self._box_distance(child, target, weights)
+                    if len(best_dist) < k or child_bound <= worst:
+                        heapq.heappush(heap, (child_bound, child))
+                continue
+
+            start, end = self.start[node], self.end[node]
+            rows = self.order[start:end]
+            diff = self.leaf_points[start:end] - target
+            dist = weighted_distance(diff, weights)
+            if allowed is not None:
+                keep = allowed[rows]
+                rows, dist = rows[keep], dist[keep]
+            if len(rows) == 0:
+                continue
+            best_rows = np.concatenate([best_rows, rows])
+            best_dist = np.concatenate([best_dist, dist])
+            if len(best_dist) > k:
+                cut = np.lexsort((best_rows, best_dist))[:k]
+                best_rows, best_dist = best_rows[cut], best_dist[cut]
+            if len(best_dist) == k:
+                worst = best_dist.max()
+
+        order = np.lexsort((best_rows, best_dist))
+        return best_rows[order], best_dist[order]
+
+
+# ==================== ÍNDICE DE SUSTITUTOS ====================
+class SubstituteIndex:
+    """Vecinos más cercanos sobre propiedades y química normalizadas
+
+    No guarda el catálogo (así una versión vieja se puede soltar tras una
+    recarga): las consultas con restricciones lo reciben como argumento.
+    """
+
+    def __init__(self, catalog, leaf_size=LEAF_SIZE):
+        self.version = catalog.version
+        self.keys, raw = feature_matrix(catalog.df)
+        self.labels = {key: FEATURES[key][0] for key in self.keys}
+        # z-score por columna; los faltantes quedan en la media (0)
+        self.mean = np.nanmean(raw, axis=0) if len(raw) else np.zeros(len(self.keys))
+        std = np.nanstd(raw, axis=0) if len(raw) else np.ones(len(self.keys))
+        self.std = np.where(std > 0, std, 1.0)
+        self.points = np.nan_to_num((raw - self.mean) / self.std, nan=0.0)
+        self.tree = KDTree(self.points, leaf_size)
+
+    def weight_vector(self, weights=None):
+        weights = weights or {}
+        vector = np.array([float(weights.get(key, 1.0)) for key in self.keys])
+        if (vector < 0).any():
+            raise ValueError("Los pesos no pueden ser negativos")
+        return vector
+
+    def allowed_mask(self, catalog, position=None, same_treatment=False, ranges=None,
+                     exclude_same_grade=True):
+        """Filas elegibles según las restricciones (None si no hay ninguna)"""
+        if catalog.version != self.version:
+            raise ValueError(f"Índice de la versión {self.version!r}, catálogo {catalog.version!r}")
+        allowed = None
+        if ranges:
+            allowed = np.zeros(catalog.size, dtype=bool)
+            allowed[catalog.query({key: as_range(rng) for key, rng in ranges.items()})] = True
+        if position is not None and same_treatment:
+            same = catalog.condition_codes == catalog.condition_codes[position]
+            allowed = same if allowed is None else allowed & same
+        if position is not None:
+            allowed = np.ones(catalog.size, dtype=bool) if allowed is None else allowed.copy()
+            allowed[position] = False
+            if exclude_same_grade and 'SAE Grade' in catalog.df.columns:
+                grade = catalog.df['SAE Grade'].iat[position]
+                allowed[catalog.grade_positions(grade)] = False
+        return allowed
+
+    def nearest_to_vector(self, target, k=5, weights=None, allowed=None):
+        """(posiciones, distancias) para un vector ya normalizado"""
+        weights = self.weight_vector(weights)
+        candidates = None if allowed is None else np.flatnonzero(allowed)
+        if candidates is not None and len(candidates) <= BRUTE_FORCE_LIMIT:
+            # Restricción muy selectiva: comparar directo es más barato que el árbol
+            diff = self.points[candidates] - target
+            dist = weighted_distance(diff, weights)
+            if 0 < k < len(dist):
+                # Todos los empatados con el k-ésimo entran al desempate por posición
+                kth = dist[np.argpartition(dist, k - 1)[k - 1]]
+                best = np.flatnonzero(dist <= kth)
+            else:
+                best = np.arange(len(dist))
+            best = best[np.lexsort((candidates[best], dist[best]))][:max(k, 0)]
+            return candidates[best], np.sqrt(dist[best])
+        rows, dist = self.tree.query(target, k, weights, allowed)
+        return rows, np.sqrt(dist)
+
+    def substitutes(self, catalog, position, k=5, weights=None, same_treatment=False,
+                    ranges=None, exclude_same_grade=True):
+        """Los k aceros de catalog más parecidos a la fila position (excluyéndola)
+
+        ranges: restricciones duras del catálogo, p. ej. {'c_avg': (None, 0.45)}.
+        """
+        allowed = self.allowed_mask(catalog, position, same_treatment, ranges, exclude_same_grade)
+        return self.nearest_to_vector(self.points[position], k, weights, allowed)
+
+    def contributions(self, position, others, weights=None):
+        """Diferencia normalizada por característica entre position y cada otra fila"""
+        weights = self.weight_vector(weights)
+        diff = self.points[others] - self.points[position]
+        return np.sqrt(weights) * np.abs(diff)
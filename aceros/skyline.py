@@ -0,0 +1,140 @@
+# Frontera de Pareto (skyline) sobre propiedades del catálogo
+# Un acero queda en la frontera si ningún otro es igual o mejor en todas las
+# propiedades elegidas y estrictamente mejor en alguna. Todo se resuelve con
+# ordenamientos (O(N log N) en 2D) en lugar de comparar todos contra todos;
+# en 3D o más una cuadrícula descarta antes a casi todos los dominados.
+
+import numpy as np
+
+# Propiedades donde "mejor" es menor (el resto se maximiza)
+MINIMIZE = {'c_avg'}
+DEFAULT_KEYS = ('uts', 'elong')
+# Candidatos tomados por ronda y celdas (frontera × bloque × dimensiones)
+# comparadas por paso en 3D o más
+FRONT_BLOCK = 256
+BLOCK_CELLS = 2_000_000
+# A partir de cuántos puntos se descartan primero los dominados por cuadrícula
+GRID_MIN_POINTS = 4_096
+# Celdas máximas de la cuadrícula (bins por dimensión = GRID_CELLS ** (1/d))
+GRID_CELLS = 1 << 18
+
+
+def _front_1d(points):
+    return points[:, 0] == points[:, 0].max()
+
+
+def _front_2d(points):
+    """Barrido tras ordenar por x descendente: O(N log N)"""
+    x, y = points[:, 0], points[:, 1]
+    order = np.lexsort((-y, -x))
+    xs, ys = x[order], y[order]
+    # Inicio del grupo de cada punto (mismo x)
+    starts = np.flatnonzero(np.r_[True, xs[1:] != xs[:-1]])
+    group = np.repeat(starts, np.diff(np.r_[starts, len(xs)]))
+    # Máximo de y entre los puntos con x estrictamente mayor
+    running = np.maximum.accumulate(ys)
+    before = np.where(starts > 0, running[np.maximum(starts - 1, 0)], -np.inf)
+    before = np.repeat(before, np.diff(np.r_[starts, len(xs)]))
+    on_front = (ys == ys[group]) & (ys > before)
+    front = np.zeros(len(points), dtype=bool)
+    front[order[on_front]] = True
+    return front
+
+
+def _dominates_any(front, block):
+    """Por cada fila de block, ¿la domina alguna fila de front?"""
+    ge = (front[:, None, :] >= block[None, :, :]).all(axis=2)
+    gt = (front[:, None, :] > block[None, :, :]).any(axis=2)
+    return (ge & gt).any(axis=0)
+
+
+def _grid_survivors(points):
+    """Descarta en O(N) los puntos claramente dominados
+
+    Cada dimensión se divide en bins por cuantiles; un punto cuya celda tiene
+    otra ocupada estrictamente arriba en todas las dimensiones está dominado.
+    """
+    dims = points.shape[1]
+    bins = max(2, int(GRID_CELLS ** (1 / dims)))
+    codes = np.empty(points.shape, dtype=np.intp)
+    for d in range(dims):
+        edges = np.unique(np.quantile(points[:, d], np.linspace(0, 1, bins + 1)[1:-1]))
+        # side='right': un bin mayor implica un valor estrictamente mayor
+        codes[:, d] = np.searchsorted(edges, points[:, d], side='right')
+    shape = (bins,) * dims
+    occupied = np.zeros(shape, dtype=bool)
+    occupied[tuple(codes.T)] = True
+    # above[c] = hay algún punto en una celda >= c en todas las dimensiones
+    above = occupied
+    for d in range(dims):
+        above = np.flip(np.logical_or.accumulate(np.flip(above, d), axis=d), d)
+    # Se consulta la celda c + 1 (fuera de rango: nada arriba)
+    padded = np.zeros(tuple(size + 1 for size in shape), dtype=bool)
+    padded[(slice(0, bins),) * dims] = above
+    return np.flatnonzero(~padded[tuple((codes + 1).T)])
+
+
+def _front_nd(points):
+    """Sort-filter-skyline: tras ordenar por la suma normalizada ningún punto
+    puede ser dominado por uno posterior. Se toma un bloque de los mejores
+    candidatos restantes, su frontera interna es definitiva y con ella se
+    descartan de una pasada todos los candidatos que domina."""
+    candidates = np.arange(len(points))
+    if len(points) >= GRID_MIN_POINTS:
+        candidates = _grid_survivors(points)
+    low = points.min(axis=0)
+    high = points.max(axis=0)
+    span = np.where(high > low, high - low, 1.0)
+    strength = ((points[candidates] - low) / span).sum(axis=1)
+    remaining = candidates[np.argsort(-strength, kind='stable')]
+    dims = points.shape[1]
+    front_rows = []
+    while len(remaining):
+        rows = remaining[:FRONT_BLOCK]
+        block = points[rows]
+        winners = rows[~_dominates_any(block, block)]
+        front_rows.append(winners)
+        rest = remaining[len(rows):]
+        if len(rest) == 0:
+            break
+        # Los demás sólo sobreviven si ningún punto nuevo de la frontera los domina
+        step = max(1, BLOCK_CELLS // (len(winners) * dims))
+        alive = np.concatenate([
+            ~_dominates_any(points[winners], points[rest[start:start + step]])
+            for start in range(0, len(rest), step)
+        ])
+        remaining = rest[alive]
+    mask = np.zeros(len(points), dtype=bool)
+    mask[np.concatenate(front_rows)] = True
+    return mask
+
+
+def pareto_front(points):
+    """Máscara de los puntos no dominados (todas las columnas se maximizan)"""
+    points = np.asarray(points, dtype=np.float64)
+    if len(points) == 0 or points.shape[1] == 0:
+        return np.zeros(len(points), dtype=bool)
+    if points.shape[1] == 1:
+        return _front_1d(points)
+    if points.shape[1] == 2:
+        return _front_2d(points)
+    return _front_nd(points)
+
+
+def skyline(catalog, keys=DEFAULT_KEYS, positions=None):
+    """Posiciones (ascendentes) de la frontera de Pareto dentro de positions
+
+    Las filas sin dato en alguna de las propiedades elegidas no participan.
+    """
+    positions = np.arange(catalog.size) if positions is None else np.asarray(positions)
+    keys = [key for key in keys if key in catalog.values]
+    if not keys or len(positions) == 0:
+        return np.empty(0, dtype=np.intp)
+    columns = []
+    for key in keys:
+        values = catalog.values[key][positions]
+        columns.append(-values if key in MINIMIZE else values)
+    points = np.column_stack(columns)
+    valid = ~np.isnan(points).any(axis=1)
+    front = pareto_front(points[valid])
+    return np.sort(positions[valid][front])
@@ -0,0 +1,131 @@
+# Cubo de estadísticas por tratamiento × propiedad
+# Se construye una vez al cargar el catálogo; los diagramas de caja y las
+# tablas resumen se dibujan desde aquí en O(tratamientos) y no O(filas)
+
+import numpy as np
+import pandas as pd
+
+# Máximo de valores atípicos enviados por lado y celda
+MAX_OUTLIERS = 50
+
+SUMMARY_COLUMNS = ['count', 'mean', 'std', 'min', 'q1', 'median', 'q3', 'max']
+
+
+def _quantile(sorted_values, q):
+    """Cuantil con interpolación lineal (mismo método que plotly) sobre datos ordenados"""
+    position = q * (len(sorted_values) - 1)
+    low = int(np.floor(position))
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (position - low)
+
+
+def _thin(values, limit):
+    if len(values) <= limit:
+        return values
+    return values[np.linspace(0, len(values) - 1, limit).astype(np.intp)]
+
+
+def summarize(sorted_values):
+    """Resumen de caja de un arreglo ordenado sin NaN"""
+    n = len(sorted_values)
+    if n == 0:
+        return None
+    q1 = _quantile(sorted_values, 0.25)
+    q3 = _quantile(sorted_values, 0.75)
+    iqr = q3 - q1
+    low = int(np.searchsorted(sorted_values, q1 - 1.5 * iqr, side='left'))
+    high = int(np.searchsorted(sorted_values, q3 + 1.5 * iqr, side='right'))
+    return {
+        'count': n,
+        'mean': float(sorted_values.mean()),
+        'std': float(sorted_values.std(ddof=1)) if n > 1 else 0.0,
+        'min': float(sorted_values[0]),
+        'q1': float(q1),
+        'median': float(_quantile(sorted_values, 0.5)),
+        'q3': float(q3),
+        'max': float(sorted_values[-1]),
+        # Bigotes: el dato más extremo dentro de 1.5 IQR
+        'lowerfence': float(sorted_values[min(low, n - 1)]),
+        'upperfence': float(sorted_values[max(high - 1, 0)]),
+        'outliers': np.concatenate([
+            _thin(sorted_values[:low], MAX_OUTLIERS),
+            _thin(sorted_values[high:], MAX_OUTLIERS),
+        ]),
+    }
+
+
+class TreatmentStats:
+    """Estadísticas por (tratamiento, propiedad) con actualización incremental
+
+    Guarda los valores ordenados de cada celda para que al agregar filas sólo
+    se fusionen los valores nuevos y se recalculen las celdas afectadas.
+    """
+
+    def __init__(self):
+        self.treatments = []
+        self.sorted = {}
+        self.cells = {}
+
+    @classmethod
+    def from_catalog(cls, catalog):
+        stats = cls()
+        stats.treatments = list(catalog.conditions)
+        codes = catalog.condition_codes
+        for key, values in catalog.values.items():
+            valid = ~np.isnan(values) & (codes >= 0)
+            cell_codes = codes[valid]
+            cell_values = values[valid]
+            order = np.lexsort((cell_values, cell_codes))
+            cell_codes = cell_codes[order]
+            cell_values = cell_values[order]
+            bounds = np.searchsorted(cell_codes, np.arange(len(stats.treatments) + 1))
+            for code, name in enumerate(stats.treatments):
+                stats.sorted[(name, key)] = cell_values[bounds[code]:bounds[code + 1]]
+        for cell, values in stats.sorted.items():
+            stats.cells[cell] = summarize(values)
+        return stats
+
+    def copy(self):
+        """Copia independiente (las celdas no se modifican en sitio, se reemplazan)"""
+        stats = TreatmentStats()
+        stats.treatments = list(self.treatments)
+        stats.sorted = dict(self.sorted)
+        stats.cells = dict(self.cells)
+        return stats
+
+    def append(self, treatments, values):
+        """Agrega filas nuevas: treatments (nombres) y values (clave -> arreglo)"""
+        treatments = np.asarray(treatments, dtype=object)
+        touched = set()
+        for name in pd.unique(treatments):
+            if not isinstance(name, str):
+                continue
+            if name not in self.treatments:
+                self.treatments.append(name)
+            rows = treatments == name
+            for key, column in values.items():
+                new = np.sort(np.asarray(column, dtype=np.float64)[rows])
+                new = new[~np.isnan(new)]
+                if len(new) == 0:
+                    continue
+                old = self.sorted.get((name, key), np.empty(0))
+                merged = np.insert(old, np.searchsorted(old, new), new)
+                self.sorted[(name, key)] = merged
+                touched.add((name, key))
+        for cell in touched:
+            self.cells[cell] = summarize(self.sorted[cell])
+        return touched
+
+    def cell(self, treatment, key):
+        return self.cells.get((treatment, key))
+
+    def table(self, key):
+        """Tabla resumen de una propiedad: una fila por tratamiento"""
+        rows = {}
+        for name in self.treatments:
+            cell = self.cells.get((name, key))
+            if cell is not None:
+                rows[name] = [cell[column] for column in SUMMARY_COLUMNS]
+        table = pd.DataFrame.from_dict(rows, orient='index', columns=SUMMARY_COLUMNS)
+        table.index.name = 'Tratamiento'
+        return table
@@ -11,11 +11,31 @@ INSTRUCCIONES PARA USAR:
 3. Ejecuta: streamlit run app.py
 """
 
+import os
+import time
+import uuid
+
+import numpy as np
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import numpy as np
+
+from aceros import PROPERTIES, SteelCatalog, metrics
+from aceros.assets import PAGE_CSS, logo_html
+from aceros.chemistry import ABSENT, OVERLAPS, PRESENT, WITHIN, ChemFilter, ChemistryIndex
+from aceros.compare import MAX_COMPARE, VariantIndex, distance_matrix, normalized_profile, property_matrix, variant_labels
+from aceros.crossfilter import BinnedCube
+from aceros.export import EXPORT_FORMATS, export_bytes, export_file_name
+from aceros.ingest import SAMPLE_VERSION, add_derived_columns, dataset_version, load_table
+from aceros.memory import SESSIONS
+from aceros.paging import DEFAULT_PAGE_SIZE, PAGE_SIZES, page_bounds, sort_results
+from aceros.query import USE_CASES, SimpleAnswers, technical_score_spec
+from aceros.reload import DatasetWatcher, build_catalog
+from aceros.resultcache import QUERY_CACHE
+from aceros.scoring import rank
+from aceros.shared import open_shared_catalog
+from aceros.similarity import SubstituteIndex
+from aceros.skyline import skyline
+from aceros.stats import TreatmentStats
 
 # ==================== CONFIGURACIÓN INICIAL ====================
 st.set_page_config(
@@ -26,140 +46,23 @@ st.set_page_config(
 )
 
 # ==================== ESTILOS CSS PERSONALIZADOS ====================
-st.markdown("""
-<style>
-    /* Paleta de colores */
-    :root {
-        --primary: #1E3A8A;
-        --secondary: #F59E0B;
-        --success: #10B981;
-        --warning: #EF4444;
-        --bg: #F9FAFB;
-    }
-    
-    /* Ocultar menú de Streamlit */
-    #MainMenu {visibility: hidden;}
-    footer {visibility: hidden;}
-    
-    /* Header personalizado */
-    .main-header {
-        background: linear-gradient(135deg, #1E3A8A 0%, #3B82F6 100%);
-        padding: 2rem;
-        border-radius: 10px;
-        margin-bottom: 2rem;
-        text-align: center;
-        color: white;
-    }
-    
-    /* Cards de modo */
-    .mode-card {
-        background: white;
-        border: 2px solid #E5E7EB;
-        border-radius: 12px;
-        padding: 1.5rem;
-        text-align: center;
-        transition: all 0.3s ease;
-        cursor: pointer;
-        height: 100%;
-    }
-    
-    .mode-card:hover {
-        border-color: #F59E0B;
-        box-shadow: 0 8px 16px rgba(0,0,0,0.1);
-        transform: translateY(-4px);
-    }
-    
-    /* Resultados */
-    .result-card {
-        background: white;
-        border-left: 4px solid #F59E0B;
-        padding: 1.5rem;
-        border-radius: 8px;
-        margin: 1rem 0;
-        box-shadow: 0 2px 8px rgba(0,0,0,0.05);
-    }
-    
-    .medal {
-        font-size: 2rem;
-        margin-right: 0.5rem;
-    }
-    
-    /* Barras de progreso */
-    .progress-bar {
-        background: #E5E7EB;
-        height: 20px;
-        border-radius: 10px;
-        overflow: hidden;
-        margin: 0.5rem 0;
-    }
-    
-    .progress-fill {
-        height: 100%;
-        background: linear-gradient(90deg, #3B82F6, #1E3A8A);
-        transition: width 0.5s ease;
-    }
-    
-    /* Botones */
-    .stButton>button {
-        background: linear-gradient(135deg, #F59E0B 0%, #D97706 100%);
-        color: white;
-        border: none;
-        border-radius: 8px;
-        padding: 0.75rem 2rem;
-        font-weight: 600;
-        transition: all 0.3s ease;
-    }
-    
-    .stButton>button:hover {
-        box-shadow: 0 4px 12px rgba(245, 158, 11, 0.4);
-        transform: translateY(-2px);
-    }
-    
-    /* Logo ASCII */
-    .logo-ascii {
-        font-family: 'Courier New', monospace;
-        font-size: 0.8rem;
-        line-height: 1;
-        color: white;
-        text-align: center;
-        margin-bottom: 1rem;
-    }
-</style>
-""", unsafe_allow_html=True)
+st.markdown(PAGE_CSS, unsafe_allow_html=True)
 
 # ==================== LOGO ASCII ART ====================
 def render_logo():
-    logo = """
-    ╔═══════════════════════════════════════╗
-    ║                                       ║
-    ║     █████╗  ██████╗███████╗██████╗   ║
-    ║    ██╔══██╗██╔════╝██╔════╝██╔══██╗  ║
-    ║    ███████║██║     █████╗  ██████╔╝  ║
-    ║    ██╔══██║██║     ██╔══╝  ██╔══██╗  ║
-    ║    ██║  ██║╚██████╗███████╗██║  ██║  ║
-    ║    ╚═╝  ╚═╝ ╚═════╝╚══════╝╚═╝  ╚═╝  ║
-    ║                                       ║
-    ║    ███████╗██╗███████╗                ║
-    ║    ██╔════╝██║██╔════╝                ║
-    ║    █████╗  ██║███████╗                ║
-    ║    ██╔══╝  ██║╚════██║                ║
-    ║    ██║     ██║███████║                ║
-    ║    ╚═╝     ╚═╝╚══════╝                ║
-    ║                                       ║
-    ║   INGENIERÍA EN MATERIALES            ║
-    ║   UNAM - Facultad de Ingeniería       ║
-    ╚═══════════════════════════════════════╝
-    """
-    st.markdown(f'<div class="logo-ascii">{logo}</div>', unsafe_allow_html=True)
+    st.markdown(logo_html(), unsafe_allow_html=True)
 
 # ==================== CARGA DE DATOS ====================
-@st.cache_data
+DATA_PATH = "steel_data.csv"
+# Archivo de métricas (formato Prometheus) cuando la instrumentación está activa
+METRICS_FILE = os.environ.get('ACEROS_METRICS_FILE', 'aceros_metrics.prom')
+
 def load_data():
     """Carga y preprocesa el dataset de aceros"""
-    # NOTA: Reemplazar con la ruta real del archivo CSV
     try:
-        df = pd.read_csv("steel_data.csv")
-    except:
+        # Snapshot Arrow si el CSV no cambió; si no, lectura por bloques
+        df = load_table(DATA_PATH)
+    except FileNotFoundError:
         # Datos de ejemplo si no se encuentra el archivo
         df = pd.DataFrame({
             'SAE Grade': ['1020', '1045', '1541', '4140', '4150', '5150'],
@@ -172,36 +75,85 @@ def load_data():
             'C (Max)': [0.23, 0.50, 0.44, 0.43, 0.53, 0.53]
         })
     
-    # Calcular C_avg
-    if 'C (Min)' in df.columns and 'C (Max)' in df.columns:
-        df['C_avg'] = (df['C (Min)'] + df['C (Max)']) / 2
-    
-    # Simplificar tratamientos
-    if 'Condition' in df.columns:
-        df['Condition_simple'] = df['Condition'].str.split(' at ').str[0].str.strip()
-    
-    return df
+    return add_derived_columns(df)
 
-# ==================== FUNCIONES DE SCORING ====================
-def calculate_score(row, filters):
-    """Calcula puntuación de coincidencia (0-5 estrellas)"""
-    score = 5.0
-    
-    # Penalizar por desviación de requisitos
-    if 'uts_min' in filters and pd.notna(row.get('UTS (MPa)')):
-        if row['UTS (MPa)'] < filters['uts_min']:
-            score -= 2
-    
-    if 'elongation_min' in filters and pd.notna(row.get('Elongation (%)')):
-        if row['Elongation (%)'] < filters['elongation_min']:
-            score -= 1.5
-    
-    if 'treatments' in filters and filters['treatments']:
-        if row.get('Condition_simple') not in filters['treatments']:
-            score -= 1
-    
-    return max(0, min(5, score))
+@st.cache_resource(max_entries=2)
+def load_catalog(version):
+    """Catálogo columnar e indexado, compartido por todos los procesos del nodo"""
+    metrics.current().miss('load_catalog')
+    if version == SAMPLE_VERSION:
+        return SteelCatalog(load_data(), version=version)
+    # Segmento de sólo lectura mapeado en memoria; sólo el primer proceso lo construye
+    # (si el CSV sólo creció, extendiendo la versión anterior).
+    # max_entries=2 (aquí y en los índices derivados, que no guardan el
+    # catálogo): al cambiar el dataset la versión anterior se suelta
+    return open_shared_catalog(DATA_PATH, version, lambda: build_catalog(DATA_PATH, version))
+
+@st.cache_resource
+def stats_lineage():
+    """Últimas estadísticas por versión, para actualizarlas con las filas agregadas"""
+    return {}
+
+@st.cache_resource(max_entries=2)
+def load_treatment_stats(version):
+    """Cubo de estadísticas por tratamiento × propiedad"""
+    metrics.current().miss('load_treatment_stats')
+    catalog = load_catalog(version)
+    lineage = stats_lineage()
+    previous = lineage.get(catalog.parent[0]) if catalog.parent else None
+    if previous is None:
+        stats = TreatmentStats.from_catalog(catalog)
+    else:
+        # Sólo se fusionan las filas nuevas en las celdas que tocan
+        start = catalog.parent[1]
+        stats = previous.copy()
+        stats.append(catalog.df['Condition_simple'].iloc[start:].to_numpy(dtype=object),
+                     {key: values[start:] for key, values in catalog.values.items()})
+    lineage.clear()
+    lineage[version] = stats
+    return stats
+
+def publish_version(version):
+    """Prepara una versión nueva del dataset (la llama el hilo vigilante)"""
+    load_catalog(version)
+    load_treatment_stats(version)
+
+@st.cache_resource
+def start_watcher():
+    """Un vigilante del CSV por proceso"""
+    return DatasetWatcher(DATA_PATH, publish_version).start()
+
+@st.cache_resource(max_entries=2)
+def load_substitute_index(version):
+    """KD-tree de sustitutos, construido una vez por versión del dataset"""
+    metrics.current().miss('load_substitute_index')
+    return SubstituteIndex(load_catalog(version))
+
+@st.cache_resource(max_entries=2)
+def load_simple_answers(version):
+    """Las 75 respuestas del modo simple, calculadas una vez por versión"""
+    metrics.current().miss('load_simple_answers')
+    return SimpleAnswers(load_catalog(version))
 
+@st.cache_resource(max_entries=2)
+def load_binned_cube(version):
+    """Códigos de bin por fila para los histogramas enlazados"""
+    metrics.current().miss('load_binned_cube')
+    return BinnedCube(load_catalog(version))
+
+@st.cache_resource(max_entries=2)
+def load_variant_index(version):
+    """Índice (grado, condición) -> fila para la comparación"""
+    metrics.current().miss('load_variant_index')
+    return VariantIndex(load_catalog(version))
+
+@st.cache_resource(max_entries=2)
+def load_chemistry_index(version):
+    """Índices por extremo de los rangos de composición"""
+    metrics.current().miss('load_chemistry_index')
+    return ChemistryIndex(load_catalog(version).df)
+
+# ==================== FUNCIONES DE SCORING ====================
 def render_stars(score):
     """Convierte puntuación numérica a estrellas"""
     full_stars = int(score)
@@ -287,8 +239,12 @@ def page_mode_selector():
         st.markdown('</div>', unsafe_allow_html=True)
 
 # ==================== MODO SIMPLE ====================
-def mode_simple(df):
+def mode_simple(catalog):
     """Modo guiado para usuarios no técnicos"""
+    # Las respuestas se calculan al entrar (una vez por versión), no en cada búsqueda
+    with metrics.current().cached_call('load_simple_answers'):
+        answers = load_simple_answers(catalog.version)
+    
     st.sidebar.markdown("## 🏠 MODO SIMPLE")
     st.sidebar.markdown("---")
     
@@ -297,8 +253,7 @@ def mode_simple(df):
     st.sidebar.markdown("¿Para qué lo usarás?")
     use_case = st.sidebar.radio(
         "Aplicación:",
-        ["Construcción/cercas", "Herramientas", "Muebles/estructura", 
-         "Piezas mecánicas", "Cuchillos/corte"],
+        USE_CASES,
         label_visibility="collapsed"
     )
     
@@ -325,26 +280,18 @@ def mode_simple(df):
     )
     
     if st.sidebar.button("🔍 BUSCAR ACEROS", use_container_width=True):
+        recorder = metrics.current()
         # Lógica de filtrado simplificada
-        recommendations = filter_simple_mode(df, use_case, welding, hardness_level)
-        display_simple_results(recommendations)
+        with recorder.stage('filter'):
+            recommendations = filter_simple_mode(catalog, answers, use_case, welding, hardness_level)
+        with recorder.stage('render'):
+            display_simple_results(recommendations)
 
-def filter_simple_mode(df, use_case, welding, hardness_level):
+def filter_simple_mode(catalog, answers, use_case, welding, hardness_level):
     """Filtra aceros según criterios simples"""
-    filtered = df.copy()
-    
-    # Lógica de filtrado basada en casos de uso
-    if welding == "Sí, mucho":
-        filtered = filtered[filtered['C_avg'] < 0.30]
-    elif welding == "Tal vez":
-        filtered = filtered[filtered['C_avg'] < 0.45]
-    
-    if hardness_level <= 2:
-        filtered = filtered[filtered['Hardness (HB)'] < 180]
-    elif hardness_level >= 4:
-        filtered = filtered[filtered['Hardness (HB)'] > 220]
-    
-    return filtered.head(3)
+    # Los 3 mejores por puntuación: consulta a la tabla precalculada
+    best, scores = answers.get(use_case, welding, hardness_level)
+    return catalog.rows(best).assign(score=scores)
 
 def display_simple_results(recommendations):
     """Muestra resultados en modo simple"""
@@ -357,10 +304,12 @@ def display_simple_results(recommendations):
     medals = ["🥇", "🥈", "🥉"]
     labels = ["MEJOR OPCIÓN", "ALTERNATIVA", "OTRA OPCIÓN"]
     
+    # recommendations llega ordenado por puntuación descendente
     for idx, (_, row) in enumerate(recommendations.iterrows()):
         if idx < 3:
             st.markdown(f'<div class="result-card">', unsafe_allow_html=True)
             st.markdown(f"## {medals[idx]} {labels[idx]}: SAE {row['SAE Grade']} ({row['Condition_simple']})")
+            st.markdown(f"**Coincidencia:** {render_stars(row['score'])} ({row['score']:.1f}/5)")
             
             col1, col2 = st.columns([2, 1])
             
@@ -377,53 +326,35 @@ def display_simple_results(recommendations):
             st.markdown('</div>', unsafe_allow_html=True)
 
 # ==================== MODO TÉCNICO ====================
-def mode_technical(df):
+def mode_technical(catalog):
     """Modo avanzado con filtros técnicos"""
     st.sidebar.markdown("## ⚙️ MODO TÉCNICO")
     st.sidebar.markdown("---")
     
     # Filtros numéricos
-    st.sidebar.markdown("### Resistencia a la Tracción (MPa)")
-    uts_range = st.sidebar.slider(
-        "UTS",
-        int(df['UTS (MPa)'].min()), 
-        int(df['UTS (MPa)'].max()),
-        (int(df['UTS (MPa)'].min()), int(df['UTS (MPa)'].max())),
-        label_visibility="collapsed"
-    )
-    
-    st.sidebar.markdown("### Límite Elástico (MPa)")
-    ys_range = st.sidebar.slider(
-        "YS",
-        int(df['YS (MPa)'].min()), 
-        int(df['YS (MPa)'].max()),
-        (int(df['YS (MPa)'].min()), int(df['YS (MPa)'].max())),
-        label_visibility="collapsed"
-    )
-    
-    st.sidebar.markdown("### Dureza (HB)")
-    hardness_range = st.sidebar.slider(
-        "Hardness",
-        int(df['Hardness (HB)'].min()), 
-        int(df['Hardness (HB)'].max()),
-        (int(df['Hardness (HB)'].min()), int(df['Hardness (HB)'].max())),
-        label_visibility="collapsed"
-    )
-    
-    st.sidebar.markdown("### Elongación (%)")
-    elong_range = st.sidebar.slider(
-        "Elongation",
-        int(df['Elongation (%)'].min()), 
-        int(df['Elongation (%)'].max()),
-        (int(df['Elongation (%)'].min()), int(df['Elongation (%)'].max())),
-        label_visibility="collapsed"
-    )
+    ranges = {}
+    sliders = [
+        ('uts', "Resistencia a la Tracción (MPa)", "UTS"),
+        ('ys', "Límite Elástico (MPa)", "YS"),
+        ('hb', "Dureza (HB)", "Hardness"),
+        ('elong', "Elongación (%)", "Elongation"),
+    ]
+    for key, title, label in sliders:
+        low, high = catalog.slider_bounds[key]
+        st.sidebar.markdown(f"### {title}")
+        ranges[key] = st.sidebar.slider(
+            label,
+            low,
+            high,
+            (low, high),
+            label_visibility="collapsed"
+        )
     
     st.sidebar.markdown("---")
     
     # Tratamientos
     st.sidebar.markdown("### Tratamientos Disponibles")
-    treatments = df['Condition_simple'].unique()
+    treatments = catalog.conditions
     selected_treatments = st.sidebar.multiselect(
         "Tratamientos",
         treatments,
@@ -431,86 +362,267 @@ def mode_technical(df):
         label_visibility="collapsed"
     )
     
-    # Aplicar filtros
-    filtered = df[
-        (df['UTS (MPa)'] >= uts_range[0]) & (df['UTS (MPa)'] <= uts_range[1]) &
-        (df['YS (MPa)'] >= ys_range[0]) & (df['YS (MPa)'] <= ys_range[1]) &
-        (df['Hardness (HB)'] >= hardness_range[0]) & (df['Hardness (HB)'] <= hardness_range[1]) &
-        (df['Elongation (%)'] >= elong_range[0]) & (df['Elongation (%)'] <= elong_range[1]) &
-        (df['Condition_simple'].isin(selected_treatments))
-    ]
+    temperature_ranges = temperature_filters(catalog)
+    ranges.update(temperature_ranges)
     
-    # Mostrar resultados
-    st.markdown(f"## RESULTADOS ({len(filtered)} aceros coinciden)")
+    recorder = metrics.current()
     
-    if len(filtered) > 0:
-        # Tabla sorteable
-        st.dataframe(
-            filtered[['SAE Grade', 'Condition_simple', 'UTS (MPa)', 'YS (MPa)', 
-                     'Hardness (HB)', 'Elongation (%)', 'C_avg']],
-            use_container_width=True,
-            height=400
+    # Composición química
+    with recorder.cached_call('load_chemistry_index'):
+        chemistry = load_chemistry_index(catalog.version)
+    chem_rules = chemistry_filters(chemistry)
+    
+    st.sidebar.markdown("---")
+    
+    # Frontera de Pareto sobre las propiedades elegidas
+    st.sidebar.markdown("### Frontera de Pareto")
+    pareto_keys = st.sidebar.multiselect(
+        "Propiedades a maximizar",
+        ['uts', 'ys', 'hb', 'elong'],
+        default=['uts', 'elong'],
+        format_func=lambda key: PROPERTIES[key]
+    )
+    only_pareto = st.sidebar.checkbox("Mostrar sólo la frontera", disabled=not pareto_keys)
+    
+    # Resultado compartido entre sesiones: la misma consulta sobre la misma
+    # versión del dataset sólo se calcula una vez por proceso
+    query_key = filter_key(ranges, selected_treatments) + (tuple(chem_rules), tuple(pareto_keys))
+    with recorder.cached_call('query_cache'):
+        positions, scores, on_front = QUERY_CACHE.get(
+            catalog.version, query_key,
+            lambda: technical_results(catalog, ranges, selected_treatments, chemistry, chem_rules, pareto_keys)
         )
+    if only_pareto:
+        positions, scores, on_front = positions[on_front], scores[on_front], on_front[on_front]
+    
+    # Mostrar resultados
+    st.markdown(f"## RESULTADOS ({len(positions)} aceros coinciden)")
+    if pareto_keys:
+        st.caption(f"{int(on_front.sum())} en la frontera de Pareto de "
+                   + ", ".join(PROPERTIES[key] for key in pareto_keys))
+    
+    if len(positions) > 0:
+        key = filter_key(ranges, selected_treatments) + (tuple(chem_rules),)
+        if only_pareto:
+            key += (tuple(pareto_keys),)
+        
+        # Tabla paginada: el orden se calcula aquí y sólo se envía la página visible
+        temperature_columns = [PROPERTIES[k] for k in temperature_ranges]
+        columns = ['SAE Grade', 'Condition_simple', *temperature_columns, 'UTS (MPa)', 'YS (MPa)',
+                   'Hardness (HB)', 'Elongation (%)', 'C_avg']
+        with recorder.stage('table'):
+            rows = result_page(catalog, positions, key)
+            table = catalog.rows(positions[rows], columns)
+            table.insert(2 + len(temperature_columns), 'score', scores[rows])
+            table.insert(3 + len(temperature_columns), 'pareto', on_front[rows])
+            st.dataframe(
+                table,
+                column_config={
+                    'score': st.column_config.NumberColumn("Puntuación", format="%.2f ★"),
+                    'pareto': st.column_config.CheckboxColumn("Pareto")
+                },
+                use_container_width=True,
+                hide_index=True
+            )
+        recorder.payload('technical_table', table)
         
         # Botón de exportación
-        csv = filtered.to_csv(index=False)
-        st.download_button(
-            "📥 Exportar a CSV",
-            csv,
-            "aceros_filtrados.csv",
-            "text/csv"
-        )
+        with recorder.stage('export'):
+            export_section(catalog, positions, key)
     else:
         st.warning("No se encontraron aceros con estos criterios. Ajusta los filtros.")
 
+def result_page(catalog, positions, key):
+    """Controles de orden y página; devuelve los índices (sobre positions) visibles"""
+    sort_options = ['score'] + [k for k in ('uts', 'ys', 'hb', 'elong', 'c_avg') if k in catalog.values]
+    col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
+    with col1:
+        sort_key = st.selectbox(
+            "Ordenar por",
+            sort_options,
+            format_func=lambda k: "Puntuación" if k == 'score' else PROPERTIES[k],
+            key='table_sort'
+        )
+    with col2:
+        descending = st.toggle("Descendente", value=True, key='table_desc')
+    with col3:
+        size = st.selectbox("Filas por página", PAGE_SIZES, index=PAGE_SIZES.index(DEFAULT_PAGE_SIZE),
+                            key='table_size')
+    
+    # Al cambiar filtros, orden o tamaño se vuelve a la primera página
+    state = (catalog.version, key, sort_key, descending, size)
+    if st.session_state.get('table_state') != state:
+        st.session_state.table_state = state
+        st.session_state.table_page = 1
+    pages = page_bounds(len(positions), 1, size)[2]
+    with col4:
+        page = st.number_input("Página", 1, pages, key='table_page')
+    start, stop, pages = page_bounds(len(positions), page, size)
+    st.caption(f"Mostrando {start + 1}–{stop} de {len(positions)} · página {page} de {pages}")
+    
+    if sort_key == 'score':
+        # positions ya viene por puntuación descendente
+        order = np.arange(len(positions)) if descending else np.arange(len(positions))[::-1]
+        return order[start:stop]
+    return sort_results(catalog, positions, sort_key, descending)[start:stop]
+
+CHEM_MODES = {
+    OVERLAPS: "Se traslapa con",
+    WITHIN: "Dentro de",
+    PRESENT: "Presente",
+    ABSENT: "Ausente",
+}
+
+TEMPERATURE_FILTERS = [
+    ('aust_t', "Austenizado / calentamiento (°C)"),
+    ('temper_t', "Revenido (°C)"),
+]
+
+def technical_results(catalog, ranges, treatments, chemistry, chem_rules, pareto_keys):
+    """(posiciones por puntuación, puntajes, en frontera de Pareto) de una consulta técnica"""
+    recorder = metrics.current()
+    recorder.miss('query_cache')
+    # Sólo depende del catálogo y de la consulta (nada de la sesión): el
+    # resultado se comparte entre sesiones
+    with recorder.stage('filter'):
+        positions = catalog.query(ranges, treatments)
+        if chem_rules:
+            positions = chemistry.query(chem_rules, positions)
+    
+    # Ordenar por puntuación (centro de los rangos acotados)
+    with recorder.stage('rank'):
+        positions, scores = rank(catalog, technical_score_spec(catalog, ranges), positions)
+    
+    with recorder.stage('pareto'):
+        on_front = np.isin(positions, skyline(catalog, pareto_keys, positions))
+    return positions, scores, on_front
+
+def temperature_filters(catalog):
+    """Rangos opcionales de temperatura de tratamiento (excluyen filas sin dato)"""
+    ranges = {}
+    available = [(key, title) for key, title in TEMPERATURE_FILTERS if key in catalog.slider_bounds]
+    if not available:
+        return ranges
+    with st.sidebar.expander("🌡️ Temperaturas de tratamiento"):
+        for key, title in available:
+            low, high = catalog.slider_bounds[key]
+            if not st.checkbox(title, key=f"temp_on_{key}"):
+                continue
+            if low == high:
+                ranges[key] = (low, high)
+                st.caption(f"{low} °C")
+                continue
+            ranges[key] = st.slider(title, low, high, (low, high), step=5,
+                                    key=f"temp_{key}", label_visibility="collapsed")
+    return ranges
+
+def chemistry_filters(chemistry):
+    """Controles de composición en la barra lateral; devuelve los criterios"""
+    rules = []
+    with st.sidebar.expander("🧪 Composición química"):
+        elements = st.multiselect("Elementos", chemistry.elements)
+        for element in elements:
+            low, high = chemistry.bounds(element)
+            mode = st.selectbox(
+                f"{element} (%)",
+                list(CHEM_MODES),
+                format_func=CHEM_MODES.get,
+                key=f"chem_mode_{element}"
+            )
+            lo = hi = None
+            if mode in (OVERLAPS, WITHIN):
+                # Vacío = sin límite por ese lado
+                col1, col2 = st.columns(2)
+                with col1:
+                    lo = st.number_input("Mín", 0.0, value=None, step=0.01, format="%.3f",
+                                         placeholder=f"{low:.3f}", key=f"chem_lo_{element}")
+                with col2:
+                    hi = st.number_input("Máx", 0.0, value=None, step=0.01, format="%.3f",
+                                         placeholder=f"{high:.3f}", key=f"chem_hi_{element}")
+            rules.append(ChemFilter(element, mode, lo, hi))
+    return rules
+
+def filter_key(ranges, treatments):
+    """Llave hashable del estado de los filtros"""
+    return (tuple(sorted(ranges.items())), tuple(sorted(treatments)))
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def export_results(version, key, columns, fmt, _catalog, _positions):
+    """Archivo exportado, memoizado por versión del dataset y estado de filtros"""
+    metrics.current().miss('export_results')
+    return export_bytes(_catalog, _positions, columns, fmt)
+
+def export_section(catalog, positions, key):
+    """Opciones de exportación; el archivo se genera sólo al hacer clic"""
+    with st.expander("📥 Exportar resultados"):
+        col1, col2 = st.columns([1, 2])
+        with col1:
+            fmt = st.selectbox(
+                "Formato",
+                list(EXPORT_FORMATS),
+                format_func=lambda f: EXPORT_FORMATS[f][0]
+            )
+        with col2:
+            all_columns = list(catalog.df.columns)
+            columns = st.multiselect("Columnas", all_columns, default=all_columns)
+        
+        if not columns:
+            st.info("Selecciona al menos una columna.")
+            return
+        
+        columns = tuple(columns)
+        # El archivo se genera recién cuando se pide (y queda memoizado);
+        # download_button recibe bytes, que aceptan todas las versiones de Streamlit
+        request = (catalog.version, key, columns, fmt)
+        if st.session_state.get('export_request') != request:
+            if not st.button(f"⚙️ Preparar {EXPORT_FORMATS[fmt][0]}"):
+                return
+            st.session_state.export_request = request
+        st.download_button(
+            f"📥 Exportar a {EXPORT_FORMATS[fmt][0]}",
+            export_results(catalog.version, key, columns, fmt, catalog, positions),
+            export_file_name("aceros_filtrados", fmt),
+            EXPORT_FORMATS[fmt][1]
+        )
+
 # ==================== MODO EXPLORAR ====================
-def mode_explore(df):
+# Columna del dataset -> clave del catálogo
+PROPERTY_KEYS = {column: key for key, column in PROPERTIES.items()}
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def explore_figure(version, tab, property_choice, _catalog):
+    """Figura memoizada por (versión del dataset, pestaña, propiedad)"""
+    # Plotly sólo se importa cuando se usa el modo Explorar
+    from aceros.figures import carbon_figure, pareto_figure, treatment_box_figure
+    
+    metrics.current().miss('explore_figure')
+    if tab == 'carbon':
+        return carbon_figure(_catalog)
+    if tab == 'pareto':
+        y_key = PROPERTY_KEYS[property_choice]
+        fig = pareto_figure(_catalog, 'elong', y_key, skyline(_catalog, (y_key, 'elong')))
+        fig.update_layout(xaxis_title="Elongación (%)", yaxis_title=property_choice)
+        return fig
+    with metrics.current().cached_call('load_treatment_stats'):
+        stats = load_treatment_stats(version)
+    return treatment_box_figure(stats, PROPERTY_KEYS[property_choice], property_choice)
+
+def mode_explore(catalog):
     """Modo de visualización y análisis"""
+    recorder = metrics.current()
     st.markdown("## 📊 EXPLORACIÓN DE DATOS")
     
-    tabs = st.tabs(["Propiedades vs %C", "Tratamientos", "Comparación"])
+    tabs = st.tabs(["Propiedades vs %C", "Tratamientos", "Comparación", "Sustitutos",
+                    "Resistencia vs Ductilidad", "Filtros enlazados"])
     
     with tabs[0]:
         st.markdown("### Propiedades Mecánicas vs Contenido de Carbono")
         
-        fig = go.Figure()
-        
-        fig.add_trace(go.Scatter(
-            x=df['C_avg'], y=df['UTS (MPa)'],
-            mode='markers+lines',
-            name='UTS',
-            line=dict(color='#3B82F6')
-        ))
-        
-        fig.add_trace(go.Scatter(
-            x=df['C_avg'], y=df['YS (MPa)'],
-            mode='markers+lines',
-            name='YS',
-            line=dict(color='#10B981')
-        ))
-        
-        fig.add_trace(go.Scatter(
-            x=df['C_avg'], y=df['Hardness (HB)'] * 4,
-            mode='markers+lines',
-            name='Dureza (×4)',
-            line=dict(color='#EF4444')
-        ))
-        
-        fig.add_trace(go.Scatter(
-            x=df['C_avg'], y=df['Elongation (%)'] * 20,
-            mode='markers+lines',
-            name='Elongación (×20)',
-            line=dict(color='#F59E0B')
-        ))
-        
-        fig.update_layout(
-            xaxis_title="Contenido de Carbono (%)",
-            yaxis_title="Valor",
-            hovermode='x unified',
-            height=500
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        with recorder.stage('carbon_figure'), recorder.cached_call('explore_figure'):
+            fig = explore_figure(catalog.version, 'carbon', None, catalog)
+        with recorder.stage('carbon_chart'):
+            st.plotly_chart(fig, use_container_width=True)
+        recorder.payload('carbon_chart', fig)
     
     with tabs[1]:
         st.markdown("### Comparación de Tratamientos Térmicos")
@@ -520,50 +632,207 @@ def mode_explore(df):
             ["UTS (MPa)", "YS (MPa)", "Hardness (HB)", "Elongation (%)"]
         )
         
-        fig = px.box(
-            df, 
-            x='Condition_simple', 
-            y=property_choice,
-            color='Condition_simple',
-            title=f"Distribución de {property_choice} por Tratamiento"
-        )
+        with recorder.stage('treatment_figure'), recorder.cached_call('explore_figure'):
+            fig = explore_figure(catalog.version, 'treatments', property_choice, catalog)
+        with recorder.stage('treatment_chart'):
+            st.plotly_chart(fig, use_container_width=True)
+        recorder.payload('treatment_chart', fig)
         
-        fig.update_layout(height=500, showlegend=False)
-        st.plotly_chart(fig, use_container_width=True)
+        # Resumen desde el cubo precalculado
+        with recorder.stage('treatment_table'):
+            with recorder.cached_call('load_treatment_stats'):
+                stats = load_treatment_stats(catalog.version)
+            summary = stats.table(PROPERTY_KEYS[property_choice]).round(1)
+            st.dataframe(summary, use_container_width=True)
+        recorder.payload('treatment_table', summary)
     
     with tabs[2]:
-        st.markdown("### Comparación Directa de Aceros")
+        with recorder.stage('compare'):
+            comparison_section(catalog)
+    
+    with tabs[3]:
+        with recorder.stage('substitutes'):
+            substitutes_section(catalog)
+    
+    with tabs[4]:
+        st.markdown("### Frontera de Pareto: Resistencia vs Elongación")
         
-        selected_steels = st.multiselect(
-            "Selecciona hasta 3 aceros para comparar:",
-            df['SAE Grade'].unique(),
-            max_selections=3
+        strength_choice = st.selectbox(
+            "Propiedad de resistencia:",
+            ["UTS (MPa)", "YS (MPa)", "Hardness (HB)"]
         )
-        
-        if selected_steels:
-            comparison_df = df[df['SAE Grade'].isin(selected_steels)]
-            
-            fig = go.Figure()
-            
-            properties = ['UTS (MPa)', 'YS (MPa)', 'Hardness (HB)', 'Elongation (%)']
-            
-            for steel in selected_steels:
-                steel_data = comparison_df[comparison_df['SAE Grade'] == steel].iloc[0]
-                values = [steel_data[prop] for prop in properties]
-                
-                fig.add_trace(go.Bar(
-                    name=f"SAE {steel}",
-                    x=properties,
-                    y=values
-                ))
-            
-            fig.update_layout(
-                barmode='group',
-                height=500,
-                title="Comparación de Propiedades"
-            )
-            
+        with recorder.stage('pareto_figure'), recorder.cached_call('explore_figure'):
+            fig = explore_figure(catalog.version, 'pareto', strength_choice, catalog)
+        with recorder.stage('pareto_chart'):
             st.plotly_chart(fig, use_container_width=True)
+        recorder.payload('pareto_chart', fig)
+    
+    with tabs[5]:
+        with recorder.stage('crossfilter'):
+            crossfilter_section(catalog)
+
+@st.fragment
+def crossfilter_section(catalog):
+    """Histogramas enlazados: acotar una propiedad recuenta las demás al instante"""
+    from aceros.figures import linked_histogram
+    
+    st.markdown("### Filtros Enlazados")
+    with metrics.current().cached_call('load_binned_cube'):
+        cube = load_binned_cube(catalog.version)
+    
+    def reset():
+        for key in cube.keys:
+            st.session_state.pop(f"xf_{key}", None)
+    
+    # Cada filtro es un tramo de bordes de bin: (i, j) = bins i..j-1
+    brushes, slots = {}, {}
+    columns = st.columns(2)
+    for i, key in enumerate(cube.keys):
+        edges = cube.edges[key]
+        with columns[i % 2]:
+            first, stop = st.select_slider(
+                PROPERTIES[key],
+                options=list(range(cube.bins + 1)),
+                value=(0, cube.bins),
+                format_func=lambda b, edges=edges: f"{edges[b]:.3g}",
+                key=f"xf_{key}"
+            )
+            brushes[key] = (first, stop - 1)
+            slots[key] = st.empty()
+    
+    started = time.perf_counter()
+    counts, selected = cube.counts(brushes)
+    elapsed = (time.perf_counter() - started) * 1000
+    for key in cube.keys:
+        first, last = brushes[key]
+        slots[key].plotly_chart(
+            linked_histogram(cube.edges[key], cube.totals[key], counts[key], PROPERTIES[key], first, last),
+            use_container_width=True,
+            key=f"xf_chart_{key}"
+        )
+    
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        st.caption(f"{selected} de {cube.size} aceros cumplen todos los filtros "
+                   f"(recuento en {elapsed:.1f} ms)")
+    with col2:
+        st.button("Restablecer filtros", on_click=reset)
+
+def comparison_section(catalog):
+    """Comparación de muchos aceros: matriz de propiedades y de distancias"""
+    from aceros.figures import distance_heatmap, radar_figure
+    
+    st.markdown("### Comparación Directa de Aceros")
+    
+    with metrics.current().cached_call('load_variant_index'):
+        index = load_variant_index(catalog.version)
+    
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        selected = st.multiselect("Aceros a comparar (SAE):", catalog.grades)
+    with col2:
+        family = st.text_input("Familia (prefijo SAE)", placeholder="Ej. 41")
+    if family.strip():
+        # Familia completa, p. ej. todos los 41xx
+        prefix = family.strip()
+        selected = selected + [g for g in catalog.grades if str(g).startswith(prefix) and g not in selected]
+    if not selected:
+        return
+    
+    all_conditions = st.checkbox("Incluir todas las condiciones de cada acero", value=True)
+    if all_conditions:
+        positions = np.concatenate([catalog.grade_positions(grade) for grade in selected])
+    else:
+        options = [(grade, condition) for grade in selected for condition, _ in index.variants(grade)]
+        defaults = list({grade: (grade, condition) for grade, condition in reversed(options)}.values())[::-1]
+        pairs = st.multiselect(
+            "Condiciones:",
+            options,
+            default=defaults,
+            format_func=lambda pair: f"SAE {pair[0]} · {pair[1]}"
+        )
+        positions = index.lookup(pairs)
+        positions = positions[positions >= 0]
+    if len(positions) == 0:
+        return
+    if len(positions) > MAX_COMPARE:
+        st.warning(f"Se comparan los primeros {MAX_COMPARE} de {len(positions)} aceros")
+        positions = positions[:MAX_COMPARE]
+    
+    keys, matrix = property_matrix(catalog, positions)
+    labels = variant_labels(catalog, positions)
+    axis_labels = [PROPERTIES[key] for key in keys]
+    
+    view = st.radio("Vista:", ["Mapa de distancias", "Radar"], horizontal=True)
+    if view == "Mapa de distancias":
+        fig = distance_heatmap(labels, distance_matrix(catalog, keys, matrix))
+    else:
+        fig = radar_figure(labels, axis_labels, normalized_profile(catalog, keys, matrix))
+    st.plotly_chart(fig, use_container_width=True)
+    metrics.current().payload('compare_chart', fig)
+    
+    st.dataframe(pd.DataFrame(matrix, index=labels, columns=axis_labels), use_container_width=True)
+
+def substitutes_section(catalog):
+    """¿Qué acero puede sustituir a otro? Vecinos más cercanos en propiedades y química"""
+    st.markdown("### Buscar Sustitutos")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        grade = st.selectbox("Acero de referencia (SAE):", catalog.grades)
+    candidates = catalog.grade_positions(grade)
+    with col2:
+        position = st.selectbox(
+            "Condición:",
+            list(candidates),
+            format_func=lambda p: catalog.df['Condition'].iat[p]
+        )
+    if position is None:
+        return
+    
+    with metrics.current().cached_call('load_substitute_index'):
+        index = load_substitute_index(catalog.version)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        k = st.slider("Alternativas", 1, 20, 5)
+    with col2:
+        same_treatment = st.checkbox("Mismo tratamiento")
+        other_grades = st.checkbox("Sólo otros grados", value=True)
+    with col3:
+        # Límites reales del carbono (los de los sliders están redondeados a enteros)
+        c_high = float(catalog.bounds('c_avg')[1])
+        max_carbon = st.number_input("Carbono máximo (%)", 0.0, c_high, c_high, step=0.01, format="%.2f")
+    
+    with st.expander("Pesos por característica"):
+        columns = st.columns(len(index.keys))
+        weights = {}
+        for column, key in zip(columns, index.keys):
+            with column:
+                weights[key] = st.number_input(index.labels[key], 0.0, 5.0, 1.0, step=0.5, key=f"w_{key}")
+    
+    ranges = {'c_avg': (None, max_carbon)} if max_carbon < c_high else None
+    started = time.perf_counter()
+    positions, distances = index.substitutes(
+        catalog, int(position), k, weights, same_treatment, ranges, exclude_same_grade=other_grades
+    )
+    elapsed = (time.perf_counter() - started) * 1000
+    
+    st.caption(f"{len(positions)} alternativas en {elapsed:.2f} ms")
+    if len(positions) == 0:
+        st.warning("Ningún acero cumple las restricciones.")
+        return
+    
+    st.dataframe(
+        catalog.rows(positions, ['SAE Grade', 'Condition_simple', 'UTS (MPa)', 'YS (MPa)',
+                                 'Hardness (HB)', 'Elongation (%)', 'C_avg'])
+        .assign(distancia=distances),
+        column_config={
+            'distancia': st.column_config.NumberColumn("Distancia", format="%.2f")
+        },
+        use_container_width=True,
+        hide_index=True
+    )
 
 # ==================== APLICACIÓN PRINCIPAL ====================
 def main():
@@ -575,9 +844,6 @@ def main():
     if 'mode' not in st.session_state:
         st.session_state.mode = None
     
-    # Cargar datos
-    df = load_data()
-    
     # Navegación
     if st.session_state.page == 'landing':
         page_landing()
@@ -586,6 +852,24 @@ def main():
         page_mode_selector()
     
     elif st.session_state.page == 'app':
+        recorder = metrics.current()
+        # Los datos sólo se cargan en las páginas que los usan
+        version = dataset_version(DATA_PATH)
+        if version != SAMPLE_VERSION:
+            # La versión que ya confirmó el vigilante (dos revisiones iguales),
+            # no el mtime/tamaño de este instante: un CSV a medio escribir
+            # no llega a las sesiones
+            version = start_watcher().version
+        with recorder.stage('load'), recorder.cached_call('load_catalog'):
+            catalog = load_catalog(version)
+        
+        # Aviso cuando la sesión pasa a una versión nueva del dataset
+        seen = st.session_state.get('dataset_rows')
+        if seen is not None and st.session_state.get('dataset_version') != version:
+            st.toast(f"Catálogo actualizado: {len(catalog)} aceros ({len(catalog) - seen:+d})")
+        st.session_state.dataset_version = version
+        st.session_state.dataset_rows = len(catalog)
+        
         # Botón de regreso
         if st.sidebar.button("⬅️ Cambiar Modo"):
             st.session_state.page = 'selector'
@@ -594,12 +878,19 @@ def main():
         st.sidebar.markdown("---")
         
         # Ejecutar modo seleccionado
-        if st.session_state.mode == 'simple':
-            mode_simple(df)
-        elif st.session_state.mode == 'technical':
-            mode_technical(df)
-        elif st.session_state.mode == 'explore':
-            mode_explore(df)
+        mode = st.session_state.mode
+        with recorder.stage(f'mode_{mode}'):
+            if mode == 'simple':
+                mode_simple(catalog)
+            elif mode == 'technical':
+                mode_technical(catalog)
+            elif mode == 'explore':
+                mode_explore(catalog)
+    
+    # Recorrer el estado cuesta en cada rerun: sólo si se exportan métricas
+    if metrics.enabled():
+        with metrics.current().stage('session_memory'):
+            account_session_memory()
     
     # Footer
     st.markdown("---")
@@ -610,5 +901,66 @@ def main():
     </div>
     """, unsafe_allow_html=True)
 
+# ==================== MEMORIA POR SESIÓN ====================
+def account_session_memory():
+    """Mide el estado de la sesión (sin el catálogo compartido) contra su presupuesto"""
+    if 'session_id' not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+    return SESSIONS.observe(st.session_state.session_id, st.session_state,
+                            st.session_state.get('dataset_rows', 0), skip=(SteelCatalog,))
+
+# ==================== INSTRUMENTACIÓN ====================
+def render_debug_panel(recorder):
+    """Panel oculto (?debug=1) con las mediciones del rerun y el acumulado del proceso"""
+    with st.sidebar.expander("🛠️ Depuración", expanded=False):
+        st.markdown(f"**Rerun:** {recorder.total() * 1000:.1f} ms "
+                    f"(medición: {recorder.overhead * 1000:.1f} ms)")
+        st.dataframe(
+            pd.DataFrame(recorder.stages, columns=['Etapa', 'ms']).assign(ms=lambda t: t['ms'] * 1000).round(2),
+            hide_index=True,
+            use_container_width=True
+        )
+        if recorder.payloads:
+            st.markdown("**Payloads (KB)**")
+            st.json({name: round(size / 1024, 1) for name, size in recorder.payloads.items()})
+        if metrics.REGISTRY.cache:
+            st.markdown("**Aciertos de caché (proceso)**")
+            st.json({name: f"{metrics.REGISTRY.hit_rate(name):.0%} de {hits + misses}"
+                     for name, (hits, misses) in metrics.REGISTRY.cache.items()})
+        st.markdown("**Caché de consultas (proceso)**")
+        st.json(QUERY_CACHE.stats())
+        
+        st.markdown("**Memoria (KB)**")
+        sizes = SESSIONS.measure(st.session_state, skip=(SteelCatalog,))
+        memory = {
+            'sesión': round(sum(sizes.values()) / 1024, 1),
+            'presupuesto por sesión': round(SESSIONS.budget_for(st.session_state.get('dataset_rows', 0)) / 1024, 1),
+            'mayores entradas': {key: round(size / 1024, 1)
+                                 for key, size in sorted(sizes.items(), key=lambda item: -item[1])[:5]},
+        }
+        version = st.session_state.get('dataset_version')
+        if version is not None:
+            # Compartido por todas las sesiones del proceso (y, con segmentos, del nodo)
+            memory['catálogo compartido'] = round(load_catalog(version).nbytes() / 1024, 1)
+        st.json(memory)
+
+def run():
+    """main() instrumentado; sin ACEROS_METRICS ni ?debug=1 no mide nada"""
+    debug = st.query_params.get('debug') == '1'
+    recorder = metrics.RerunRecorder(enabled=debug or metrics.enabled())
+    if not recorder.enabled:
+        main()
+        return
+    
+    with metrics.activate(recorder), recorder.stage('rerun'):
+        main()
+    metrics.REGISTRY.record(recorder)
+    try:
+        metrics.REGISTRY.write(METRICS_FILE)
+    except OSError:
+        pass
+    if debug:
+        render_debug_panel(recorder)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    run()
\ No newline at end of file
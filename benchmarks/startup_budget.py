@@ -0,0 +1,107 @@
+# Presupuesto de arranque de la página de inicio
+#
+# Mide en un intérprete nuevo (como un contenedor recién levantado) el import
+# de Streamlit, la primera ejecución de app.py en la página de inicio y los
+# reruns, y verifica que Plotly/figuras no se importen en esa página. Se
+# repite en varios intérpretes y se compara la mediana con el presupuesto
+# (una sola medición varía demasiado para usarse como control).
+#
+# Uso:
+#   python benchmarks/startup_budget.py [--runs 5] [--json salida.json]
+# Sale con código 1 si alguna mediana excede el presupuesto.
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Presupuestos en segundos
+BUDGET = {
+    'first_run_s': 1.5,
+    'rerun_s': 0.15,
+}
+# Módulos que no deben cargarse en la página de inicio (aceros.figures
+# importa plotly.graph_objects al cargarse). Algunas versiones de Streamlit
+# ya importan plotly.graph_objects por su cuenta; sólo se reporta lo que
+# carga la app además de lo que trae el import de Streamlit.
+LAZY_MODULES = ['plotly', 'plotly.graph_objects', 'aceros.figures']
+# Intérpretes medidos y reruns por intérprete
+RUNS = 5
+RERUNS = 5
+TIMINGS = ('streamlit_import_s', 'first_run_s', 'rerun_s')
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app.py')
+
+PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+t1 = time.perf_counter()
+preloaded = set(sys.modules)
+at = AppTest.from_file({app!r}, default_timeout=60)
+at.run()
+t2 = time.perf_counter()
+reruns = []
+for _ in range({reruns}):
+    start = time.perf_counter()
+    at.run()
+    reruns.append(time.perf_counter() - start)
+print(json.dumps({{
+    'streamlit_import_s': t1 - t0,
+    'first_run_s': t2 - t1,
+    'rerun_s': sorted(reruns)[len(reruns) // 2],
+    'errors': [str(e.message) for e in at.exception],
+    'loaded': [m for m in {lazy!r} if m in sys.modules and m not in preloaded],
+}}))
+"""
+
+
+def measure_once():
+    code = PROBE.format(app=APP, lazy=LAZY_MODULES, reruns=RERUNS)
+    output = subprocess.run(
+        [sys.executable, '-c', code],
+        cwd=os.path.dirname(APP),
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure(runs=RUNS):
+    """Mediana de cada tiempo sobre varios intérpretes nuevos"""
+    samples = [measure_once() for _ in range(runs)]
+    result = {key: statistics.median(sample[key] for sample in samples) for key in TIMINGS}
+    result['samples'] = {key: [sample[key] for sample in samples] for key in TIMINGS}
+    result['errors'] = sorted({error for sample in samples for error in sample['errors']})
+    result['loaded'] = sorted({module for sample in samples for module in sample['loaded']})
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Presupuesto de arranque de la página de inicio")
+    parser.add_argument('--runs', type=int, default=RUNS, help="Intérpretes a medir (default: %(default)s)")
+    parser.add_argument('--json', help="Guardar la medición en este archivo")
+    args = parser.parse_args(argv)
+
+    result = measure(max(1, args.runs))
+    failures = [f"{key} = {result[key]:.3f}s > {limit}s" for key, limit in BUDGET.items()
+                if result[key] > limit]
+    failures += [f"{module} cargado en la página de inicio" for module in result['loaded']]
+    failures += [f"excepción: {error}" for error in result['errors']]
+
+    for key in TIMINGS:
+        limit = BUDGET.get(key)
+        print(f"{key:20s} {result[key]:7.3f}s (mediana)" + (f"  (presupuesto {limit}s)" if limit else ""))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as handle:
+            json.dump(dict(result, budget=BUDGET, failures=failures), handle, indent=2)
+    for failure in failures:
+        print(f"FALLA: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,186 @@
+# Suite de rendimiento sobre catálogos sintéticos (10³–10⁶ filas)
+#
+# Genera un CSV sintético por tamaño (benchmarks/synthetic.py) y mide, sin
+# navegador, las mismas rutas que ejecuta la app: carga e ingesta, modo simple,
+# filtro técnico, puntuación, exportación CSV y figuras de Explorar.
+# Por etapa reporta latencias (p50/p95/p99), throughput (filas/s) y memoria
+# pico (tracemalloc) en un JSON.
+#
+# Uso:
+#   python benchmarks/suite.py --sizes 1000 10000 100000 1000000 -o bench_results.json
+
+import argparse
+import gc
+import itertools
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from aceros import SteelCatalog  # noqa: E402
+from aceros.export import export_bytes  # noqa: E402
+from aceros.ingest import add_derived_columns, load_table, read_catalog_csv  # noqa: E402
+from aceros.query import (HARDNESS_LEVELS, USE_CASES, WELDING_OPTIONS, SimpleAnswers,  # noqa: E402
+                          run_query, simple_query, technical_score_spec)
+from aceros.scoring import rank  # noqa: E402
+from aceros.stats import TreatmentStats  # noqa: E402
+
+import synthetic  # noqa: E402
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+DEFAULT_REPEATS = 20
+EXPORT_COLUMNS = ['SAE Grade', 'Condition_simple', 'UTS (MPa)', 'YS (MPa)',
+                  'Hardness (HB)', 'Elongation (%)', 'C_avg']
+
+
+def _percentiles(samples):
+    samples = np.asarray(samples) * 1000
+    return {
+        'p50_ms': float(np.percentile(samples, 50)),
+        'p95_ms': float(np.percentile(samples, 95)),
+        'p99_ms': float(np.percentile(samples, 99)),
+        'max_ms': float(samples.max()),
+    }
+
+
+def measure(fn, repeats, rows):
+    """Latencias de repeats llamadas y memoria pico de una llamada aparte
+
+    La llamada con tracemalloc (que además calienta cachés) no entra en las
+    latencias porque el rastreo la hace varias veces más lenta.
+    """
+    gc.collect()
+    tracemalloc.start()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    stage = _percentiles(samples)
+    stage['runs'] = len(samples)
+    median = float(np.median(samples))
+    stage['rows_per_s'] = rows / median if median > 0 else None
+    stage['peak_mb'] = peak / 2**20
+    return stage, result
+
+
+def _technical_steps(catalog, count, seed):
+    """Secuencia de movimientos de sliders como los de una sesión real"""
+    rng = np.random.default_rng(seed)
+    keys = ['uts', 'ys', 'hb', 'elong']
+    ranges = {key: catalog.slider_bounds[key] for key in keys}
+    steps = []
+    for _ in range(count):
+        key = keys[rng.integers(len(keys))]
+        low, high = catalog.slider_bounds[key]
+        a, b = np.sort(rng.uniform(low, high, 2))
+        ranges = dict(ranges, **{key: (a, b)})
+        steps.append(ranges)
+    return steps
+
+
+def run_size(rows, repeats, workdir, seed=0):
+    path = os.path.join(workdir, f'steel_{rows}.csv')
+    started = time.perf_counter()
+    synthetic.write_csv(synthetic.generate(rows, seed), path)
+    results = {'rows': rows, 'csv_mb': os.path.getsize(path) / 2**20,
+               'generate_s': time.perf_counter() - started, 'stages': {}}
+    stages = results['stages']
+    cache_dir = os.path.join(workdir, 'cache')
+    slow_repeats = max(1, min(repeats, 3 if rows >= 100_000 else repeats))
+
+    # Ingesta en frío (CSV) y carga desde el snapshot
+    stages['ingest_csv'], df = measure(lambda: add_derived_columns(read_catalog_csv(path)),
+                                       slow_repeats, rows)
+    load_table(path, cache_dir=cache_dir)
+    stages['load_snapshot'], df = measure(
+        lambda: add_derived_columns(load_table(path, cache_dir=cache_dir)), slow_repeats, rows)
+    stages['build_catalog'], catalog = measure(lambda: SteelCatalog(df, version=str(rows)),
+                                               slow_repeats, rows)
+
+    # Modo simple: las 75 combinaciones del cuestionario
+    combos = itertools.cycle(itertools.product(USE_CASES, WELDING_OPTIONS, HARDNESS_LEVELS))
+    stages['simple_query'], _ = measure(
+        lambda: run_query(catalog, simple_query(*next(combos))), max(repeats, 75), rows)
+    # Tabla precalculada: construcción al cargar y búsqueda por clic
+    stages['simple_answers_build'], answers = measure(lambda: SimpleAnswers(catalog),
+                                                      slow_repeats, rows)
+    stages['simple_answers_get'], _ = measure(
+        lambda: answers.get(*next(combos)), max(repeats, 75), rows)
+
+    # Modo técnico: una secuencia de movimientos de sliders
+    steps = _technical_steps(catalog, max(repeats, 50), seed)
+    treatments = catalog.conditions[: max(1, len(catalog.conditions) // 2)]
+    full_steps = itertools.cycle(steps)
+    stages['technical_query'], _ = measure(
+        lambda: catalog.query(next(full_steps), conditions=treatments), len(steps), rows)
+
+    # Puntuación del catálogo completo
+    positions = catalog.query(steps[0])
+    spec = technical_score_spec(catalog, steps[0])
+    stages['score_rank'], _ = measure(lambda: rank(catalog, spec, positions), repeats, rows)
+
+    # Exportación CSV de todo el catálogo
+    everything = np.arange(len(catalog))
+    stages['export_csv'], payload = measure(
+        lambda: export_bytes(catalog, everything, EXPORT_COLUMNS, 'csv'), slow_repeats, rows)
+    stages['export_csv']['bytes'] = len(payload)
+
+    # Figuras de Explorar (construcción y serialización a JSON)
+    from aceros.figures import carbon_figure, treatment_box_figure
+    stages['figure_carbon'], payload = measure(lambda: carbon_figure(catalog).to_json(),
+                                               slow_repeats, rows)
+    stages['figure_carbon']['bytes'] = len(payload)
+    stages['treatment_stats'], stats = measure(lambda: TreatmentStats.from_catalog(catalog),
+                                               slow_repeats, rows)
+    stages['figure_treatments'], payload = measure(
+        lambda: treatment_box_figure(stats, 'uts', 'UTS (MPa)').to_json(), repeats, rows)
+    stages['figure_treatments']['bytes'] = len(payload)
+
+    os.remove(path)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Suite de rendimiento con catálogos sintéticos")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', default='bench_results.json')
+    args = parser.parse_args(argv)
+
+    report = {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'started': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'sizes': [],
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        for rows in args.sizes:
+            result = run_size(rows, args.repeats, workdir, args.seed)
+            report['sizes'].append(result)
+            print(f"{rows:>9} filas")
+            for name, stage in result['stages'].items():
+                print(f"    {name:<22} p50 {stage['p50_ms']:9.2f} ms  p95 {stage['p95_ms']:9.2f} ms"
+                      f"  pico {stage['peak_mb']:8.1f} MB")
+
+    with open(args.output, 'w', encoding='utf-8') as handle:
+        json.dump(report, handle, indent=2)
+    print(f"Resultados -> {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+# Generador de catálogos sintéticos a partir de steel_data.csv
+#
+# Conserva las 27 columnas, los textos de Conditions tal como vienen en el
+# archivo original (mojibake, 'T' en vez de °F, celdas multilínea) y la
+# correlación de cada propiedad con el carbono por tratamiento.
+#
+# Uso:
+#   python benchmarks/synthetic.py 100000 -o /tmp/steel_100k.csv
+
+import argparse
+import csv
+import os
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE = os.path.join(ROOT, 'steel_data.csv')
+
+PROPERTY_COLUMNS = ['UTS (MPa)', 'YS (MPa)', 'Elongation (%)', 'Reduction (%)', 'Hardness (HB)']
+CHEMISTRY_PAIRS = [
+    ('C (Min)', 'C (Max)'), ('Mn (Min)', 'Mn (Max)'), ('P (Min)', 'P (Max)'),
+    ('S (Min)', 'S(Max)'), ('Si (Min)', 'Si (Max)'), ('Ni (Min)', 'Ni (Max)'),
+    ('Cr (Min)', 'Cr (Max)'), ('Mo (Min)', 'Mo (Max)'), ('Ti (Min)', 'Ti (Max)'),
+]
+
+
+def _numeric(series):
+    return pd.to_numeric(series.astype(str).str.extract(r'^\s*(-?\d+(?:[.,]\d+)?)', expand=False)
+                         .str.replace(',', '.'), errors='coerce')
+
+
+def load_source(path=SOURCE):
+    """CSV original sin normalizar (los textos se conservan tal cual)"""
+    return pd.read_csv(path, dtype=str, encoding='latin-1', keep_default_na=False)
+
+
+def fit_model(source):
+    """Regresión lineal de cada propiedad contra C_avg, por familia de tratamiento"""
+    c_avg = (_numeric(source['C (Min)']).fillna(0) + _numeric(source['C (Max)'])) / 2
+    family = source['Conditions'].str.split(r' at | from |,', regex=True).str[0].str.strip().str.lower()
+    model = {}
+    for column in PROPERTY_COLUMNS:
+        y = _numeric(source[column])
+        fits = {}
+        for name, rows in family.groupby(family).groups.items():
+            x, v = c_avg[rows].to_numpy(), y[rows].to_numpy()
+            keep = ~(np.isnan(x) | np.isnan(v))
+            if keep.sum() >= 3 and np.ptp(x[keep]) > 0:
+                slope, intercept = np.polyfit(x[keep], v[keep], 1)
+                noise = np.std(v[keep] - (slope * x[keep] + intercept))
+            else:
+                slope, intercept, noise = 0.0, np.nanmean(v) if keep.any() else 0.0, np.nanstd(v) if keep.any() else 0.0
+            fits[name] = (slope, intercept, max(noise, 1e-6))
+        model[column] = fits
+    return model, family
+
+
+def generate(rows, seed=0, source=None):
+    """DataFrame sintético de `rows` filas con el esquema del CSV original"""
+    rng = np.random.default_rng(seed)
+    source = load_source() if source is None else source
+    model, family = fit_model(source)
+
+    picks = rng.integers(0, len(source), rows)
+    base = source.iloc[picks].reset_index(drop=True)
+    out = pd.DataFrame({'SAE Grade': base['SAE Grade'].to_numpy()})
+    # Variantes de proveedor para multiplicar grados distintos
+    suffix = rng.integers(0, max(1, rows // 500), rows)
+    out['SAE Grade'] = np.where(suffix > 0, out['SAE Grade'] + '-' + suffix.astype(str), out['SAE Grade'])
+    out['Conditions'] = base['Conditions'].to_numpy()
+
+    # Química: se desplaza el rango de carbono y se conservan los huecos
+    shift = rng.normal(0, 0.03, rows)
+    chemistry = {}
+    for low, high in CHEMISTRY_PAIRS:
+        lo = _numeric(base[low]).to_numpy()
+        hi = _numeric(base[high]).to_numpy()
+        if low == 'C (Min)':
+            lo = np.clip(lo + shift, 0.0, None)
+            hi = np.clip(hi + shift, 0.01, None)
+        chemistry[low], chemistry[high] = lo, hi
+    c_avg = (np.nan_to_num(chemistry['C (Min)']) + chemistry['C (Max)']) / 2
+
+    fam = family.iloc[picks].to_numpy()
+    for column in PROPERTY_COLUMNS:
+        values = np.empty(rows)
+        for name, (slope, intercept, noise) in model[column].items():
+            rows_of = fam == name
+            values[rows_of] = slope * c_avg[rows_of] + intercept + rng.normal(0, noise, rows_of.sum())
+        values = np.clip(values, 1, None)
+        out[column] = np.round(values, 1 if column in ('Elongation (%)', 'Reduction (%)') else 0)
+
+    out['UTS (Ksi)'] = np.round(out['UTS (MPa)'] / 6.895)
+    out['YS (ksi)'] = np.round(out['YS (MPa)'] / 6.895, 1)
+    for column, values in chemistry.items():
+        out[column] = np.round(values, 3)
+
+    # Algunas celdas sucias como en el original
+    dirty = rng.random(rows) < 0.01
+    out['Hardness (HB)'] = out['Hardness (HB)'].astype('Int64').astype(str)
+    out.loc[dirty, 'Hardness (HB)'] = out.loc[dirty, 'Hardness (HB)'] + ' HRB'
+
+    return out[list(source.columns)]
+
+
+def write_csv(df, path):
+    """Escribe con la misma codificación (latin-1) que el archivo original"""
+    df.to_csv(path, index=False, encoding='latin-1', errors='replace', quoting=csv.QUOTE_MINIMAL)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera un catálogo sintético de aceros")
+    parser.add_argument('rows', type=int)
+    parser.add_argument('-o', '--output', required=True)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    write_csv(generate(args.rows, args.seed), args.output)
+    print(f"{args.rows} filas -> {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+# Datos de prueba compartidos: el CSV de ejemplo y un catálogo sintético
+# pequeño con empates, faltantes y varios tratamientos
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from aceros.ingest import add_derived_columns, read_catalog_csv  # noqa: E402
+
+SAMPLE_CSV = os.path.join(ROOT, 'steel_data.csv')
+
+CONDITIONS = [
+    'Hot rolled',
+    'Cold drawn',
+    'Annealed at 790 °C (1450 °F)',
+    'Normalized at 870 °C (1600 °F)',
+    'Oil quenched from 830 °C (1525 °F) and tempered at 540 °C (1000 °F)',
+    'Water quenched from 845 °C (1550 °F) and tempered at 425 °C (800 °F)',
+]
+GRADES = ['1020', '1045', '4140', '4340', '5160', '8620']
+
+
+def synthetic_frame(rows, seed=0):
+    """Filas crudas (antes de columnas derivadas) con valores redondeados para forzar empates"""
+    rng = np.random.default_rng(seed)
+
+    def column(low, high, decimals=0, missing=0.05):
+        values = np.round(rng.uniform(low, high, rows), decimals)
+        values[rng.random(rows) < missing] = np.nan
+        return values
+
+    c_min = column(0.05, 0.5, 2)
+    return pd.DataFrame({
+        'SAE Grade': rng.choice(GRADES, rows),
+        'Condition': rng.choice(CONDITIONS + [None], rows, p=[0.16] * 6 + [0.04]),
+        'UTS (MPa)': column(300, 1500, -1),
+        'YS (MPa)': column(200, 1200, -1),
+        'Elongation (%)': column(5, 35),
+        'Hardness (HB)': column(90, 450, -1),
+        'C (Min)': c_min,
+        'C (Max)': np.round(c_min + 0.05, 2),
+        'Mn (Min)': column(0.3, 0.9, 2),
+        'Mn (Max)': column(0.6, 1.2, 2),
+        'Cr (Min)': column(0.4, 1.0, 2, missing=0.5),
+        'Cr (Max)': column(0.8, 1.4, 2, missing=0.5),
+        'Mo (Min)': np.full(rows, np.nan),
+        'Mo (Max)': column(0.1, 0.3, 2, missing=0.7),
+        'Ni (Min)': column(1.0, 2.0, 2, missing=0.8),
+        'Ni (Max)': np.full(rows, np.nan),
+    })
+
+
+def synthetic_df(rows=400, seed=0):
+    """Catálogo sintético con columnas derivadas"""
+    return add_derived_columns(synthetic_frame(rows, seed))
+
+
+@pytest.fixture(scope='session')
+def sample_df():
+    """El CSV de ejemplo con columnas derivadas"""
+    return add_derived_columns(read_catalog_csv(SAMPLE_CSV))
@@ -0,0 +1,129 @@
+# Índices ordenados del catálogo contra máscaras de pandas
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from aceros import PROPERTIES, Range, SteelCatalog
+from aceros.catalog import SortedIndex
+from aceros.ingest import add_derived_columns
+
+from conftest import synthetic_df, synthetic_frame
+
+
+@pytest.fixture(params=['sample', 'synthetic'])
+def catalog(request, sample_df):
+    """Catálogo del CSV de ejemplo y uno sintético con más empates y faltantes"""
+    return SteelCatalog(sample_df if request.param == 'sample' else synthetic_df())
+
+
+def brute_query(df, ranges, conditions=None):
+    """Posiciones que cumplen los rangos evaluando cada columna completa"""
+    mask = pd.Series(True, index=df.index)
+    for key, rng in ranges.items():
+        values = df[PROPERTIES[key]].astype(float)
+        if rng.lo is not None:
+            mask &= values.gt(rng.lo) if rng.lo_strict else values.ge(rng.lo)
+        if rng.hi is not None:
+            mask &= values.lt(rng.hi) if rng.hi_strict else values.le(rng.hi)
+    if conditions is not None:
+        mask &= df['Condition_simple'].astype(object).isin(conditions)
+    return np.flatnonzero(mask.to_numpy())
+
+
+def random_ranges(catalog, rng):
+    """Rangos al azar con extremos tomados de los propios datos (incluye empates)"""
+    ranges = {}
+    for key in rng.choice(list(catalog.values), size=rng.integers(1, 4), replace=False):
+        values = catalog.values[key][~np.isnan(catalog.values[key])]
+        lo, hi = np.sort(rng.choice(values, 2))
+        ranges[key] = Range(
+            lo if rng.random() < 0.8 else None,
+            hi if rng.random() < 0.8 else None,
+            lo_strict=bool(rng.random() < 0.3),
+            hi_strict=bool(rng.random() < 0.3),
+        )
+    return ranges
+
+
+def test_query_matches_pandas(catalog):
+    rng = np.random.default_rng(1)
+    for _ in range(200):
+        ranges = random_ranges(catalog, rng)
+        conditions = None
+        if rng.random() < 0.5:
+            conditions = list(rng.choice(catalog.conditions, size=2))
+        expected = brute_query(catalog.df, ranges, conditions)
+        np.testing.assert_array_equal(catalog.query(ranges, conditions), expected)
+
+
+def test_query_accepts_tuples_and_open_ranges(catalog):
+    np.testing.assert_array_equal(catalog.query({'uts': (None, None)}), np.arange(catalog.size))
+    np.testing.assert_array_equal(catalog.query({'uts': (500, 900)}),
+                                  brute_query(catalog.df, {'uts': Range(500, 900)}))
+
+
+def test_sorted_index_count_and_bounds(catalog):
+    for key, values in catalog.values.items():
+        index = catalog.indexes[key]
+        valid = values[~np.isnan(values)]
+        if len(valid):
+            assert catalog.bounds(key) == (valid.min(), valid.max())
+        for lo, hi in [(None, None), (valid.min(), None), (None, np.median(valid))]:
+            rng = Range(lo, hi)
+            # Los NaN no entran en ningún rango, ni siquiera en el abierto
+            assert index.count(rng) == np.count_nonzero(rng.mask(valid))
+
+
+def test_grade_positions(catalog):
+    grades = catalog.df['SAE Grade'].astype(str)
+    for grade in grades.unique():
+        np.testing.assert_array_equal(np.sort(catalog.grade_positions(grade)),
+                                      np.flatnonzero((grades == grade).to_numpy()))
+    assert len(catalog.grade_positions('no-existe')) == 0
+
+
+# ==================== FILAS AGREGADAS ====================
+def condition_names(catalog):
+    return [catalog.conditions[code] if code >= 0 else None for code in catalog.condition_codes]
+
+
+def test_merged_equals_full_index():
+    rng = np.random.default_rng(2)
+    values = np.round(rng.uniform(0, 20, 300))
+    values[rng.random(300) < 0.1] = np.nan
+    for start in (0, 1, 150, 299, 300):
+        merged = SortedIndex(values[:start]).merged(values[start:], start)
+        full = SortedIndex(values)
+        np.testing.assert_array_equal(merged.order, full.order)
+        np.testing.assert_array_equal(merged.sorted, full.sorted)
+
+
+@pytest.mark.parametrize('start', [1, 200, 399])
+def test_extend_equals_full_build(start):
+    raw = synthetic_frame(400, seed=3)
+    # Filas nuevas con un grado y un tratamiento que el catálogo no conocía
+    raw.loc[start:start + 5, 'SAE Grade'] = '9255'
+    raw.loc[start:start + 2, 'Condition'] = 'Spheroidized annealed'
+    old = SteelCatalog(add_derived_columns(raw.iloc[:start].copy()), version='v1')
+    extended = old.extend(add_derived_columns(raw.iloc[start:].copy()), version='v2')
+    full = SteelCatalog(add_derived_columns(raw.copy()), version='v2')
+
+    assert extended.size == full.size
+    assert extended.parent == ('v1', start)
+    for key in full.values:
+        np.testing.assert_array_equal(extended.values[key], full.values[key])
+        np.testing.assert_array_equal(extended.indexes[key].order, full.indexes[key].order)
+        np.testing.assert_array_equal(extended.indexes[key].sorted, full.indexes[key].sorted)
+    # Los códigos pueden diferir en orden, los tratamientos por fila no
+    assert condition_names(extended) == condition_names(full)
+    assert extended.conditions[:len(old.conditions)] == old.conditions
+    for grade in full.grades:
+        np.testing.assert_array_equal(np.sort(extended.grade_positions(grade)),
+                                      np.sort(full.grade_positions(grade)))
+    rng = np.random.default_rng(4)
+    for _ in range(50):
+        ranges = random_ranges(full, rng)
+        conditions = ['Hot rolled', 'Spheroidized annealed']
+        np.testing.assert_array_equal(extended.query(ranges, conditions),
+                                      full.query(ranges, conditions))
@@ -0,0 +1,86 @@
+# Índice químico contra la lógica de intervalos evaluada en pandas
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from aceros.chemistry import ABSENT, ELEMENTS, OVERLAPS, PRESENT, WITHIN, ChemFilter, ChemistryIndex
+from aceros.ingest import COMPOSITION_DECIMALS
+
+from conftest import synthetic_df
+
+
+@pytest.fixture(params=['sample', 'synthetic'])
+def frame(request, sample_df):
+    """Composición real (muchos elementos sin dato) y sintética (rangos con empates)"""
+    return sample_df if request.param == 'sample' else synthetic_df()
+
+
+def brute_mask(df, rule):
+    """Regla química evaluada sobre las columnas completas del DataFrame"""
+    low_column, high_column = ELEMENTS[rule.element]
+    if low_column not in df.columns or high_column not in df.columns:
+        return np.full(len(df), rule.mode == ABSENT)
+    low = df[low_column].astype('float64').round(COMPOSITION_DECIMALS)
+    high = df[high_column].astype('float64').round(COMPOSITION_DECIMALS)
+    present = low.notna() | high.notna()
+    if rule.mode == PRESENT:
+        return present.to_numpy()
+    if rule.mode == ABSENT:
+        return (~present).to_numpy()
+    # Sólo máx: [0, máx]; sólo mín: [mín, +inf)
+    low = low.fillna(0.0)
+    high = high.fillna(np.inf)
+    mask = present.copy()
+    if rule.mode == OVERLAPS:
+        if rule.lo is not None:
+            mask &= high >= rule.lo
+        if rule.hi is not None:
+            mask &= low <= rule.hi
+    else:
+        if rule.lo is not None:
+            mask &= low >= rule.lo
+        if rule.hi is not None:
+            mask &= high <= rule.hi
+    return mask.to_numpy()
+
+
+def random_rule(df, rng):
+    element = str(rng.choice(list(ELEMENTS)))
+    mode = str(rng.choice([OVERLAPS, OVERLAPS, WITHIN, WITHIN, PRESENT, ABSENT]))
+    values = np.array([0.0, 1.0])
+    columns = [column for column in ELEMENTS[element] if column in df.columns]
+    if columns:
+        found = pd.concat([df[column].astype('float64') for column in columns]).dropna()
+        if len(found):
+            values = found.round(COMPOSITION_DECIMALS).to_numpy()
+    lo, hi = np.sort(rng.choice(values, 2))
+    return ChemFilter(element, mode,
+                      lo if rng.random() < 0.7 else None,
+                      hi if rng.random() < 0.7 else None)
+
+
+def test_positions_match_pandas(frame):
+    index = ChemistryIndex(frame)
+    rng = np.random.default_rng(8)
+    for _ in range(300):
+        rule = random_rule(frame, rng)
+        np.testing.assert_array_equal(index.positions(rule), np.flatnonzero(brute_mask(frame, rule)))
+
+
+def test_query_intersects_rules(frame):
+    index = ChemistryIndex(frame)
+    rng = np.random.default_rng(9)
+    for _ in range(100):
+        rules = [random_rule(frame, rng) for _ in range(rng.integers(1, 4))]
+        expected = np.ones(len(frame), dtype=bool)
+        for rule in rules:
+            expected &= brute_mask(frame, rule)
+        np.testing.assert_array_equal(index.query(rules), np.flatnonzero(expected))
+        subset = np.sort(rng.choice(len(frame), len(frame) // 2, replace=False))
+        np.testing.assert_array_equal(index.query(rules, subset), subset[expected[subset]])
+
+
+def test_unknown_mode(sample_df):
+    with pytest.raises(ValueError):
+        ChemistryIndex(sample_df).positions(ChemFilter('C', 'between', 0.1, 0.2))
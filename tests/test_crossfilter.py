@@ -0,0 +1,51 @@
+# Conteos de los histogramas enlazados contra el filtrado directo por fila
+
+import numpy as np
+import pytest
+
+from aceros import SteelCatalog
+from aceros.crossfilter import BinnedCube
+
+from conftest import synthetic_df
+
+
+@pytest.fixture(scope='module')
+def catalog():
+    return SteelCatalog(synthetic_df(500, seed=15))
+
+
+@pytest.fixture(scope='module')
+def cube(catalog):
+    return BinnedCube(catalog, bins=12)
+
+
+def test_codes_follow_edges(catalog, cube):
+    for key in cube.keys:
+        values, codes = catalog.values[key], cube.codes[key].astype(int)
+        valid = ~np.isnan(values)
+        assert (codes[~valid] == cube.bins).all()
+        edges = cube.edges[key]
+        assert (edges[codes[valid]] <= values[valid]).all()
+        assert (values[valid] <= edges[codes[valid] + 1]).all()
+        np.testing.assert_array_equal(cube.totals[key], np.bincount(codes[valid], minlength=cube.bins))
+
+
+def test_counts_match_brute_force(cube):
+    rng = np.random.default_rng(16)
+    for _ in range(100):
+        brushes = {}
+        for key in rng.choice(cube.keys, rng.integers(0, 4), replace=False):
+            first, last = np.sort(rng.integers(0, cube.bins, 2))
+            brushes[str(key)] = (int(first), int(last))
+        # Un filtro que cubre todos los bins no filtra (deja pasar las filas sin dato)
+        inside = {key: (cube.codes[key] >= first) & (cube.codes[key] <= last)
+                  for key, (first, last) in brushes.items() if (first, last) != (0, cube.bins - 1)}
+        counts, passing = cube.counts(brushes)
+        everything = np.logical_and.reduce([np.ones(cube.size, dtype=bool)] + list(inside.values()))
+        assert passing == np.count_nonzero(everything)
+        for key in cube.keys:
+            # El filtro propio no recorta su histograma
+            rows = np.logical_and.reduce([np.ones(cube.size, dtype=bool)]
+                                         + [mask for other, mask in inside.items() if other != key])
+            expected = np.bincount(cube.codes[key][rows], minlength=cube.bins + 1)[:cube.bins]
+            np.testing.assert_array_equal(counts[key], expected)
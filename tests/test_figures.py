@@ -0,0 +1,75 @@
+# Agregaciones de las figuras contra implementaciones directas
+
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from aceros.figures import binned_profile, lttb
+
+from conftest import synthetic_df
+
+
+def brute_lttb(x, y, threshold):
+    """LTTB punto por punto (mismos buckets que figures.lttb)"""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+    every = (n - 2) / (threshold - 2)
+    edges = [int(np.floor(i * every)) + 1 for i in range(threshold - 1)]
+    edges[-1] = n - 1
+    selected = [0]
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = sum(x[end:next_end]) / (next_end - end)
+        avg_y = sum(y[end:next_end]) / (next_end - end)
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+    selected.append(n - 1)
+    return selected
+
+
+@pytest.mark.parametrize('threshold', [2, 3, 10, 97, 500, 1_000])
+def test_lttb_matches_brute_force(threshold):
+    rng = np.random.default_rng(threshold)
+    x = np.sort(rng.uniform(0, 1, 500))
+    y = np.cumsum(rng.normal(size=500))
+    selected = lttb(x, y, threshold)
+    np.testing.assert_array_equal(selected, brute_lttb(list(x), list(y), threshold))
+    assert np.all(np.diff(selected) > 0)
+    assert len(selected) == (min(threshold, 500) if threshold >= 3 else 500)
+
+
+@pytest.mark.parametrize('bins', [1, 7, 40])
+def test_binned_profile_matches_pandas(sample_df, bins):
+    columns = ['UTS (MPa)', 'Hardness (HB)', 'Elongation (%)']
+    for df, column in itertools.product([sample_df, synthetic_df()], columns):
+        x = df['C_avg'].to_numpy(dtype=float)
+        y = df[column].to_numpy(dtype=float)
+        profile = binned_profile(x, y, bins)
+
+        data = pd.DataFrame({'x': x, 'y': y}).dropna()
+        used = max(1, min(bins, data['x'].nunique()))
+        low, high = data['x'].min(), data['x'].max()
+        width = (high - low) / used or 1.0
+        data['bin'] = np.minimum(np.floor((data['x'] - low) / width), used - 1).astype(int)
+        groups = data.groupby('bin')
+        np.testing.assert_array_equal(profile['count'], groups.size().to_numpy())
+        np.testing.assert_allclose(profile['x'], groups['x'].mean().to_numpy())
+        np.testing.assert_allclose(profile['mean'], groups['y'].mean().to_numpy())
+        for q in (0.25, 0.5, 0.75):
+            expected = groups['y'].quantile(q, interpolation='lower').to_numpy()
+            np.testing.assert_array_equal(profile[f'q{int(q * 100)}'], expected)
+
+
+def test_binned_profile_empty():
+    profile = binned_profile(np.array([np.nan]), np.array([1.0]))
+    assert len(profile['x']) == 0 and len(profile['count']) == 0
@@ -0,0 +1,136 @@
+# Lectura por bloques y snapshot Arrow contra una lectura directa del CSV
+
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from aceros import ingest
+from aceros.ingest import load_table, read_catalog_csv, snapshot_paths
+
+from conftest import SAMPLE_CSV
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    """Copia del CSV de ejemplo; el snapshot queda en tmp_path/cache"""
+    path = tmp_path / 'steel_data.csv'
+    shutil.copyfile(SAMPLE_CSV, path)
+    return str(path)
+
+
+def forbid_csv(monkeypatch):
+    """Falla si se vuelve a parsear el CSV (la carga debe salir del snapshot)"""
+    def fail(*args, **kwargs):
+        raise AssertionError('se releyó el CSV')
+    monkeypatch.setattr(ingest, 'read_catalog_csv', fail)
+
+
+@pytest.mark.parametrize('chunksize', [1, 7, 64])
+def test_chunks_match_single_read(chunksize):
+    pd.testing.assert_frame_equal(read_catalog_csv(SAMPLE_CSV, chunksize), read_catalog_csv(SAMPLE_CSV))
+
+
+def test_to_number_rescues_units_and_commas():
+    values = ingest._to_number(pd.Series(['269 HRB', '40,2', '12', 'n/a', None]))
+    np.testing.assert_array_equal(values, [269.0, 40.2, 12.0, np.nan, np.nan])
+
+
+def test_snapshot_round_trip(csv_path, tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / 'cache')
+    first = load_table(csv_path, cache_dir)
+    assert all(os.path.exists(path) for path in snapshot_paths(csv_path, cache_dir))
+    forbid_csv(monkeypatch)
+    pd.testing.assert_frame_equal(load_table(csv_path, cache_dir), first)
+    # Sólo cambió el mtime: el hash confirma que el snapshot sigue vigente
+    stat = os.stat(csv_path)
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    pd.testing.assert_frame_equal(load_table(csv_path, cache_dir), first)
+
+
+def test_changed_csv_is_parsed_again(csv_path, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    first = load_table(csv_path, cache_dir)
+    with open(csv_path, 'rb') as handle:
+        header, _, rest = handle.read().split(b'\n', 2)
+    # Sin la primera fila de datos (de una sola línea)
+    with open(csv_path, 'wb') as handle:
+        handle.write(header + b'\n' + rest)
+    assert len(load_table(csv_path, cache_dir)) == len(first) - 1
+
+
+def test_corrupt_snapshot_is_rebuilt(csv_path, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    first = load_table(csv_path, cache_dir)
+    snapshot, _ = snapshot_paths(csv_path, cache_dir)
+    with open(snapshot, 'r+b') as handle:
+        handle.truncate(100)
+    pd.testing.assert_frame_equal(load_table(csv_path, cache_dir), first)
+    with open(snapshot, 'rb') as handle:
+        assert len(handle.read()) > 100
+
+
+# ==================== FILAS AGREGADAS ====================
+def split_records(path):
+    """Encabezado y registros completos del CSV (un registro puede ocupar varias líneas)"""
+    with open(path, 'rb') as handle:
+        data = handle.read()
+    header, body = data.split(b'\n', 1)
+    records, start = [], 0
+    for end in range(len(body)):
+        if body[end:end + 1] == b'\n' and body[start:end + 1].count(b'"') % 2 == 0:
+            records.append(body[start:end + 1])
+            start = end + 1
+    return header + b'\n', records
+
+
+def write_records(path, header, records, extra=b''):
+    with open(path, 'wb') as handle:
+        handle.write(header + b''.join(records) + extra)
+
+
+def test_read_appended_matches_full_read(csv_path, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    header, records = split_records(csv_path)
+    write_records(csv_path, header, records[:100])
+    rows = len(load_table(csv_path, cache_dir))
+    write_records(csv_path, header, records)
+    delta = ingest.read_appended(csv_path, rows, cache_dir)
+    full = read_catalog_csv(csv_path)
+    pd.testing.assert_frame_equal(delta, full.iloc[rows:].reset_index(drop=True), check_dtype=False)
+    # El snapshot ya cubre el archivo completo
+    assert len(load_table(csv_path, cache_dir)) == len(full)
+
+
+def test_read_appended_rejects_edited_prefix(csv_path, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    header, records = split_records(csv_path)
+    write_records(csv_path, header, records[:100])
+    rows = len(load_table(csv_path, cache_dir))
+    write_records(csv_path, header, records[1:])
+    assert ingest.read_appended(csv_path, rows, cache_dir) is None
+
+
+def test_complete_records_cuts_outside_quotes():
+    assert ingest.complete_records(b'a,1\nb,2\nc,') == b'a,1\nb,2\n'
+    assert ingest.complete_records(b'a,"x\ny"\nb,"z\n') == b'a,"x\ny"\n'
+    assert ingest.complete_records(b'a,1') == b''
+
+
+def test_read_appended_waits_for_whole_records(csv_path, tmp_path):
+    """Un registro a medio escribir (incluso dentro de comillas) queda para la siguiente lectura"""
+    cache_dir = str(tmp_path / 'cache')
+    header, records = split_records(csv_path)
+    multiline = next(i for i, record in enumerate(records) if record.count(b'\n') > 1)
+    write_records(csv_path, header, records[:multiline - 2])
+    rows = len(load_table(csv_path, cache_dir))
+    partial = records[multiline][:records[multiline].index(b'\n') + 1]
+    write_records(csv_path, header, records[:multiline], partial)
+    delta = ingest.read_appended(csv_path, rows, cache_dir)
+    assert len(delta) == 2
+    write_records(csv_path, header, records[:multiline + 1])
+    delta = ingest.read_appended(csv_path, rows + 2, cache_dir)
+    full = read_catalog_csv(csv_path)
+    pd.testing.assert_frame_equal(delta, full.iloc[rows + 2:].reset_index(drop=True), check_dtype=False)
@@ -0,0 +1,50 @@
+# Memoria propia de las sesiones y su presupuesto
+
+import time
+
+import numpy as np
+
+from aceros import SteelCatalog
+from aceros.memory import SessionMemory, owned_bytes
+
+from conftest import synthetic_df
+
+
+def test_owned_bytes_skips_shared_arrays():
+    owned = np.zeros(1_000)
+    shared = np.zeros(1_000)
+    shared.flags.writeable = False
+    assert owned_bytes(owned) == owned.nbytes
+    assert owned_bytes(shared) == 0
+    assert owned_bytes(owned[::2]) == 0
+    # Cada objeto se cuenta una sola vez aunque aparezca dos veces
+    assert owned_bytes([owned, owned]) < 2 * owned.nbytes
+    catalog = SteelCatalog(synthetic_df(100))
+    assert owned_bytes({'catalog': catalog}, skip=(SteelCatalog,)) < owned_bytes({'catalog': catalog})
+
+
+def test_budget_grows_with_the_catalog():
+    memory = SessionMemory(1_000, per_row=16)
+    assert memory.budget_for(10) == 1_000
+    assert memory.budget_for(1_000) == 16_000
+
+
+def test_over_budget_counts_crossings():
+    memory = SessionMemory(1_000, per_row=0)
+    big, small = {'data': np.zeros(1_000)}, {'data': 1}
+    for state in (big, big, big, small, big):
+        memory.observe('a', state)
+    memory.observe('b', big)
+    stats = memory.stats()
+    # a: dos cruces (sin contar los reruns que sigue por encima); b: uno
+    assert stats['over_budget'] == 3
+    assert stats['sessions'] == 2
+    assert stats['max_bytes'] == sum(memory.measure(big).values())
+
+
+def test_idle_sessions_expire():
+    memory = SessionMemory(1_000, ttl=0.0)
+    memory.observe('a', {'data': 1})
+    time.sleep(0.001)
+    memory.observe('b', {'data': 1})
+    assert memory.stats()['sessions'] == 1
@@ -0,0 +1,38 @@
+# Orden y páginas de resultados contra un ordenamiento directo
+
+import numpy as np
+import pytest
+
+from aceros import SteelCatalog
+from aceros.paging import page_bounds, sort_results
+
+from conftest import synthetic_df
+
+
+def brute_order(catalog, positions, key, descending=False):
+    """Posiciones con dato por valor (y por fila en empates), luego las vacías por fila"""
+    values = catalog.values[key]
+    sign = -1 if descending else 1
+    return sorted(positions, key=lambda p: (np.isnan(values[p]), sign * np.nan_to_num(values[p]), p))
+
+
+@pytest.mark.parametrize('descending', [False, True])
+def test_sort_results_matches_sorted(descending):
+    catalog = SteelCatalog(synthetic_df(400, seed=13))
+    rng = np.random.default_rng(14)
+    # Pocos resultados: se ordenan directo; muchos: se recorre el índice
+    for count in (0, 1, 10, 40, 200, 400):
+        positions = rng.choice(catalog.size, count, replace=False)
+        for order in (np.sort(positions), positions):
+            for key in catalog.values:
+                got = order[sort_results(catalog, order, key, descending)]
+                np.testing.assert_array_equal(got, brute_order(catalog, order, key, descending))
+
+
+def test_page_bounds():
+    assert page_bounds(0, 1, 25) == (0, 0, 1)
+    assert page_bounds(60, 2, 25) == (25, 50, 3)
+    assert page_bounds(60, 3, 25) == (50, 60, 3)
+    # Páginas fuera de rango se ajustan a la primera o la última
+    assert page_bounds(60, 9, 25) == (50, 60, 3)
+    assert page_bounds(60, 0, 25) == (0, 25, 3)
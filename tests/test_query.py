@@ -0,0 +1,68 @@
+# Evaluación por lotes contra la consulta individual y lectura de registros
+
+import numpy as np
+import pytest
+
+from aceros import SteelCatalog
+from aceros.query import (BATCH_K, DEFAULT_HARDNESS, HARDNESS_LEVELS, SIMPLE_K, USE_CASES,
+                          WELDING_OPTIONS, evaluate_batch, parse_query, run_query, simple_query)
+
+from conftest import synthetic_df
+
+
+@pytest.fixture(scope='module')
+def catalog():
+    return SteelCatalog(synthetic_df(600, seed=17))
+
+
+def random_record(catalog, rng):
+    """Registro técnico con rangos tomados de los datos (empates en los extremos)"""
+    record = {'k': int(rng.integers(0, 15))}
+    for key in rng.choice(list(catalog.values), rng.integers(1, 3), replace=False):
+        values = catalog.values[key][~np.isnan(catalog.values[key])]
+        low, high = np.sort(rng.choice(values, 2))
+        record[f'{key}_min'] = low if rng.random() < 0.7 else ''
+        record[f'{key}_max'] = high if rng.random() < 0.7 else ''
+    if rng.random() < 0.5:
+        record['treatments'] = '|'.join(rng.choice(catalog.conditions, 2))
+    return record
+
+
+def test_batch_matches_single_queries(catalog):
+    rng = np.random.default_rng(18)
+    queries = [parse_query(catalog, random_record(catalog, rng)) for _ in range(40)]
+    queries += [simple_query(use_case, welding, level)
+                for use_case in USE_CASES[:2] for welding in WELDING_OPTIONS for level in HARDNESS_LEVELS]
+    # Consultas repetidas se evalúan una vez y se devuelven en su lugar
+    queries += queries[:5]
+    for query, (positions, scores) in zip(queries, evaluate_batch(catalog, queries, max_cells=5_000)):
+        expected_positions, expected_scores = run_query(catalog, query)
+        np.testing.assert_array_equal(positions, expected_positions)
+        np.testing.assert_allclose(scores, expected_scores)
+
+
+def test_parse_simple_record(catalog):
+    query = parse_query(catalog, {'welding': 'No', 'hardness': '4', 'use_case': ''})
+    assert query == simple_query(None, 'No', 4, SIMPLE_K)
+    # Dureza vacía: nivel por omisión
+    query = parse_query(catalog, {'welding': 'No', 'hardness': ''})
+    assert query == simple_query(None, 'No', DEFAULT_HARDNESS)
+    with pytest.raises(ValueError):
+        parse_query(catalog, {'welding': 'Quizá'})
+
+
+def test_parse_technical_record(catalog):
+    query = parse_query(catalog, {'uts': [400, 900], 'hb_min': '', 'elong_max': '30',
+                                  'treatments': 'Hot rolled| Cold drawn'})
+    assert query['ranges'] == {'uts': (400.0, 900.0, False, False), 'elong': (None, 30.0, False, False)}
+    assert query['treatments'] == ['Hot rolled', 'Cold drawn']
+    assert query['k'] == BATCH_K
+
+
+def test_parse_k(catalog):
+    assert parse_query(catalog, {'uts_min': 500, 'k': 0})['k'] == 0
+    assert parse_query(catalog, {'welding': 'No', 'k': '0'})['k'] == 0
+    positions, scores = run_query(catalog, parse_query(catalog, {'uts_min': 500, 'k': 0}))
+    assert len(positions) == len(scores) == 0
+    with pytest.raises(ValueError):
+        parse_query(catalog, {'uts_min': 500, 'k': -1})
@@ -0,0 +1,65 @@
+# LRU con presupuesto en bytes contra un modelo simple de la caché
+
+from collections import OrderedDict
+
+import numpy as np
+
+from aceros.resultcache import QueryCache, entry_size
+
+
+def array(size):
+    return np.zeros(size, dtype=np.int32)
+
+
+def test_lru_matches_model():
+    """Secuencia aleatoria de consultas contra un OrderedDict con el mismo presupuesto"""
+    rng = np.random.default_rng(10)
+    sizes = {key: int(rng.integers(1, 200)) for key in range(40)}
+    max_bytes = sum(entry_size(('v1', key), array(sizes[key])) for key in range(8))
+    cache = QueryCache(max_bytes)
+    model = OrderedDict()
+    for _ in range(2_000):
+        key = int(rng.integers(0, 40))
+        value = cache.get('v1', key, lambda: array(sizes[key]))
+        assert len(value) == sizes[key]
+        if key in model:
+            model.move_to_end(key)
+        else:
+            model[key] = entry_size(('v1', key), value)
+            while sum(model.values()) > max_bytes:
+                model.popitem(last=False)
+        assert [entry[1] for entry in cache.entries] == list(model)
+        assert cache.bytes == sum(model.values()) <= max_bytes
+    stats = cache.stats()
+    assert stats['hits'] + stats['misses'] == 2_000
+
+
+def test_oversized_entry_is_not_stored():
+    cache = QueryCache(1_000)
+    calls = []
+    for _ in range(2):
+        cache.get('v1', 'grande', lambda: calls.append(1) or array(1_000))
+    assert len(calls) == 2
+    assert cache.stats()['entries'] == 0
+
+
+def test_values_are_read_only():
+    cache = QueryCache(1 << 20)
+    positions, scores = cache.get('v1', 'q', lambda: (array(10), np.ones(10)))
+    assert not positions.flags.writeable and not scores.flags.writeable
+
+
+def test_new_version_invalidates_old_entries():
+    cache = QueryCache(1 << 20)
+    for key in range(3):
+        cache.get('v1', key, lambda: array(10))
+    cache.get('v2', 0, lambda: array(10))
+    assert [entry[0] for entry in cache.entries] == ['v2']
+    assert cache.stats()['invalidations'] == 3
+    assert cache.bytes == entry_size(('v2', 0), array(10))
+    # Una sesión que sigue en v1 calcula sin guardar ni desalojar v2
+    calls = []
+    cache.get('v1', 5, lambda: calls.append(1) or array(10))
+    cache.get('v1', 5, lambda: calls.append(1) or array(10))
+    assert len(calls) == 2
+    assert [entry[0] for entry in cache.entries] == ['v2']
@@ -0,0 +1,68 @@
+# Selección de los k mejores y tratamientos aceptados contra el cálculo directo
+
+import numpy as np
+import pytest
+
+from aceros import SteelCatalog
+from aceros.scoring import DEFAULT_WEIGHTS, MAX_SCORE, _treatment_miss, score_positions, top_k
+
+from conftest import synthetic_df
+
+
+def brute_score(catalog, spec, position):
+    """Puntaje de una fila criterio por criterio"""
+    weights = dict(DEFAULT_WEIGHTS, **spec.get('weights', {}))
+    penalty = 0.0
+    for bound in ('min', 'max', 'target'):
+        for key, limit in spec.get(bound, {}).items():
+            value = catalog.values[key][position]
+            if np.isnan(value):
+                continue
+            deviation = {'min': limit - value, 'max': value - limit, 'target': abs(value - limit)}[bound]
+            weight = weights.get(key, 1.0)
+            penalty += min(max(deviation * weight / catalog.spread[key], 0.0), weight)
+    if spec.get('treatments'):
+        code = catalog.condition_codes[position]
+        if code < 0 or catalog.conditions[code] not in spec['treatments']:
+            penalty += weights['treatments']
+    return min(max(MAX_SCORE - penalty, 0.0), MAX_SCORE)
+
+
+def test_score_positions_matches_row_by_row():
+    catalog = SteelCatalog(synthetic_df(300, seed=11))
+    rng = np.random.default_rng(12)
+    for _ in range(30):
+        spec = {bound: {key: float(np.nanmedian(catalog.values[key])) * rng.uniform(0.5, 1.5)
+                        for key in rng.choice(list(catalog.values), 2, replace=False)}
+                for bound in ('min', 'max', 'target') if rng.random() < 0.6}
+        if rng.random() < 0.5:
+            spec['treatments'] = list(rng.choice(catalog.conditions, 2))
+        spec['weights'] = {'uts': float(rng.uniform(0.5, 3.0))}
+        expected = [brute_score(catalog, spec, position) for position in range(catalog.size)]
+        np.testing.assert_allclose(score_positions(catalog, spec), expected)
+        positions = np.sort(rng.choice(catalog.size, 50, replace=False))
+        np.testing.assert_allclose(score_positions(catalog, spec, positions), np.take(expected, positions))
+
+
+@pytest.mark.parametrize('k', [0, 1, 5, 49, 50, 80])
+def test_top_k_matches_sorted(k):
+    rng = np.random.default_rng(k)
+    for _ in range(50):
+        # Pocos valores distintos: muchos empates en el corte
+        scores = rng.integers(0, 6, 50).astype(float)
+        expected = sorted(range(len(scores)), key=lambda i: (-scores[i], i))[:max(k, 0)]
+        np.testing.assert_array_equal(top_k(scores, k), expected)
+
+
+def test_top_k_empty():
+    assert len(top_k(np.empty(0), 3)) == 0
+
+
+@pytest.mark.parametrize('conditions', [1, 2, 7, 15, 16, 40, 63, 64, 200])
+def test_treatment_miss_matches_lookup(conditions):
+    rng = np.random.default_rng(conditions)
+    # Código -1: fila sin tratamiento, nunca aceptada (última celda de la tabla)
+    codes = rng.integers(-1, conditions, 1_000).astype(np.int16)
+    for share in (0.0, 0.2, 0.8, 1.0):
+        allowed = np.append(rng.random(conditions) < share, False)
+        np.testing.assert_array_equal(_treatment_miss(codes, allowed), ~allowed[codes])
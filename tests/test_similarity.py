@@ -0,0 +1,85 @@
+# KD-tree de sustitutos contra la distancia ponderada a todas las filas
+
+import numpy as np
+import pytest
+
+from aceros import SteelCatalog
+from aceros import similarity
+from aceros.similarity import KDTree, SubstituteIndex, weighted_distance
+
+from conftest import synthetic_df
+
+
+def brute_nearest(points, target, k, weights, allowed=None):
+    """(filas, distancias²) de los k más cercanos; empates por fila menor"""
+    dist = weighted_distance(points - target, weights)
+    rows = np.arange(len(points)) if allowed is None else np.flatnonzero(allowed)
+    order = np.lexsort((rows, dist[rows]))[:k]
+    return rows[order], dist[rows][order]
+
+
+@pytest.mark.parametrize('leaf_size', [1, 4, 32])
+def test_kdtree_matches_brute_force(leaf_size):
+    rng = np.random.default_rng(leaf_size)
+    # Coordenadas enteras: distancias repetidas y puntos duplicados
+    points = rng.integers(0, 6, size=(300, 4)).astype(float)
+    tree = KDTree(points, leaf_size)
+    for _ in range(100):
+        target = rng.uniform(-1, 7, 4)
+        weights = rng.choice([0.0, 0.5, 1.0, 3.0], 4)
+        k = int(rng.integers(1, 20))
+        allowed = rng.random(300) < 0.3 if rng.random() < 0.5 else None
+        rows, dist = tree.query(target, k, weights, allowed)
+        expected_rows, expected_dist = brute_nearest(points, target, k, weights, allowed)
+        np.testing.assert_allclose(dist, expected_dist)
+        np.testing.assert_array_equal(rows, expected_rows)
+
+
+@pytest.mark.parametrize('brute_force_limit', [0, similarity.BRUTE_FORCE_LIMIT])
+@pytest.mark.parametrize('source', ['sample', 'synthetic'])
+def test_substitutes_match_brute_force(sample_df, monkeypatch, brute_force_limit, source):
+    """Por el árbol (límite 0) y por comparación directa"""
+    monkeypatch.setattr(similarity, 'BRUTE_FORCE_LIMIT', brute_force_limit)
+    catalog = SteelCatalog(sample_df if source == 'sample' else synthetic_df())
+    index = SubstituteIndex(catalog, leaf_size=8)
+    grades = catalog.df['SAE Grade'].astype(str).to_numpy()
+    c_avg = catalog.df['C_avg'].to_numpy(dtype=float)
+    rng = np.random.default_rng(6)
+    for position in rng.choice(catalog.size, 30, replace=False):
+        weights = {key: float(rng.choice([0.0, 1.0, 2.5])) for key in index.keys}
+        same_treatment = bool(rng.random() < 0.5)
+        other_grades = bool(rng.random() < 0.5)
+        max_carbon = float(rng.choice(c_avg[~np.isnan(c_avg)]))
+        k = int(rng.integers(1, 10))
+
+        allowed = c_avg <= max_carbon
+        if same_treatment:
+            allowed &= catalog.condition_codes == catalog.condition_codes[position]
+        if other_grades:
+            allowed &= grades != grades[position]
+        allowed[position] = False
+        expected_rows, expected_dist = brute_nearest(
+            index.points, index.points[position], k, index.weight_vector(weights), allowed)
+
+        rows, dist = index.substitutes(catalog, position, k, weights, same_treatment,
+                                       {'c_avg': (None, max_carbon)}, exclude_same_grade=other_grades)
+        np.testing.assert_allclose(dist, np.sqrt(expected_dist))
+        np.testing.assert_array_equal(rows, expected_rows)
+
+
+@pytest.mark.parametrize('brute_force_limit', [0, similarity.BRUTE_FORCE_LIMIT])
+def test_no_neighbours_for_k_below_one(sample_df, monkeypatch, brute_force_limit):
+    monkeypatch.setattr(similarity, 'BRUTE_FORCE_LIMIT', brute_force_limit)
+    catalog = SteelCatalog(sample_df)
+    index = SubstituteIndex(catalog)
+    for k in (0, -3):
+        rows, dist = index.substitutes(catalog, 0, k, same_treatment=True)
+        assert len(rows) == len(dist) == 0
+        rows, dist = index.tree.query(index.points[0], k, index.weight_vector())
+        assert len(rows) == len(dist) == 0
+
+
+def test_other_catalog_version_is_rejected(sample_df):
+    index = SubstituteIndex(SteelCatalog(sample_df, version='v1'))
+    with pytest.raises(ValueError):
+        index.substitutes(SteelCatalog(sample_df, version='v2'), 0)
@@ -0,0 +1,63 @@
+# Frontera de Pareto contra la comparación de todos contra todos
+
+import numpy as np
+import pytest
+
+from aceros import SteelCatalog
+from aceros import skyline as skyline_module
+from aceros.skyline import MINIMIZE, pareto_front, skyline
+
+from conftest import synthetic_df
+
+
+def brute_front(points):
+    """Máscara de no dominados comparando cada par de puntos: O(N²)"""
+    points = np.asarray(points, dtype=np.float64)
+    front = np.ones(len(points), dtype=bool)
+    for i, point in enumerate(points):
+        dominated = (points >= point).all(axis=1) & (points > point).any(axis=1)
+        front[i] = not dominated.any()
+    return front
+
+
+@pytest.mark.parametrize('dims', [1, 2, 3, 4])
+def test_pareto_front_matches_brute_force(dims):
+    rng = np.random.default_rng(dims)
+    for rows in (1, 2, 50, 600):
+        # Valores enteros en un rango corto: muchos empates y duplicados
+        points = rng.integers(0, 12, size=(rows, dims)).astype(float)
+        np.testing.assert_array_equal(pareto_front(points), brute_front(points))
+
+
+def test_pareto_front_grid_and_blocks(monkeypatch):
+    """Descarte por cuadrícula y varias rondas de bloques en 3D"""
+    monkeypatch.setattr(skyline_module, 'GRID_MIN_POINTS', 64)
+    monkeypatch.setattr(skyline_module, 'FRONT_BLOCK', 8)
+    monkeypatch.setattr(skyline_module, 'BLOCK_CELLS', 96)
+    rng = np.random.default_rng(7)
+    grid = rng.integers(0, 30, size=(800, 3)).astype(float)
+    # Puntos sobre una esfera: casi todos están en la frontera
+    sphere = np.abs(rng.normal(size=(400, 3)))
+    sphere /= np.linalg.norm(sphere, axis=1, keepdims=True)
+    for points in (grid, sphere):
+        np.testing.assert_array_equal(pareto_front(points), brute_front(points))
+
+
+def test_pareto_front_empty():
+    assert pareto_front(np.empty((0, 2))).shape == (0,)
+
+
+@pytest.mark.parametrize('source', ['sample', 'synthetic'])
+def test_skyline_matches_brute_force(sample_df, source):
+    catalog = SteelCatalog(sample_df if source == 'sample' else synthetic_df())
+    rng = np.random.default_rng(5)
+    for keys in [('uts', 'elong'), ('uts', 'ys', 'elong'), ('hb', 'c_avg'), ('uts', 'elong', 'c_avg')]:
+        for positions in (None, np.sort(rng.choice(catalog.size, catalog.size // 3, replace=False))):
+            rows = np.arange(catalog.size) if positions is None else positions
+            points = np.column_stack([
+                -catalog.values[key][rows] if key in MINIMIZE else catalog.values[key][rows]
+                for key in keys
+            ])
+            valid = ~np.isnan(points).any(axis=1)
+            expected = rows[valid][brute_front(points[valid])]
+            np.testing.assert_array_equal(skyline(catalog, keys, positions), expected)